@@ -13,14 +13,24 @@ COMENTARIOS:    Genera archivo .txt asociado a cada material.
 
 
 # %% [01] LIBRARIES
+import ast
 import json
 import re
 import numpy as np
 import openseespy.opensees as ops
+import S01_GUI02_A04_2_testUniaxialMaterial as Mat
 import S01_GUI02_A06_UserDefinedFunctions as udf
+import S01_GUI02_A16_AdaptiveStrain as Adp
+import S01_GUI02_A17_NativeMaterial as Nat
+import S01_GUI02_A20_ResponseStore as Rst
+import S01_GUI02_A23_Branches as Brn
 
 
 # %% [02] FUNCTIONS
+# Version of the engine of data_plot(). Change it when the results of data_plot() change,
+# it invalidates the responses saved in the cache (S01_GUI02_A14_Cache.py).
+engine_version = '3'
+
 
 # %%% [02-01] SUPPORT FUNCTIONS
 # Function to stop the script, call as f()
@@ -62,8 +72,57 @@ def material_definition_steel4(flag, mat_tag):
 
 
 # %%% [02-02] READ (.TXT) FILES AS DICTIONARIES
+# Schema of the response files: key -> conversion of the value read. The other keys are returned as they are read.
+# The non-finite values are the tokens NaN, Infinity and -Infinity written by json.dump().
+response_schema = {
+    'DataPlot': lambda value: np.array(value, dtype=np.float64),
+    'DataState': lambda value: {name: np.array(data, dtype=np.float64) for name, data in value.items()},
+    'model': lambda value: value.replace('-', ''),  # Delete "-" from name of model
+}
+
+# Tokens of the files written as python literals (str() of a dictionary with numpy arrays) that aren't JSON.
+# The strings are matched as one token, so their content (ej. the quotes of 'code') is never rewritten.
+python_literal_tokens = re.compile(r"'(?:[^'\\]|\\.)*'" + r'|"(?:[^"\\]|\\.)*"' +
+                                   r"|\barray\(|\)|-?\binf\b|\bnan\b|\b(?:True|False|None)\b")
+python_literal_json = {'array(': '', ')': '', 'nan': 'NaN', 'inf': 'Infinity', '-inf': '-Infinity', 'True': 'true',
+                       'False': 'false', 'None': 'null'}
+
+
+def python_literal_token(match):
+    token = match.group(0)
+    if token[0] in '\'"':
+        return json.dumps(ast.literal_eval(token))
+    return python_literal_json[token]
+
 
 def read_file_to_dict(file_path):
+    """
+    Read a response file (.txt) as a dictionary, with DataPlot and DataState as numpy arrays.
+
+    The file is parsed in one pass: as JSON (json.dump() of file_txt() and data_plot()), or if it isn't JSON, as a
+    python literal translated to JSON token by token.
+    """
+    with open(file_path, 'r') as file:
+        file_content = file.read()
+
+    try:
+        data_dict = json.loads(file_content)
+    except json.JSONDecodeError:
+        data_dict = json.loads(python_literal_tokens.sub(python_literal_token, file_content))
+
+    return apply_response_schema(data_dict)
+
+
+# Function to convert the values of a response read from a file, see response_schema.
+def apply_response_schema(data_dict):
+    for key, convert in response_schema.items():
+        if key in data_dict:
+            data_dict[key] = convert(data_dict[key])
+    return data_dict
+
+
+# Previous parser of the .txt files (string replacements), kept to compare it with read_file_to_dict().
+def read_file_to_dict_replacements(file_path):
     with open(file_path, 'r') as file:
         file_content = file.read()
 
@@ -134,8 +193,101 @@ def read_file_to_dict(file_path):
     return data_dict
 
 
-# %%% [02-03] CREATE (.TXT)
-def file_txt(url_arg_x, unit_x, model_args_x, load_args_x, ID_cyclic_strain, min_max_args_x = []):
+# End of the value of an array key that starts at index_x, found with the schema of the arrays: DataPlot is a list of
+# rows of numbers and DataState a dictionary of them, so the value ends with the first ']]' or ']]}'.
+def array_value_end(file_content, index_x, key_x):
+    empty, end = ('[]', ']]') if key_x == 'DataPlot' else ('{}', ']]}')
+    if file_content.startswith(empty, index_x):
+        return index_x + len(empty)
+    return file_content.index(end, index_x) + len(end)
+
+
+def read_file_header(file_path):
+    """
+    Read the metadata of a response file (.txt) without parsing its arrays.
+
+    The keys are decoded one by one, the values of the arrays are skipped. A file that isn't JSON is read completely.
+
+    Returns:
+    tuple: (dictionary with the metadata, keys of the arrays in the file).
+    """
+    with open(file_path, 'r') as file:
+        file_content = file.read()
+
+    decoder, header, arrays = json.JSONDecoder(), {}, []
+    whitespace = re.compile(r'\s*')
+    try:
+        index = whitespace.match(file_content, 0).end()
+        if file_content[index] != '{':
+            raise ValueError("The file isn't a JSON object.")
+        index = whitespace.match(file_content, index + 1).end()
+        while file_content[index] != '}':
+            key, index = decoder.raw_decode(file_content, index)
+            index = whitespace.match(file_content, index).end()
+            if file_content[index] != ':':
+                raise ValueError("Expected ':'.")
+            index = whitespace.match(file_content, index + 1).end()
+            if key in Rst.array_keys:
+                arrays.append(key)
+                index = array_value_end(file_content, index, key)
+            else:
+                header[key], index = decoder.raw_decode(file_content, index)
+            index = whitespace.match(file_content, index).end()
+            if file_content[index] == ',':
+                index = whitespace.match(file_content, index + 1).end()
+    except (ValueError, IndexError):
+        data_dict = read_file_to_dict(file_path)
+        arrays = [key for key in Rst.array_keys if key in data_dict]
+        header = {key: value for key, value in data_dict.items() if key not in Rst.array_keys}
+    return apply_response_schema(header), arrays
+
+
+# Function to read a response file: binary (.npz, S01_GUI02_A20_ResponseStore.py) or JSON text (.txt).
+# With lazy_x only the metadata is read, the arrays are read the first time they are used (LazyResponse).
+def read_response(file_path, lazy_x=False):
+    if file_path.endswith(Rst.response_extension):
+        return Rst.read_response(file_path, lazy_x = lazy_x, convert_x = response_schema)
+    if lazy_x:
+        header, arrays = read_file_header(file_path)
+        data_dict = {}
+
+        def load(key):
+            if len(data_dict) == 0:
+                data_dict.update(read_file_to_dict(file_path))
+                data_dict['Branches'] = Brn.response_branches(data_dict)
+            return data_dict[key]
+        return Rst.LazyResponse(header, list(arrays) + ['Branches'], load)
+    # The branches (S01_GUI02_A23_Branches.py) are created from DataPlot, the .txt files have the previous layout.
+    data_dict = read_file_to_dict(file_path)
+    data_dict['Branches'] = Brn.response_branches(data_dict)
+    return data_dict
+
+
+# Function to read only the metadata of a response file (code, model, unit, load_type, ...), without the arrays.
+def read_response_header(file_path):
+    if file_path.endswith(Rst.response_extension):
+        return apply_response_schema(Rst.read_header(file_path))
+    return read_file_header(file_path)[0]
+
+
+# Function to convert a response file (.txt) to the binary format (.npz), next to it. Returns the new file path.
+def convert_response_file(file_path):
+    url_file = file_path[:-len(Rst.legacy_extension)] + Rst.response_extension
+    return Rst.write_response(url_file, read_file_to_dict(file_path))
+
+
+# %%% [02-03] CREATE (.NPZ)
+# Function to get the name of the response file. The name change if this is a MinMax material.
+def response_file_name(model_args_x, ID_cyclic_strain, min_max_args_x = []):
+    if len(min_max_args_x) != 0:
+        tags = f"{int(min_max_args_x[2])}_{int(min_max_args_x[1])}"
+    else:
+        tags = f"{int(model_args_x[1])}"
+    return f"MatTag_{tags}_IdStrainLoad_{ID_cyclic_strain}{Rst.response_extension}"
+
+
+def file_txt(url_arg_x, unit_x, model_args_x, load_args_x, ID_cyclic_strain, min_max_args_x = [], record_x = (),
+             engine_x = 'opensees', steps_x = 'fixed'):
     # URL_arg: Directory where save info. of plots.
     load_type, cyclic_type = load_args_x[:2]
 
@@ -413,10 +565,9 @@ ops.uniaxialMaterial('SteelMPF', matTag_{mat_tag}, fyp_{mat_tag}, fyn_{mat_tag},
     
     elif model == 'Steel02':
         model, mat_tag, Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit = model_args_x
-        mat_tag, Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInitg = int(
-            mat_tag), float(Fy), float(E0), float(b), float(R0), 
-        float(cR1), float(cR2), float(a1), float(a2), float(a3), float(a4),
-        float(sigInit)
+        mat_tag, Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit = int(
+            mat_tag), float(Fy), float(E0), float(b), float(R0), float(cR1), float(cR2), float(a1), float(a2), float(
+                a3), float(a4), float(sigInit)
         
         # If there is a MinMax material, it's necessary change the mat_tag
         if len(min_max_args_x) != 0:
@@ -746,31 +897,20 @@ maxStrain_{matTag_minmax}       = {maxStrain}
 
 ops.uniaxialMaterial('MinMax', matTag_minmax_{matTag_minmax}, OtherTag_minmax_{matTag_minmax}, '-min', minStrain_{matTag_minmax}, '-max', maxStrain_{matTag_minmax})
 """
-        # Create file (aux.txt) with data of plot (necessary for extension of data)
-        dictionary = data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x)
+        dictionary = data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x, record_x = record_x,
+                               engine_x = engine_x, steps_x = steps_x)
     
     else:
-        # Create file (aux.txt) with data of plot (necessary for extension of data)
-        dictionary = data_plot(unit_x, model_args_x, load_args_x) 
+        dictionary = data_plot(unit_x, model_args_x, load_args_x, record_x = record_x, engine_x = engine_x,
+                               steps_x = steps_x)
     
-    # Joint dictionaries
-    # file URL with the dictionary
-    URL = "aux_file.txt"
-    # Reads the contents of the file
-    plot = read_file_to_dict(URL)
+    # Data of the plot, taken directly from the dictionary in memory (the branches, DataPlot is created if it's used)
+    plot = {'Branches': dictionary['Branches']}
     # Joint dictionaries 
-    MatInfo = {**load, **material, **plot}
+    MatInfo = Rst.columns_response({**load, **material, **plot})
     
-    # The name of the file change if this is a MinMax material
-    if len(min_max_args_x) != 0:
-        url_file = url_arg_x + f"MatTag_{OtherTag_minmax}_{matTag_minmax}_IdStrainLoad_{ID_cyclic_strain}.txt"
-    else:
-        url_file = url_arg_x + f"MatTag_{mat_tag}_IdStrainLoad_{ID_cyclic_strain}.txt"
-    # Convert numpy arrays to lists for write file .txt
-    MatInfo['DataPlot'] = MatInfo['DataPlot'].tolist()
-    # Write the dictionary to .txt file
-    with open(url_file, 'w') as file:
-        json.dump(MatInfo, file)
+    # Write the arrays in binary and the rest of the dictionary as JSON (.npz), in one operation
+    Rst.write_response(url_arg_x + response_file_name(model_args_x, ID_cyclic_strain, min_max_args_x), MatInfo)
 
     return MatInfo
 
@@ -804,9 +944,9 @@ def generate_strains_2(e_min, e_max, delta_e, pulses):
     return strains
 
 
-# Function remove consecutive duplicates values
+# Function remove consecutive duplicates values, array can be a list and it can be empty.
 def remove_consecutive_duplicates(array):
-    new_array = [array[0]]
+    new_array = list(array[:1])
     for i in range(1, len(array)):
         if array[i] != array[i - 1]:
             new_array.append(array[i])
@@ -898,9 +1038,174 @@ def strain_load(load_args_x):
             strains_D = remove_consecutive_duplicates(strains_D)
             return strains_D
         
-        
+
+
+# Function to test the opensees material along the strain history in a single pass.
+# The material is defined only once and the strains are applied in order, recording the stress
+# after each step. The committed state of the material at step i is the same as replaying the
+# strains 0..i over a new definition, so the results are equal point for point.
+def opensees_stresses(strains_x, model_args_x, min_max_args_x = []):
+    with Mat.domain_lock:
+        # Define test.
+        Mat.test_material(model_args_x, min_max_args_x)
+
+        # Calculate strength
+        stresses_x = []
+        for strain in strains_x:
+            ops.setStrain(strain)
+            stresses_x.append(ops.getStress())
+    return stresses_x
+
+
+# Quantities that can be recorded in the same pass as the stress, see opensees_response().
+# 'secant' doesn't need opensees, it's calculated as stress / strain.
+state_getters = {
+    'tangent': ops.getTangent,
+    'damp_tangent': ops.getDampTangent,
+}
+state_names = list(state_getters) + ['secant']
+
+
+# Function to test the opensees material as opensees_stresses() and record other quantities in the same pass.
+def opensees_response(strains_x, model_args_x, min_max_args_x = [], record_x = ()):
+    """
+    Parameters:
+    record_x (list): Names of state_getters to record after each step.
+
+    Returns:
+    tuple: (stresses, states) where states is a dictionary name -> list with a value per strain.
+    """
+    getters = [state_getters[name] for name in record_x if name in state_getters]
+    if len(getters) == 0:
+        return opensees_stresses(strains_x, model_args_x, min_max_args_x), {}
+
+    with Mat.domain_lock:
+        # Define test.
+        Mat.test_material(model_args_x, min_max_args_x)
+
+        # Calculate strength and the other quantities
+        stresses_x = []
+        states_x = [[] for _ in getters]
+        for strain in strains_x:
+            ops.setStrain(strain)
+            stresses_x.append(ops.getStress())
+            for values, getter in zip(states_x, getters):
+                values.append(getter())
+    names = [name for name in record_x if name in state_getters]
+    return stresses_x, dict(zip(names, states_x))
+
+
+# Engines of data_plot(). 'native' evaluates the models of Nat.native_kernels in python (S01_GUI02_A17_NativeMaterial.py),
+# the other models use opensees with any engine.
+engines = ['opensees', 'native']
+
+
+# Function to calculate the response of the material with the selected engine, see opensees_response().
+def material_response(strains_x, model_args_x, min_max_args_x = [], record_x = (), engine_x = 'opensees'):
+    if engine_x == 'native' and model_args_x[0] in Nat.native_kernels:
+        return Nat.native_response(strains_x, model_args_x, min_max_args_x, record_x)
+    return opensees_response(strains_x, model_args_x, min_max_args_x, record_x)
+
+
+# Number of strains of each chunk of data_plot_stream(), each chunk is one redraw of the plot at most.
+stream_chunk = 200
+
+
+# Function to calculate the response as material_response(), yielding (branch, strains, stresses) each chunk_x strains
+# while opensees advances. branch_x is the pair of columns of DataPlot. Returns (stresses, states) as material_response().
+# The native engine evaluates the whole history at once, so it yields a single chunk.
+def material_response_stream(strains_x, model_args_x, min_max_args_x = [], record_x = (), engine_x = 'opensees',
+                             branch_x = 0, chunk_x = None):
+    if chunk_x is None or (engine_x == 'native' and model_args_x[0] in Nat.native_kernels):
+        stresses_x, states_x = material_response(strains_x, model_args_x, min_max_args_x, record_x, engine_x)
+        if len(strains_x) != 0:
+            yield branch_x, strains_x, stresses_x
+        return stresses_x, states_x
+
+    # The domain is kept between chunks, the consumer of the chunks must not use opensees.
+    # Closing the generator releases it (ej. a cancelled request of the GUI).
+    with Mat.domain_lock:
+        # Define test.
+        Mat.test_material(model_args_x, min_max_args_x)
+
+        # Calculate strength and the other quantities, a chunk at a time
+        getters = [state_getters[name] for name in record_x if name in state_getters]
+        stresses_x = []
+        states_x = [[] for _ in getters]
+        for start in range(0, len(strains_x), chunk_x):
+            strains_chunk = strains_x[start:start + chunk_x]
+            for strain in strains_chunk:
+                ops.setStrain(strain)
+                stresses_x.append(ops.getStress())
+                for values, getter in zip(states_x, getters):
+                    values.append(getter())
+            yield branch_x, strains_chunk, stresses_x[start:]
+    names = [name for name in record_x if name in state_getters]
+    return stresses_x, dict(zip(names, states_x))
+
+
+# Function to get the quantities of a branch of the load (strain, stress and the recorded quantities) with the length
+# of the strains, the missing values are NaN. states_x has the quantities recorded in the branch.
+def branch_quantities(strains_x, stresses_x, states_x, record_x):
+    strains = np.asarray(strains_x, dtype=np.float64)
+    quantities = {'strain': strains, 'stress': np.full(len(strains), np.nan)}
+    quantities['stress'][:len(stresses_x)] = stresses_x
+    for name in record_x:
+        values = np.full(len(strains), np.nan)
+        if name == 'secant':
+            # Secant stiffness, undefined where the strain is 0.
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.where(strains != 0, quantities['stress'] / strains, np.nan)
+        elif name in states_x:
+            values[:len(states_x[name])] = states_x[name]
+        quantities[name] = values
+    return quantities
+
+
+# Strain steps of data_plot(). 'fixed' uses delta_e of the strain load in all the history, 'adaptive' uses it as the
+# smallest step and adjusts the step with the tangent of the material (S01_GUI02_A16_AdaptiveStrain.py).
+steps = ['fixed', 'adaptive']
+
+
 # Calculate stress for graphic
-def data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = []):
+def data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = [], record_x = (), engine_x = 'opensees',
+              steps_x = 'fixed'):
+    return run_stream(data_plot_stream(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x,
+                                       record_x = record_x, engine_x = engine_x, steps_x = steps_x))
+
+
+# Function to exhaust a generator and return its return value, ej. the dictionary of data_plot_stream().
+def run_stream(stream_x):
+    while True:
+        try:
+            next(stream_x)
+        except StopIteration as stop:
+            return stop.value
+
+
+# Calculate stress for graphic as data_plot(), yielding the response while it is calculated.
+def data_plot_stream(unit_x, model_args_x, load_args_x, min_max_args_x = [], record_x = (), engine_x = 'opensees',
+                     chunk_x = None, steps_x = 'fixed'):
+    """
+    Generator version of data_plot(), to plot the response while opensees advances.
+
+    Parameters:
+    chunk_x (int): Number of strains of each chunk, ej. stream_chunk. None yields each branch of the load at once.
+    steps_x (str): One of steps. The adaptive steps need the tangent of opensees, they yield each branch of the load
+                   at once with any engine_x and chunk_x. The user defined models always use fixed steps.
+
+    Yields:
+    tuple: (branch, strains, stresses), branch is the pair of columns of DataPlot (0 compression, 1 tension in a
+           monotonic load). The stresses are in unit_x.
+
+    Returns:
+    dict: The same dictionary as data_plot(), it's the value of StopIteration (see run_stream()).
+    """
+
+    # Adaptive steps
+    if steps_x == 'adaptive' and model_args_x[0] in Mat.material_builders:
+        return (yield from Adp.data_plot_adaptive_stream(unit_x, model_args_x, load_args_x, min_max_args_x,
+                                                         record_x = record_x))
 
     # Extract the arguments
     load_type, cyclic_type = load_args_x[:2]
@@ -912,75 +1217,42 @@ def data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = []):
         # Calculate strains for the monotonic load
         strains_C, strains_T = strain_load(load_args_x)
         stresses_C, stresses_T = [], []
+        states_C, states_T = {}, {}
 
         # Calculate stresses for compression
-        for i in range(len(strains_C)):
-            model = model_args_x[0]
-            # If model is defined in openseespy.
-            if model in models_opss_py:
-                # Define test.
-                exec(open('C_GUI02_uniaxialMaterial/S01_GUI02_A04_2_testUniaxialMaterial.py', encoding='utf8').read())
-                
-                # Calculate strength
-                if i == 0:
-                    ops.setStrain(strains_C[i])
-                else:
-                    for k in range(i + 1):
-                        ops.setStrain(strains_C[k])
-                stresses_C.append(ops.getStress())
-            # If model is defined by user.
-            elif model == 'Saatcioglu(1992)':
-                ec = strains_C[i]
-                # Calculate strength
-                fc = udf.Saatcioglu_1992(unit_x, abs(ec), model_args_x[2:])
-                stresses_C.append(-fc)
-            elif model == 'Mander(1988)':
-                ec = strains_C[i]
-                # Calculate strength
-                fc = udf.Mander_1988(unit_x, abs(ec), model_args_x[2:])
-                stresses_C.append(-fc)
+        model = model_args_x[0]
+        # If model is defined in openseespy.
+        if model in models_opss_py:
+            stresses_C, states_C = yield from material_response_stream(strains_C, model_args_x, min_max_args_x,
+                                                                       record_x, engine_x, 0, chunk_x)
+        # If model is defined by user. The functions evaluate all the strains in one call.
+        if model == 'Saatcioglu(1992)':
+            # Calculate strength
+            fc = udf.Saatcioglu_1992(unit_x, np.abs(strains_C), model_args_x[2:])
+            stresses_C = (-fc).tolist()
+        elif model == 'Mander(1988)':
+            # Calculate strength
+            fc = udf.Mander_1988(unit_x, np.abs(strains_C), model_args_x[2:])
+            stresses_C = (-fc).tolist()
+        # The user defined models are evaluated in one call, they yield a single chunk.
+        if model in ('Saatcioglu(1992)', 'Mander(1988)'):
+            yield 0, strains_C, stresses_C
 
         # Calculate stresses for tension
-        for i in range(len(strains_T)):
-            model = model_args_x[0]
-            # If model is defined in openseespy.
-            if model in models_opss_py:
-                # Define test.
-                exec(open('C_GUI02_uniaxialMaterial/S01_GUI02_A04_2_testUniaxialMaterial.py', encoding='utf8').read())
-                # Calculate strength
-                if i == 0:
-                    ops.setStrain(strains_T[i])
-                else:
-                    for k in range(i + 1):
-                        ops.setStrain(strains_T[k])
-                stresses_T.append(ops.getStress())
-            # If model is defined by user.
-            elif model == 'Belarbi(1994)':
-                ec = strains_T[i]
-                # Calculate strength
-                ft = udf.Belarbi_1994(unit_x, abs(ec), model_args_x[2:])
-                stresses_T.append(ft)
-
-        # Convert the results to numpy arrays
-        strains_C, stresses_C = np.array(strains_C), np.array(stresses_C)
-        strains_T, stresses_T = np.array(strains_T), np.array(stresses_T)
-
-        # Ensure both arrays are the same length by padding with NaNs
-        max_length = max(len(strains_C), len(strains_T))
-
-        def pad_with_nan(array, target_length):
-            padding_length = target_length - len(array)
-            return np.pad(array, (0, padding_length), constant_values=np.nan)
-
-        strains_C = pad_with_nan(strains_C, max_length)
-        stresses_C = pad_with_nan(stresses_C, max_length)
-        strains_T = pad_with_nan(strains_T, max_length)
-        stresses_T = pad_with_nan(stresses_T, max_length)
-
-        # Combine the data into columns
-        data = np.column_stack((strains_C, stresses_C, strains_T, stresses_T))
-        # Create a dictionary to store the data
-        dictionary = {"DataPlot": data}
+        # If model is defined in openseespy.
+        if model in models_opss_py:
+            stresses_T, states_T = yield from material_response_stream(strains_T, model_args_x, min_max_args_x,
+                                                                       record_x, engine_x, 1, chunk_x)
+        # If model is defined by user.
+        if model == 'Belarbi(1994)':
+            # Calculate strength
+            ft = udf.Belarbi_1994(unit_x, np.abs(strains_T), model_args_x[2:])
+            stresses_T = ft.tolist()
+            yield 1, strains_T, stresses_T
+
+        # Branches of the load, each one with its own length (S01_GUI02_A23_Branches.py)
+        layout = Brn.from_branches([('compression', branch_quantities(strains_C, stresses_C, states_C, record_x)),
+                                    ('tension', branch_quantities(strains_T, stresses_T, states_T, record_x))])
 
     elif load_type == 'cyclic':
         if cyclic_type == 'compression':
@@ -988,22 +1260,15 @@ def data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = []):
             strains_C = strain_load(load_args_x)
 
             # Calculate stresses for the cyclic load
-            stresses_C = []
+            stresses_C, states_C = [], {}
+            model = model_args_x[0]
+            # If model is defined in openseespy.
+            if model in models_opss_py:
+                stresses_C, states_C = yield from material_response_stream(strains_C, model_args_x, min_max_args_x,
+                                                                           record_x, engine_x, 0, chunk_x)
             for i in range(len(strains_C)):
-                model = model_args_x[0]
-                # If model is defined in openseespy.
-                if model in models_opss_py:
-                    # Define test.
-                    exec(open('C_GUI02_uniaxialMaterial/S01_GUI02_A04_2_testUniaxialMaterial.py', encoding='utf8').read())
-                    # Calculate strength
-                    if i == 0:
-                        ops.setStrain(strains_C[i])
-                    else:
-                        for k in range(i + 1):
-                            ops.setStrain(strains_C[k])
-                    stresses_C.append(ops.getStress())
                 # If model is defined by user.
-                elif model == 'Saatcioglu(1992)':
+                if model == 'Saatcioglu(1992)':
                     fc = 0  # Saatcioglu only define model under monotonic load.
                     stresses_C.append(fc)
                 elif model == 'Mander(1988)':
@@ -1013,33 +1278,23 @@ def data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = []):
                     fc = 0
                     stresses_C.append(fc)
 
-            # Convert the results to numpy arrays
-            strains_C, stresses_C = np.array(strains_C), np.array(stresses_C)
-            # Combine the data into columns
-            data = np.column_stack((strains_C, stresses_C))
-            # Create a dictionary to store the data
-            dictionary = {"DataPlot": data}
+            # Branches of the load: its cycles
+            layout = Brn.from_cycles(branch_quantities(strains_C, stresses_C, states_C, record_x))
 
         elif cyclic_type == 'traction':
             # Calculate strain for the cyclic load
             strains_T = strain_load(load_args_x)
 
             # Calculate stresses for the cyclic load
-            stresses_T = []
+            stresses_T, states_T = [], {}
+            model = model_args_x[0]
+            # If model is defined in openseespy.
+            if model in models_opss_py:
+                stresses_T, states_T = yield from material_response_stream(strains_T, model_args_x, min_max_args_x,
+                                                                           record_x, engine_x, 0, chunk_x)
             for i in range(len(strains_T)):
-                model = model_args_x[0]
-                # If model is defined in openseespy.
-                if model in models_opss_py:
-                    exec(open('C_GUI02_uniaxialMaterial/S01_GUI02_A04_2_testUniaxialMaterial.py', encoding='utf8').read())
-                    # Calculate strength
-                    if i == 0:
-                        ops.setStrain(strains_T[i])
-                    else:
-                        for k in range(i + 1):
-                            ops.setStrain(strains_T[k])
-                    stresses_T.append(ops.getStress())
                 # If model is defined by user.
-                elif model == 'Saatcioglu(1992)':
+                if model == 'Saatcioglu(1992)':
                     fc = 0
                     stresses_T.append(fc)
                 elif model == 'Mander(1988)':
@@ -1049,34 +1304,23 @@ def data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = []):
                     fc = 0
                     stresses_T.append(fc)
 
-            # Convert the results to numpy arrays
-            strains_T, stresses_T = np.array(strains_T), np.array(stresses_T)
-            # Combine the data into columns
-            data = np.column_stack((strains_T, stresses_T))
-            # Create a dictionary to store the data
-            dictionary = {"DataPlot": data}
+            # Branches of the load: its cycles
+            layout = Brn.from_cycles(branch_quantities(strains_T, stresses_T, states_T, record_x))
 
         elif cyclic_type == 'combined':
             # Calculate strains for the cyclic load
             strains_D = strain_load(load_args_x)
 
             # Calculate stresses for the cyclic load
-            stresses_D = []
+            stresses_D, states_D = [], {}
+            model = model_args_x[0]
+            # If model is defined in openseespy.
+            if model in models_opss_py:
+                stresses_D, states_D = yield from material_response_stream(strains_D, model_args_x, min_max_args_x,
+                                                                           record_x, engine_x, 0, chunk_x)
             for i in range(len(strains_D)):
-                model = model_args_x[0]
-                # If model is defined in openseespy.
-                if model in models_opss_py:
-                    # Define test.
-                    exec(open('C_GUI02_uniaxialMaterial/S01_GUI02_A04_2_testUniaxialMaterial.py', encoding='utf8').read())
-                    # Calculate strength
-                    if i == 0:
-                        ops.setStrain(strains_D[i])
-                    else:
-                        for k in range(i + 1):
-                            ops.setStrain(strains_D[k])
-                    stresses_D.append(ops.getStress())
                 # If model is defined by user.
-                elif model == 'Saatcioglu(1992)':
+                if model == 'Saatcioglu(1992)':
                     fc = 0
                     stresses_D.append(fc)
                 elif model == 'Mander(1988)':
@@ -1086,21 +1330,13 @@ def data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = []):
                     fc = 0
                     stresses_D.append(fc)
 
-            # Convert the results to numpy arrays
-            strains_D, stresses_D = np.array(strains_D), np.array(stresses_D)
-            # Combine the data into columns
-            data = np.column_stack((strains_D, stresses_D))
-            # Create a dictionary to store the data
-            dictionary = {"DataPlot": data}
+            # Branches of the load: its cycles
+            layout = Brn.from_cycles(branch_quantities(strains_D, stresses_D, states_D, record_x))
 
-    # Convert numpy arrays to lists
-    dictionary['DataPlot'] = dictionary['DataPlot'].tolist()
+    # Create a dictionary to store the data: the branches. The previous layout (DataPlot and DataState, pairs of columns
+    # padded with NaN) is created from the branches only if some code uses it (S01_GUI02_A20_ResponseStore.py).
+    dictionary = Rst.columns_response({'Branches': layout})
 
-    # Write the dictionary to a .txt file
-    with open('aux_file.txt', 'w') as file:
-        json.dump(dictionary, file)
-        
-    
     # For fast running, I'm going to return directly the dictionary with the data of the plot.
     # And I'm going to include some necessary data for the plot.
     # Add key unit in the dictionary
@@ -1215,4 +1451,58 @@ if __name__ == '__main__':
         data_dict = read_file_to_dict(url_x)
         print(data_dict)
         
-        
\ No newline at end of file
+        
+    # Example 10: data_plot_stream() gives the same response as data_plot(), the first chunk arrives immediately.
+    run_example_10 = True
+    if run_example_10:
+        import time
+        unit = 'kgf/cm**2'
+        model_args = ['Steel02', 1, '4200', '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '0']
+        load_args = ['cyclic', 'combined', '0.000001', '-0.002', '0.002', '2', '-0.004', '0.004', '2', '-0.006',
+                     '0.006', '2', '0', '0', '0', '0', '0', '0']
+        for load in (load_args, ['monotonic', '-', '0.00001', '-0.008', '0.008']):
+            t0 = time.perf_counter()
+            dictionary = data_plot(unit, model_args, load, record_x = ('tangent',))
+            t1 = time.perf_counter()
+            stream = data_plot_stream(unit, model_args, load, record_x = ('tangent',), chunk_x = stream_chunk)
+            next(stream)
+            t_first = time.perf_counter() - t1
+            dictionary_stream = run_stream(stream)
+            t2 = time.perf_counter()
+            print(f"{load[0]}: data_plot() {t1 - t0:.3f} s, data_plot_stream() {t2 - t1:.3f} s, "
+                  f"first chunk {1000 * t_first:.2f} ms, same response: {dictionary == dictionary_stream}")
+
+    # Example 11: read_file_to_dict() (one pass) vs. the previous parser with string replacements, large cyclic file.
+    run_example_11 = True
+    if run_example_11:
+        import os
+        import time
+        import tempfile
+        unit = 'kgf/cm**2'
+        model_args = ['ConcreteCM', 1, '-250.0', '-0.002', '238751.9633', '7', '1.05', '34.78', '0.0001', '7', '10000', '1']
+        load_args = ['cyclic', 'compression', '0.000001', '-0.001', '2', '-0.002', '2', '-0.003', '2', '-0.004', '2',
+                     '-0.005', '2']
+        dictionary = data_plot(unit, model_args, load_args, record_x = ('tangent',))
+        dictionary = Rst.columns_dictionary(dictionary)  # The .txt files have the previous layout (DataPlot)
+        dictionary['code'] = "ops.uniaxialMaterial('ConcreteCM', matTag_1, -250.0, -0.002, 238751.9633, 7, 1.05, ...)"
+        with tempfile.TemporaryDirectory() as directory:
+            url_x = os.path.join(directory, 'MatTag_1_IdStrainLoad_Default.txt')
+            with open(url_x, 'w') as file:
+                json.dump(dictionary, file)
+            times = {}
+            for parser in [read_file_to_dict, read_file_to_dict_replacements]:
+                t0 = time.perf_counter()
+                data_dict = parser(url_x)
+                times[parser.__name__] = time.perf_counter() - t0
+            data_dict_new, data_dict_old = read_file_to_dict(url_x), read_file_to_dict_replacements(url_x)
+            same = np.array_equal(data_dict_new['DataPlot'], np.array(data_dict_old['DataPlot'], dtype=np.float64),
+                                  equal_nan=True) and data_dict_new['code'] == data_dict_old['code']
+            print(f"{os.path.getsize(url_x) / 1e6:.1f} MB: " +
+                  ", ".join(f"{name} {1000 * t:.0f} ms" for name, t in times.items()) + f", same response: {same}")
+
+            # A file written as a python literal (str() of the dictionary with numpy arrays, short to avoid '...').
+            dictionary['DataPlot'] = np.array(dictionary['DataPlot'])[:200]
+            with open(url_x, 'w') as file:
+                file.write(str({key: dictionary[key] for key in ('DataPlot', 'code', 'model')}))
+            data_dict = read_file_to_dict(url_x)
+            print("python literal:", data_dict['DataPlot'].shape, data_dict['code'] == dictionary['code'])
@@ -10,27 +10,33 @@ COMENTARIOS:    Grafica plots.
 
 
 # %% [01] LIBRARIES
+import io
+import time
 import numpy as np
 import matplotlib.pyplot as plt
+import S01_GUI02_A23_Branches as Brn
 
 
 # %% [02] FUNCTIONS
 
+# Function to get the curves (strains, values) to plot. data_x is an array with a pair of columns for each curve
+# (2 * i, 2 * i + 1), or the branches of a response (S01_GUI02_A23_Branches.py), whose curves are views of its buffers.
+# quantity_x is the quantity of the branches in the vertical axis, ej. 'stress' or 'tangent'.
+def data_curves(data_x, quantity_x='stress'):
+    if isinstance(data_x, Brn.Branches):
+        return [(strains, values) for name, strains, values in data_x.curves(quantity_x)]
+    return [(data_x[:, 2 * i], data_x[:, 2 * i + 1]) for i in range(data_x.shape[1] // 2)]
+
+
 # %%% [02-00] PLOT STRAIN VS STRESS MONOTONIC
-def plot_strain_stress(data_array_x, color_x, label_x, xlabel_x, ylabel_x, grid_x, ax_x=None):
+def plot_strain_stress(data_array_x, color_x, label_x, xlabel_x, ylabel_x, grid_x, ax_x=None, quantity_x='stress'):
     # If no axes object is provided, create a new figure with the specified size and resolution
     if ax_x is None:
         fig_x = plt.figure(figsize=(5.5, 3.2), dpi=100)
         ax_x = fig_x.add_axes([0.145, 0.133, 0.805, 0.827])
 
-    # Determine the number of plots based on the number of columns
-    num_columns_x = data_array_x.shape[1]
-    num_plots_x = num_columns_x // 2
-
-    # Plot each pair of columns
-    for i in range(num_plots_x):
-        x_data_x = data_array_x[:, 2 * i]
-        y_data_x = data_array_x[:, 2 * i + 1]
+    # Plot each curve (pair of columns or branch)
+    for i, (x_data_x, y_data_x) in enumerate(data_curves(data_array_x, quantity_x)):
         if i == 0:
             ax_x.plot(x_data_x, y_data_x, color=color_x, label=label_x)
         else:
@@ -51,7 +57,8 @@ def plot_strain_stress(data_array_x, color_x, label_x, xlabel_x, ylabel_x, grid_
 
 
 # %%% TODO [02-01] PLOT INDEX VS STRAIN
-def plot_index_strain(data_array_x, color_x, label_x, xlabel_x, ylabel_x, grid_x, load_type_x, ax_x=None):
+def plot_index_strain(data_array_x, color_x, label_x, xlabel_x, ylabel_x, grid_x, load_type_x, ax_x=None,
+                      quantity_x='stress'):
     # If no axes object is provided, create a new figure with the specified size and resolution
     if ax_x is None:
         fig_x = plt.figure(figsize=(11, 3.2), dpi=100)
@@ -67,15 +74,9 @@ def plot_index_strain(data_array_x, color_x, label_x, xlabel_x, ylabel_x, grid_x
         ax1_x, ax2_x = ax_x
 
     # PLOT AX1 ################################################################
-    # Determine the number of plots based on the number of columns
-    num_columns_x = data_array_x.shape[1]
-    num_plots_x = num_columns_x // 2
-
-    # Plot each pair of columns
-    for i in range(num_plots_x):
-        x_data_x = data_array_x[:, 2 * i]
+    # Plot each curve (pair of columns or branch)
+    for i, (x_data_x, y_data_x) in enumerate(data_curves(data_array_x, quantity_x)):
         indices = np.arange(x_data_x.size)
-        y_data_x = data_array_x[:, 2 * i + 1]
         if i == 0:
             ax1_x.plot(x_data_x, y_data_x, color=color_x, label=label_x)
             if load_type_x == 'cyclic':
@@ -106,7 +107,8 @@ def plot_index_strain(data_array_x, color_x, label_x, xlabel_x, ylabel_x, grid_x
     
 
 # %%% TODO [02-01] PLOT INDEX VS STRAIN
-def plot_index_strain_video(data_array_x, start_value, color_x, label_x, xlabel_x, ylabel_x, grid_x, load_type_x, line_width, ax_x=None):
+def plot_index_strain_video(data_array_x, start_value, color_x, label_x, xlabel_x, ylabel_x, grid_x, load_type_x, line_width, ax_x=None,
+                            quantity_x='stress'):
     # If no axes object is provided, create a new figure with the specified size and resolution
     if ax_x is None:
         fig_x = plt.figure(figsize=(11, 3.2), dpi=100)
@@ -122,16 +124,10 @@ def plot_index_strain_video(data_array_x, start_value, color_x, label_x, xlabel_
         ax1_x, ax2_x = ax_x
 
     # PLOT AX1 ################################################################
-    # Determine the number of plots based on the number of columns
-    num_columns_x = data_array_x.shape[1]
-    num_plots_x = num_columns_x // 2
-
-    # Plot each pair of columns
-    for i in range(num_plots_x):
-        x_data_x = data_array_x[:, 2 * i]
+    # Plot each curve (pair of columns or branch)
+    for i, (x_data_x, y_data_x) in enumerate(data_curves(data_array_x, quantity_x)):
         # Assuming start_value is the value from which you want to start the indices
         indices = np.arange(start=start_value, stop=start_value + x_data_x.size)
-        y_data_x = data_array_x[:, 2 * i + 1]
         if i == 0:
             # In case that label_x is None, don't show the label
             if label_x is not None:
@@ -197,6 +193,126 @@ def plot_index_strain_only(list_strain, color_x, label_x, grid_x, ax_x=None):
     ax_x.legend()
 
 
+# %%% [02-02] PLOT STRAIN VS VALUE AND INDEX VS VALUE
+# Same figure as plot_index_strain(), for a quantity recorded with the stress (ej. tangent stiffness).
+# ax1: strain vs value. ax2: index vs value.
+def plot_index_value(data_array_x, color_x, label_x, xlabel_x, ylabel_x, grid_x, ax_x=None, quantity_x='stress'):
+    # If no axes object is provided, create a new figure with the specified size and resolution
+    if ax_x is None:
+        fig_x = plt.figure(figsize=(11, 3.2), dpi=100)
+
+        cx_1 = 0.0725
+        wx_1 = 0.4025
+        cx_2 = 0.5765
+        wx_2 = 0.4025
+        ax1_x = fig_x.add_axes([cx_1, 0.133, wx_1, 0.827])
+        ax2_x = fig_x.add_axes([cx_2, 0.133, wx_2, 0.827])
+
+    else:
+        ax1_x, ax2_x = ax_x
+
+    # Plot each curve (pair of columns or branch)
+    for i, (x_data_x, y_data_x) in enumerate(data_curves(data_array_x, quantity_x)):
+        indices = np.arange(y_data_x.size)
+        if i == 0:
+            ax1_x.plot(x_data_x, y_data_x, color=color_x, label=label_x)
+            ax2_x.plot(indices, y_data_x, color=color_x, label=label_x)
+        else:
+            ax1_x.plot(x_data_x, y_data_x, color=color_x)
+            ax2_x.plot(indices, y_data_x, color=color_x)
+
+    # Add labels and grid
+    ax1_x.set_xlabel(xlabel_x)
+    ax1_x.set_ylabel(ylabel_x)
+    ax2_x.set_xlabel("Index")
+    ax2_x.set_ylabel(ylabel_x)
+    if grid_x:
+        ax1_x.grid(True)
+        ax2_x.grid(True)
+
+    # Automatically scale the axes limits based on the data
+    ax1_x.relim()
+    ax1_x.autoscale()
+    ax2_x.relim()
+    ax2_x.autoscale()
+
+    # Show legend
+    ax1_x.legend()
+    ax2_x.legend()
+
+
+# %%% [02-03] PROGRESSIVE PLOT OF STRAIN VS STRESS
+class StreamPlot:
+    """
+    Strain vs stress plot that grows with the chunks of data_plot_stream() (S01_GUI02_A02_2_fileText.py).
+    The figure is redrawn at most fps_x times per second, the first chunk is drawn immediately.
+
+    Parameters:
+    show_x (callable): Function that receives each frame as a .png image (bytes), ej. to display it in the GUI.
+    factor_x (float): Factor of the stresses, ej. to convert them to the graphic unit.
+    fps_x (float): Target frame rate.
+    """
+
+    def __init__(self, show_x, color_x, label_x, xlabel_x, ylabel_x, grid_x, factor_x=1.0, fps_x=8):
+        self.show = show_x
+        self.color = color_x
+        self.label = label_x
+        self.factor = factor_x
+        self.period = 1.0 / fps_x
+        self.fig = plt.figure(figsize=(6.875, 4), dpi=100)
+        self.ax = self.fig.add_axes([0.145, 0.133, 0.805, 0.827])
+        self.ax.set_xlabel(xlabel_x)
+        self.ax.set_ylabel(ylabel_x)
+        if grid_x:
+            self.ax.grid(True)
+        # Same orientation as the final graphic: compression up and to the right.
+        self.ax.invert_xaxis()
+        self.ax.invert_yaxis()
+        self.lines = {}  # branch -> (line, strains, stresses)
+        self.last = None  # Time of the last frame
+        self.frames = 0
+        self.draw_seconds = 0.0  # Time spent drawing the frames
+
+    def add(self, branch_x, strains_x, stresses_x):
+        if branch_x not in self.lines:
+            line, = self.ax.plot([], [], color=self.color, label=self.label if len(self.lines) == 0 else None)
+            self.lines[branch_x] = (line, [], [])
+        line, strains, stresses = self.lines[branch_x]
+        strains.extend(strains_x)
+        stresses.extend(stress * self.factor for stress in stresses_x)
+        if self.last is None or time.perf_counter() - self.last >= self.period:
+            self.draw()
+
+    def draw(self):
+        t0 = time.perf_counter()
+        for line, strains, stresses in self.lines.values():
+            line.set_data(strains, stresses)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        buffer = io.BytesIO()
+        self.fig.savefig(buffer, format='png')
+        self.show(buffer.getvalue())
+        self.frames += 1
+        # The period is counted after drawing, so a slow frame doesn't take the time of the calculation.
+        self.last = time.perf_counter()
+        self.draw_seconds += self.last - t0
+
+    def consume(self, stream_x):
+        """
+        Plot the chunks of stream_x until it ends.
+
+        Returns:
+        The return value of stream_x, ej. the dictionary of data_plot_stream().
+        """
+        try:
+            while True:
+                self.add(*next(stream_x))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            plt.close(self.fig)
+
+
 # %% [03] TEST FUNCTIONS
 
 # %%% [03-00] plot_strain_stress()
@@ -9,102 +9,174 @@ COMENTARIOS:    Define material a testear en openseespy.
 # %% [00] INTRODUCTION
 # Para determinar el nivel de esfuerzo para cierto nivel de deformación,
 # es necesario limpiar el modelo opensees, definir un material, e indicar que
-# se realizara un test al material. Esto se debe repetir diferentes veces,
-# por lo que se ejecutaran estas lineas de codigo desde este script, en
-# atencion a extension original del codigo.
-
-
-# %% [01] CODE
-ops.wipe()
-
-# Select the correct MatTag
-model, MatTag = model_args_x[:2]
-MatTag = int(MatTag)
-# If there is a MinMax material. Use the other mat tag. It is necessary because in the GUI the material tipe in the widgets is the same for the minmax material
-if len(min_max_args_x) != 0:
-    OtherTag_minmax = min_max_args_x[2]
-    OtherTag_minmax = int(OtherTag_minmax)
-    MatTag = OtherTag_minmax
-
-# Define material opensees
-if model == 'ConcreteCM':
-    fpcc, epcc, Ec, rc, xcrn, ft, et, rt, xcrp, GapClose = model_args_x[2:]
-    fpcc, epcc, Ec, rc, xcrn, ft, et, rt, xcrp, GapClose = float(fpcc), float(epcc), float(
-        Ec), float(rc), float(xcrn), float(ft), float(et), float(rt), float(xcrp), int(GapClose)
-    ops.uniaxialMaterial('ConcreteCM', MatTag, fpcc, epcc, Ec, rc, xcrn, ft, et, rt, xcrp, '-GapClose', GapClose)
-
-elif model == 'Concrete07':
-    fc, epsc, Ec, ft, et, xp, xn, r = model_args_x[2:]
-    fc, epsc, Ec, ft, et, xp, xn, r = float(fc), float(epsc), float(Ec), float(ft), float(
-        et), float(xp), float(xn), float(r)
-    ops.uniaxialMaterial('Concrete07', MatTag, fc, epsc, Ec, ft, et, xp, xn, r)
-
-elif model == 'Concrete01':
-    fpc, epsc0, fpcu, epsU = model_args_x[2:]
-    fpc, epsc0, fpcu, epsU = float(fpc), float(epsc0), float(fpcu), float(epsU)
-    ops.uniaxialMaterial('Concrete01', MatTag, fpc, epsc0, fpcu, epsU)
-
-elif model == 'Concrete02':
-    fpc, epsc0, fpcu, epsU, lamb, ft, Ets = model_args_x[2:]
-    fpc, epsc0, fpcu, epsU, lamb, ft, Ets = float(fpc), float(epsc0), float(
-        fpcu), float(epsU), float(lamb), float(ft), float(Ets)
-    ops.uniaxialMaterial('Concrete02', MatTag, fpc, epsc0, fpcu, epsU, lamb, ft, Ets)
-
-elif model == 'SteelMPF':
-    fyp, fyn, E0, bp, bn, R0, cR1, cR2, a1, a2, a3, a4 = model_args_x[2:]
-    fyp, fyn, E0, bp, bn, R0, cR1, cR2, a1, a2, a3, a4 = float(fyp), float(fyn), float(E0), float(
-        bp), float(bn), float(R0), float(cR1), float(cR2), float(a1), float(a2), float(a3), float(a4)
+# se realizara un test al material. Las definiciones de cada material se
+# registran en una tabla (material_builders), por lo que el script se puede
+# importar y usar fuera del namespace del notebook.
+
+
+# %% [01] LIBRARIES
+import threading
+import openseespy.opensees as ops
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] TYPES OF THE ARGUMENTS
+# Types of the parameters of each material, in the same order as model_args_x[2:].
+# See model_arg() from S01_GUI02_A01_uniaxialMaterial.py.
+model_args_types = {
+    'ConcreteCM': [float] * 9 + [int],
+    'Concrete07': [float] * 8,
+    'Concrete01': [float] * 4,
+    'Concrete02': [float] * 7,
+    'SteelMPF': [float] * 12,
+    'Steel02': [float] * 11,
+    'Steel01': [float] * 7,
+    'Steel4': [str] + [float] * 24 + [int],
+}
+
+
+# %%% [02-01] DEFINITION OF MATERIALS
+def concrete_cm(mat_tag, fpcc, epcc, Ec, rc, xcrn, ft, et, rt, xcrp, GapClose):
+    ops.uniaxialMaterial('ConcreteCM', mat_tag, fpcc, epcc, Ec, rc, xcrn, ft, et, rt, xcrp, '-GapClose', GapClose)
+
+
+def concrete_07(mat_tag, fc, epsc, Ec, ft, et, xp, xn, r):
+    ops.uniaxialMaterial('Concrete07', mat_tag, fc, epsc, Ec, ft, et, xp, xn, r)
+
+
+def concrete_01(mat_tag, fpc, epsc0, fpcu, epsU):
+    ops.uniaxialMaterial('Concrete01', mat_tag, fpc, epsc0, fpcu, epsU)
+
+
+def concrete_02(mat_tag, fpc, epsc0, fpcu, epsU, lamb, ft, Ets):
+    ops.uniaxialMaterial('Concrete02', mat_tag, fpc, epsc0, fpcu, epsU, lamb, ft, Ets)
+
+
+def steel_mpf(mat_tag, fyp, fyn, E0, bp, bn, R0, cR1, cR2, a1, a2, a3, a4):
     params = [R0, cR1, cR2]
-    ops.uniaxialMaterial('SteelMPF', MatTag, fyp, fyn, E0, bp, bn, *params, a1, a2, a3, a4)
+    ops.uniaxialMaterial('SteelMPF', mat_tag, fyp, fyn, E0, bp, bn, *params, a1, a2, a3, a4)
 
-elif model == 'Steel02':
-    Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit = model_args_x[2:]
-    Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit = float(Fy), float(E0), float(b), float(
-        R0), float(cR1), float(cR2), float(a1), float(a2), float(a3), float(a4), float(sigInit)
+
+def steel_02(mat_tag, Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit):
     params = [R0, cR1, cR2]
-    ops.uniaxialMaterial('Steel02', MatTag, Fy, E0, b, *params, a1, a2, a3, a4, sigInit)
-
-elif model == 'Steel01':
-    Fy, E0, b, a1, a2, a3, a4 = model_args_x[2:]
-    Fy, E0, b, a1, a2, a3, a4 = float(Fy), float(E0), float(b), float(
-        a1), float(a2), float(a3), float(a4)
-    ops.uniaxialMaterial('Steel01', MatTag, Fy, E0, b, a1, a2, a3, a4)
-
-elif model == 'Steel4':
-    flag, Fy, E0, b_k, R0, r1, r2, b_kc, R0c, r1c, r2c, b_i, rho_i, b_I, R_i, I_yp, b_ic, rho_ic, b_Ic, R_ic, f_u, R_u, f_uc, R_uc, sig_init, cycNum = model_args_x[2:]
-    flag, Fy, E0, b_k, R0, r1, r2, b_kc, R0c, r1c, r2c, b_i, rho_i, b_I, R_i, I_yp, b_ic, rho_ic, b_Ic, R_ic, f_u, R_u, f_uc, R_uc, sig_init, cycNum = str(
-        flag), float(Fy), float(E0), float(b_k), float(R0), float(r1), float(r2), float(b_kc), float(R0c), float(r1c), float(r2c), float(b_i), float(rho_i), float(b_I), float(R_i), float(I_yp), float(b_ic), float(rho_ic), float(b_Ic), float(R_ic), float(f_u), float(R_u), float(f_uc), float(R_uc), float(sig_init), int(cycNum)
-    params = [R0, r1, r2]
-    
+    ops.uniaxialMaterial('Steel02', mat_tag, Fy, E0, b, *params, a1, a2, a3, a4, sigInit)
+
+
+def steel_01(mat_tag, Fy, E0, b, a1, a2, a3, a4):
+    ops.uniaxialMaterial('Steel01', mat_tag, Fy, E0, b, a1, a2, a3, a4)
+
+
+def steel_4(mat_tag, flag, Fy, E0, b_k, R0, r1, r2, b_kc, R0c, r1c, r2c, b_i, rho_i, b_I, R_i, I_yp, b_ic, rho_ic, b_Ic,
+            R_ic, f_u, R_u, f_uc, R_uc, sig_init, cycNum):
     #['-kin', '-iso', '-asym -kin', '-asym -iso', '-kin -ult', '-iso -ult', '-asym -kin -ult', '-asym -iso -ult']
     if flag == '-kin':
-        ops.uniaxialMaterial('Steel4', MatTag, Fy, E0, '-kin', b_k, R0, r1, r2, '-init', sig_init, '-mem', cycNum)
+        ops.uniaxialMaterial('Steel4', mat_tag, Fy, E0, '-kin', b_k, R0, r1, r2, '-init', sig_init, '-mem', cycNum)
     elif flag == '-iso':
-        ops.uniaxialMaterial('Steel4', MatTag, Fy, E0, '-iso', b_i, rho_i, b_I, R_i, I_yp, '-init', sig_init, '-mem', cycNum)
+        ops.uniaxialMaterial('Steel4', mat_tag, Fy, E0, '-iso', b_i, rho_i, b_I, R_i, I_yp, '-init', sig_init, '-mem', cycNum)
     elif flag == '-asym -kin':
-        ops.uniaxialMaterial('Steel4', MatTag, Fy, E0, '-asym', '-kin', b_k, R0, r1, r2, b_kc, R0c, r1c, r2c, '-init', sig_init, '-mem', cycNum)
+        ops.uniaxialMaterial('Steel4', mat_tag, Fy, E0, '-asym', '-kin', b_k, R0, r1, r2, b_kc, R0c, r1c, r2c, '-init', sig_init, '-mem', cycNum)
     elif flag == '-asym -iso':
-        ops.uniaxialMaterial('Steel4', MatTag, Fy, E0, '-asym', '-iso', b_i, rho_i, b_I, R_i, I_yp, b_ic, rho_ic, b_Ic, R_ic, '-init', sig_init, '-mem', cycNum)
+        ops.uniaxialMaterial('Steel4', mat_tag, Fy, E0, '-asym', '-iso', b_i, rho_i, b_I, R_i, I_yp, b_ic, rho_ic, b_Ic, R_ic, '-init', sig_init, '-mem', cycNum)
     elif flag == '-kin -ult':
-        ops.uniaxialMaterial('Steel4', MatTag, Fy, E0, '-kin', b_k, R0, r1, r2, '-ult', f_u, R_u, '-init', sig_init, '-mem', cycNum)
+        ops.uniaxialMaterial('Steel4', mat_tag, Fy, E0, '-kin', b_k, R0, r1, r2, '-ult', f_u, R_u, '-init', sig_init, '-mem', cycNum)
     elif flag == '-iso -ult':
-        ops.uniaxialMaterial('Steel4', MatTag, Fy, E0, '-iso', b_i, rho_i, b_I, R_i, I_yp, '-ult', f_u, R_u, '-init', sig_init, '-mem', cycNum)
+        ops.uniaxialMaterial('Steel4', mat_tag, Fy, E0, '-iso', b_i, rho_i, b_I, R_i, I_yp, '-ult', f_u, R_u, '-init', sig_init, '-mem', cycNum)
     elif flag == '-asym -kin -ult':
-        ops.uniaxialMaterial('Steel4', MatTag, Fy, E0, '-asym', '-kin', b_k, R0, r1, r2, b_kc, R0c, r1c, r2c, '-ult', f_u, R_u, f_uc, R_uc, '-init', sig_init, '-mem', cycNum)
+        ops.uniaxialMaterial('Steel4', mat_tag, Fy, E0, '-asym', '-kin', b_k, R0, r1, r2, b_kc, R0c, r1c, r2c, '-ult', f_u, R_u, f_uc, R_uc, '-init', sig_init, '-mem', cycNum)
     elif flag == '-asym -iso -ult':
-        ops.uniaxialMaterial('Steel4', MatTag, Fy, E0, '-asym', '-iso', b_i, rho_i, b_I, R_i, I_yp, b_ic, rho_ic, b_Ic, R_ic, '-ult', f_u, R_u, f_uc, R_uc, '-init', sig_init, '-mem', cycNum)
-    
-    
-# If there ia a MinMax material
-if len(min_max_args_x) != 0:
+        ops.uniaxialMaterial('Steel4', mat_tag, Fy, E0, '-asym', '-iso', b_i, rho_i, b_I, R_i, I_yp, b_ic, rho_ic, b_Ic, R_ic, '-ult', f_u, R_u, f_uc, R_uc, '-init', sig_init, '-mem', cycNum)
+
+
+# Dispatch table: model name -> function that defines the material in the opensees domain.
+material_builders = {
+    'ConcreteCM': concrete_cm,
+    'Concrete07': concrete_07,
+    'Concrete01': concrete_01,
+    'Concrete02': concrete_02,
+    'SteelMPF': steel_mpf,
+    'Steel02': steel_02,
+    'Steel01': steel_01,
+    'Steel4': steel_4,
+}
+
+
+# %%% [02-02] BUILD AND TEST MATERIAL
+# Function to convert the arguments of the GUI (strings) to the values used by opensees.
+def parse_model_args(model_args_x):
+    """
+    Parse the arguments of the material model.
+
+    Parameters:
+    model_args_x (list): [model, MatTag, *params], as returned by model_arg().
+
+    Returns:
+    tuple: (model, mat_tag, params) with params converted according to model_args_types.
+    """
+    model, mat_tag = model_args_x[:2]
+    if model not in model_args_types:
+        raise ValueError(f"Unknown material model '{model}'.")
+    types = model_args_types[model]
+    if len(model_args_x) - 2 != len(types):
+        raise ValueError(f"The model '{model}' needs {len(types)} parameters, {len(model_args_x) - 2} were given.")
+    params = [type_x(value) for type_x, value in zip(types, model_args_x[2:])]
+    return model, int(mat_tag), params
+
+
+# Function to convert the arguments of the MinMax material.
+def parse_min_max_args(min_max_args_x):
     mat_type_minmax, matTag_minmax, OtherTag_minmax, minStrain, maxStrain = min_max_args_x
-    matTag_minmax, OtherTag_minmax, minStrain, maxStrain = int(matTag_minmax), int(OtherTag_minmax), float(minStrain), float(maxStrain)
-    ops.uniaxialMaterial('MinMax', matTag_minmax, OtherTag_minmax, '-min', minStrain, '-max', maxStrain)
-    
-    ops.testUniaxialMaterial(matTag_minmax)
-    
+    return int(matTag_minmax), int(OtherTag_minmax), float(minStrain), float(maxStrain)
+
+
+# Function to define the material in the current domain
+def build_material(model_args_x, min_max_args_x = []):
+    """
+    Define the material (and the MinMax wrapper, if any) in the current opensees domain.
+
+    Parameters:
+    model_args_x (list): Arguments of the material, as returned by model_arg().
+    min_max_args_x (list): Arguments of the MinMax material, as returned by min_max_model_arg().
+
+    Returns:
+    int: Tag of the material to test.
+    """
+    model, mat_tag, params = parse_model_args(model_args_x)
+
+    # If there is a MinMax material. Use the other mat tag. It is necessary because in the GUI the material type in
+    # the widgets is the same for the minmax material
+    if len(min_max_args_x) != 0:
+        matTag_minmax, OtherTag_minmax, minStrain, maxStrain = parse_min_max_args(min_max_args_x)
+        material_builders[model](OtherTag_minmax, *params)
+        ops.uniaxialMaterial('MinMax', matTag_minmax, OtherTag_minmax, '-min', minStrain, '-max', maxStrain)
+        return matTag_minmax
+
+    material_builders[model](mat_tag, *params)
+    return mat_tag
+
+
+# The domain of opensees is shared by all the scripts. Who defines a test and runs it must have this lock, so other
+# thread doesn't call ops.wipe() in the middle (ej. the worker of the GUI, S01_GUI02_A19_Worker.py).
+domain_lock = threading.RLock()
+
+
+# Function to clean the model, define the material and start the test.
+def test_material(model_args_x, min_max_args_x = []):
+    ops.wipe()
+    mat_tag = build_material(model_args_x, min_max_args_x)
+    ops.testUniaxialMaterial(mat_tag)
+    return mat_tag
+
+
+# %% [03] TEST FUNCTIONS
 
-else:
-    ops.testUniaxialMaterial(MatTag)
+# %%% [03-00] test_material()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    model_args = ['ConcreteCM', 3, '-287.0', '-0.0035', '255810.222626071', '3.5', '1.05', '34.78', '0.0001', '7', '10000', '1']
+    min_max_args = ['MinMax', 4, '3', '-6.0e-3', '1.0e16']
 
-# %%
+    mat_tag = test_material(model_args, min_max_args)
+    for strain in [-0.001, -0.002, -0.0035, -0.007]:
+        ops.setStrain(strain)
+        print(f"MatTag {mat_tag}: strain = {strain}, stress = {ops.getStress()}")
@@ -33,64 +33,59 @@ colors = ['b', 'r', 'g', 'k', 'orange', 'm', 'purple', 'pink', 'brown', 'gray',
           'y', 'indigo', 'c', 'gold', 'teal', 'navy']
 
 graphic_unit = graphic_unit_dropdown.value
+# Value of the vertical axis: 'stress' or a quantity recorded with the stress (DataState), ej. 'tangent'.
+graphic_value = graphic_value_dropdown.value
 id_mat_tag = []
 data_dict = {}
 for index, url in enumerate(selected_files):
     # This conditional is for fast running. Avoid to write a txt file with the data
     # of the model that is already modifying using the GUI.
     # Only graph the data from a txt file if the url is different from 'Dictionary_with_direct_data'.
-    if url == 'Dictionary_with_direct_data':
+    if isinstance(url, dict):
+        data_dict = url  # Dictionary already evaluated, ej. from data_plot_many() (S01_GUI02_A15_MultiMaterial.py)
+    elif url == 'Dictionary_with_direct_data':
         data_dict = dictionary  # Dictionary defined using the parameters of actual GUI
     else:
         url_x = f"{url}"
-        # Reads the contents of the file
-        data_dict = TxT.read_file_to_dict(url_x)
+        # Reads the contents of the file, the arrays are read when they are used (ej. DataState only for its graphic)
+        data_dict = TxT.read_response(url_x, lazy_x = True)
     
     unit = data_dict['unit']
 
-    # Convert stress values to the selected unit
-    data_list = data_dict['DataPlot']
-    data_array = np.array(data_list, dtype=np.float64)
-    # Determine the number of plots based on the number of columns
-    num_columns = data_array.shape[1]
-    num_plots = num_columns // 2
+    # Branches of the response (S01_GUI02_A23_Branches.py), the curves are views of their buffers (strain, stress and
+    # the recorded quantities). The responses without branches (ej. data_plot_many()) are converted from DataPlot.
+    data_array = Brn.response_branches(data_dict)
+    if graphic_value != 'stress' and graphic_value not in data_array.quantities:
+        graph_output.value = f"The {graphic_value} wasn't recorded in the response of MatTag {data_dict['material']['matTag']}."
+        code_params_output.value = ""
+        raise Exception(f"The {graphic_value} wasn't recorded in the response.")
 
-    # Create an empty list to store all the data
-    all_data = []
-    # Apply the conversion factor to each stress column
-    for k in range(num_plots):
-        x_data = data_array[:, 2 * k]
-        # If both are adimensional values, there isn't problem.
-        if unit == "-" and graphic_unit == "-":
-            y_data = data_array[:, 2 * k + 1]
-        # If one of them is adimensional and the other is not, raise an exception.
-        if unit == "-" and graphic_unit != "-":
-            graph_output.value = "The selected graphic unit is not adimensional."
-            code_params_output.value = ""
-            raise Exception("The selected graphic unit is not adimensional.")
-        if unit != "-" and graphic_unit == "-":
-            graph_output.value = "The selected graphic unit is not dimensional."
-            code_params_output.value = ""
-            raise Exception("The selected graphic unit is not dimensional.")
-        # If both are dimensional values, apply the conversion factor.
-        if unit != "-" and graphic_unit != "-":
-            y_data = data_array[:, 2 * k + 1] * unit_factors_new[graphic_unit][unit]
-        # Append the x_data and y_data to the all_data list
-        all_data.append(x_data)
-        all_data.append(y_data)
-    # Stack all the data together
-    data_array = np.column_stack(all_data)
+    # Convert stress values to the selected unit. The stiffness has the same units as the stress.
+    # If one of them is adimensional and the other is not, raise an exception.
+    if unit == "-" and graphic_unit != "-":
+        graph_output.value = "The selected graphic unit is not adimensional."
+        code_params_output.value = ""
+        raise Exception("The selected graphic unit is not adimensional.")
+    if unit != "-" and graphic_unit == "-":
+        graph_output.value = "The selected graphic unit is not dimensional."
+        code_params_output.value = ""
+        raise Exception("The selected graphic unit is not dimensional.")
+    # If both are dimensional values, apply the conversion factor (only this quantity is copied, scaled).
+    if unit != "-" and graphic_unit != "-":
+        data_array = data_array.scaled(graphic_value, unit_factors_new[graphic_unit][unit])
 
     # Define graphic properties
-    color = colors[index]
+    color = colors[index % len(colors)]
     label = data_dict['model']
 
-    xlabel, ylabel = 'strain', f'stress [{graphic_unit}]'
+    xlabel, ylabel = 'strain', f'{graphic_value} [{graphic_unit}]'
     grid = True
 
     # Graphic.
     if aux_ax == 1:
-        Grf.plot_strain_stress(data_array, color, label, xlabel, ylabel, grid, ax)
+        Grf.plot_strain_stress(data_array, color, label, xlabel, ylabel, grid, ax, quantity_x = graphic_value)
+    elif aux_ax == 2 and graphic_value != 'stress':
+        Grf.plot_index_value(data_array, color, label, xlabel, ylabel, grid, ax, quantity_x = graphic_value)
     elif aux_ax == 2:
         Grf.plot_index_strain(data_array, color, label, xlabel, ylabel, grid, data_dict['load_type'], ax)
     elif aux_ax == 3:
@@ -118,19 +113,21 @@ for index, url in enumerate(selected_files):
         
         # To stop the graphic when the strain is 0, I'm going to make mutiples frames (15) 
         # for the values where the strain is 0.
-        # Find indices where the strain (first column) is exactly 0
-        zero_indices = np.where(data_array[:, 0] == 0.0)[0]
+        # Find indices where the strain is exactly 0 (the rows of the branches, a view of the buffer)
+        zero_indices = np.where(data_array.curves()[0][1] == 0.0)[0]
         
         # aux_zero_indices = 1  # Auxiliar to plot more than one frame for zero values. 
         
         # Make a video. Take a for cycle that iterates over the data_array and plot each curves.
         step_frames = 3  # Adjust the numbers of rows that involve a frame.
         id_image = 0  # Counter for the image name.
-        for i in range(0, data_array.shape[0], step_frames):
+        for i in range(0, data_array.points, step_frames):
             # Calculate the index of the last zero value before i
             aux_zero_indices = len(np.where(zero_indices < i)[0])
             
-            graph_output.value = f'Making frames: {i} of {data_array.shape[0]} frames.'
+            graph_output.value = f'Making frames: {i} of {data_array.points} frames.'
+            # A newer request of the GUI stops the video (S01_GUI02_A19_Worker.py).
+            worker.check()
             
             if i >= (zero_indices[aux_zero_indices] - int(step_frames-1)) and \
             i < (zero_indices[aux_zero_indices] + int(step_frames-1)) and \
@@ -176,15 +173,15 @@ for index, url in enumerate(selected_files):
                     ax2.clear()
                     
                     if aux_zero_indices == 1 or aux_zero_indices == 2:
-                        data_array_first_part = data_array[:fin_ciclos_inactivos_b, :]
-                        data_array_second_part = data_array[fin_ciclos_inactivos:fin_ciclo_activo, :]
+                        data_array_first_part = data_array.rows(0, fin_ciclos_inactivos_b)
+                        data_array_second_part = data_array.rows(fin_ciclos_inactivos, fin_ciclo_activo)
                         Grf.plot_index_strain_video(data_array_first_part, 0, color_grey_rgba, None, xlabel, ylabel, grid, data_dict['load_type'], line_width_thin, ax)
                         Grf.plot_index_strain_video(data_array_second_part, fin_ciclos_inactivos, color_transition, label, xlabel, ylabel, grid, data_dict['load_type'], line_width_transition, ax)
                         
                     else:
-                        data_array_first_part = data_array[:fin_ciclos_inactivos_2_b, :]
-                        data_array_second_part = data_array[fin_ciclos_inactivos_2:fin_ciclos_inactivos_b, :]
-                        data_array_third_part = data_array[fin_ciclos_inactivos:fin_ciclo_activo, :]
+                        data_array_first_part = data_array.rows(0, fin_ciclos_inactivos_2_b)
+                        data_array_second_part = data_array.rows(fin_ciclos_inactivos_2, fin_ciclos_inactivos_b)
+                        data_array_third_part = data_array.rows(fin_ciclos_inactivos, fin_ciclo_activo)
 
                         Grf.plot_index_strain_video(data_array_first_part, 0, color_grey_rgba, None, xlabel, ylabel, grid, data_dict['load_type'], line_width_thin, ax)
                         Grf.plot_index_strain_video(data_array_second_part, fin_ciclos_inactivos_2, color_grey_rgba, None, xlabel, ylabel, grid, data_dict['load_type'], line_width_thin, ax)
@@ -204,8 +201,8 @@ for index, url in enumerate(selected_files):
                 fin_ciclos_inactivos_b = fin_ciclos_inactivos + 1
                 
                 if fin_ciclos_inactivos != i:
-                    data_array_first_part = data_array[:fin_ciclos_inactivos_b, :]
-                    data_array_second_part = data_array[fin_ciclos_inactivos:i, :]
+                    data_array_first_part = data_array.rows(0, fin_ciclos_inactivos_b)
+                    data_array_second_part = data_array.rows(fin_ciclos_inactivos, i)
                     ax1.clear()
                     ax2.clear()
                     Grf.plot_index_strain_video(data_array_first_part, 0, color_grey_rgba, None, xlabel, ylabel, grid, data_dict['load_type'], line_width_thin, ax)
@@ -228,29 +225,36 @@ for index, url in enumerate(selected_files):
 url = r'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/img_MatTag'
 for i in id_mat_tag:
     url = url + '_' + str(i)
-url = url + '_' + data_dict['load_type'] + '_' + data_dict['cyclic_type'] + '.png'
+url = url + '_' + data_dict['load_type'] + '_' + data_dict['cyclic_type']
+if graphic_value != 'stress':
+    url = url + '_' + graphic_value
+url = url + '.png'
 # Annotation
 graph_output.value = str(url)
 
-# Invert axes
+# Invert axes. The stiffness is positive in tension and compression, its axis isn't inverted.
 if aux_ax == 1:
     ax.invert_xaxis()
-    ax.invert_yaxis()
+    if graphic_value == 'stress':
+        ax.invert_yaxis()
 elif aux_ax == 2:
     ax1.invert_xaxis()
-    ax1.invert_yaxis()
-    ax2.invert_yaxis()
+    if graphic_value == 'stress':
+        ax1.invert_yaxis()
+        ax2.invert_yaxis()
 
 # Save
 plt.savefig(url)
 plt.close()
 
+# The outputs are replaced, 'with out:' doesn't capture the display of the worker thread. It also replaces the last
+# frame of the progressive graphic (see show_material_model()).
 if aux_ax == 1 or aux_ax == 2:
     # Display the image
-    with out:
-        display(Image(filename=url))
+    out.outputs = ()
+    out.append_display_data(Image(filename=url))
 
 elif aux_ax == 3:
     # Display the video
-    with out:
-        display(Video('C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/Cyclic_Video.mp4', embed=True))
\ No newline at end of file
+    out.outputs = ()
+    out.append_display_data(Video('C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/Cyclic_Video.mp4', embed=True))
\ No newline at end of file
@@ -8,26 +8,40 @@ COMENTARIOS:    Define material en base a modelo definido por usuario.
 
 # %% [00] INTRODUCTION
 # User defined material to adjust the openseespy material into the GUI.
+# The functions take a strain (float) or a vector of strains (numpy array) and return the stress with the same
+# shape. The constants of each model are calculated once per call and the branches of the curves are evaluated
+# with masks, so a whole strain history is evaluated in one call.
 
-# %% [01] USER DEFINED FUNCTIONS
+# %% [01] LIBRARIES
+import numpy as np
 
-# %%% [01-00] Saatcioglu (1992)
+
+# %% [02] USER DEFINED FUNCTIONS
+
+# Unified unit for requirements in User Defined Functions
+unit_factors_new = {
+    'kgf/cm**2': {'kgf/cm**2': 1, 'tonf/m**2': 0.1, 'ksi': 70.3069579639159, 'psi': 0.070306957963916,
+                  'Pa': 0.00001019716213, 'MPa': 10.1971621297793},
+    'tonf/m**2': {'kgf/cm**2': 10, 'tonf/m**2': 1, 'ksi': 703.069579639159, 'psi': 0.703069579639159,
+                  'Pa': 0.000101971621298, 'MPa': 101.971621297793},
+    'ksi': {'kgf/cm**2': 0.014223343307, 'tonf/m**2': 0.0014223343307, 'ksi': 1, 'psi': 0.001,
+            'Pa': 0.000000145037738, 'MPa': 0.145037737730209},
+    'psi': {'kgf/cm**2': 14.223343307, 'tonf/m**2': 1.4223343307, 'ksi': 1000, 'psi': 1, 'Pa': 0.000145037737730,
+            'MPa': 145.037737730209},
+    'Pa': {'kgf/cm**2': 98066.5, 'tonf/m**2': 9806.65, 'ksi': 6894757.29316836, 'psi': 6894.75729316836, 'Pa': 1,
+           'MPa': 1000000},
+    'MPa': {'kgf/cm**2': 0.0980665, 'tonf/m**2': 0.00980665, 'ksi': 6.89475729316836, 'psi': 0.00689475729316836,
+            'Pa': 0.000001, 'MPa': 1}
+}
+
+
+# Function to return a float if the strain was a float, or the array if the strains were an array.
+def same_shape(ec_x, fc_x):
+    return float(fc_x) if np.ndim(ec_x) == 0 else fc_x
+
+
+# %%% [02-00] Saatcioglu (1992)
 def Saatcioglu_1992(unit_x, ec, args_x):
-    # Unified unit for requirements in User Defined Functions
-    unit_factors_new = {
-        'kgf/cm**2': {'kgf/cm**2': 1, 'tonf/m**2': 0.1, 'ksi': 70.3069579639159, 'psi': 0.070306957963916,
-                      'Pa': 0.00001019716213, 'MPa': 10.1971621297793},
-        'tonf/m**2': {'kgf/cm**2': 10, 'tonf/m**2': 1, 'ksi': 703.069579639159, 'psi': 0.703069579639159,
-                      'Pa': 0.000101971621298, 'MPa': 101.971621297793},
-        'ksi': {'kgf/cm**2': 0.014223343307, 'tonf/m**2': 0.0014223343307, 'ksi': 1, 'psi': 0.001,
-                'Pa': 0.000000145037738, 'MPa': 0.145037737730209},
-        'psi': {'kgf/cm**2': 14.223343307, 'tonf/m**2': 1.4223343307, 'ksi': 1000, 'psi': 1, 'Pa': 0.000145037737730,
-                'MPa': 145.037737730209},
-        'Pa': {'kgf/cm**2': 98066.5, 'tonf/m**2': 9806.65, 'ksi': 6894757.29316836, 'psi': 6894.75729316836, 'Pa': 1,
-               'MPa': 1000000},
-        'MPa': {'kgf/cm**2': 0.0980665, 'tonf/m**2': 0.00980665, 'ksi': 6.89475729316836, 'psi': 0.00689475729316836,
-                'Pa': 0.000001, 'MPa': 1}
-    }
     fco, fl, e01, rho, e085 = args_x  # See data_plot() from S01_GUI02_A02_2_fileText.py. And model_arg() from S01_GUI02_A01_uniaxialMaterial.py. 
     fco, fl, e01, rho, e085 = float(fco), float(fl), float(e01), float(rho), float(e085)
     # Units conversion
@@ -42,21 +56,20 @@ def Saatcioglu_1992(unit_x, ec, args_x):
     e1 = e01 * (1 + 5*K)
     # 3. Calculate e85 using Eq (14):
     e85 = 260 * rho * e1 + e085
+
+    ec_array = np.asarray(ec, dtype=np.float64)
+    fc = np.empty_like(ec_array)
+    ascending = ec_array <= e1
     # 4. Calculate fc for the parabolic ascending portion using Eq (16):
-    if ec <= e1:
-        fc = fcc * (2*(ec/e1) - (ec/e1)**2) ** (1/(1 + 2*K))
-        if fc > fcc:
-            fc = fcc
+    x = ec_array[ascending] / e1
+    fc[ascending] = np.minimum(fcc * (2*x - x**2) ** (1/(1 + 2*K)), fcc)
     # 5. Calculate fc for the linear descending segment:
-    else:
-        fc = fcc * (1 - 0.15/(e85 - e1) * (ec - e1))
     # 6. Calculate residual strength:
-        if fc < 0.2 * fcc:
-            fc = 0.2 * fcc
-    return fc * unit_factors_new[unit_x]['MPa']  # Return to the original system of units.
+    fc[~ascending] = np.maximum(fcc * (1 - 0.15/(e85 - e1) * (ec_array[~ascending] - e1)), 0.2 * fcc)
+    return same_shape(ec, fc * unit_factors_new[unit_x]['MPa'])  # Return to the original system of units.
 
 
-# %%% [01-01] Mander (1988)
+# %%% [02-01] Mander (1988)
 def Mander_1988(unit_x, ec, args_x):
     fco, CSR, eco, Ec = args_x  # See data_plot() from S01_GUI02_A02_2_fileText.py. And model_arg() from S01_GUI02_A01_uniaxialMaterial.py. 
     fco, CSR, eco, Ec = float(fco), float(CSR), float(eco), float(Ec)
@@ -69,31 +82,16 @@ def Mander_1988(unit_x, ec, args_x):
     Esec = fcc/ecc
     # 4. Calculate r using Eq (6):
     r = Ec / (Ec - Esec)
-    # For each value of ec, steps 5 and 6 are repeated:
+    # For all the values of ec, steps 5 and 6:
     # 5. Calculate x using Eq (4):
-    x = ec / ecc
+    x = np.asarray(ec, dtype=np.float64) / ecc
     # 6. Calculate fc using Eq (3):
     fc = (fcc * x * r) / (r - 1 + x**r)
-    return fc
+    return same_shape(ec, fc)
 
 
-# %%% [01-02] Belarbi (1994)
+# %%% [02-02] Belarbi (1994)
 def Belarbi_1994(unit_x, ec, args_x):
-    # Unified unit for requirements in User Defined Functions
-    unit_factors_new = {
-        'kgf/cm**2': {'kgf/cm**2': 1, 'tonf/m**2': 0.1, 'ksi': 70.3069579639159, 'psi': 0.070306957963916,
-                      'Pa': 0.00001019716213, 'MPa': 10.1971621297793},
-        'tonf/m**2': {'kgf/cm**2': 10, 'tonf/m**2': 1, 'ksi': 703.069579639159, 'psi': 0.703069579639159,
-                      'Pa': 0.000101971621298, 'MPa': 101.971621297793},
-        'ksi': {'kgf/cm**2': 0.014223343307, 'tonf/m**2': 0.0014223343307, 'ksi': 1, 'psi': 0.001,
-                'Pa': 0.000000145037738, 'MPa': 0.145037737730209},
-        'psi': {'kgf/cm**2': 14.223343307, 'tonf/m**2': 1.4223343307, 'ksi': 1000, 'psi': 1, 'Pa': 0.000145037737730,
-                'MPa': 145.037737730209},
-        'Pa': {'kgf/cm**2': 98066.5, 'tonf/m**2': 9806.65, 'ksi': 6894757.29316836, 'psi': 6894.75729316836, 'Pa': 1,
-               'MPa': 1000000},
-        'MPa': {'kgf/cm**2': 0.0980665, 'tonf/m**2': 0.00980665, 'ksi': 6.89475729316836, 'psi': 0.00689475729316836,
-                'Pa': 0.000001, 'MPa': 1}
-    }
     fcr, eps_cr, Ecr = args_x  # See data_plot() from S01_GUI02_A02_2_fileText.py. And model_arg() from S01_GUI02_A01_uniaxialMaterial.py. 
     fcr, eps_cr, Ecr = float(fcr), float(eps_cr), float(Ecr)
     
@@ -102,9 +100,10 @@ def Belarbi_1994(unit_x, ec, args_x):
     Ecr = Ecr * unit_factors_new['MPa'][unit_x]
     
     # 1. Calculate fc:
-    if ec <= eps_cr:
-        fc = Ecr * ec
-    else:
-        fc = fcr * ((eps_cr)/(ec)) ** 0.4
+    ec_array = np.asarray(ec, dtype=np.float64)
+    fc = np.empty_like(ec_array)
+    cracked = ec_array > eps_cr
+    fc[~cracked] = Ecr * ec_array[~cracked]
+    fc[cracked] = fcr * ((eps_cr)/(ec_array[cracked])) ** 0.4
     
-    return fc * unit_factors_new[unit_x]['MPa']  # Return to the original system of units.
+    return same_shape(ec, fc * unit_factors_new[unit_x]['MPa'])  # Return to the original system of units.
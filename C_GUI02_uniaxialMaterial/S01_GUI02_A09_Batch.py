@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A09_Batch.py
+COMENTARIOS:    Evalua muchas combinaciones material/carga en paralelo.
+"""
+
+# %% [00] INTRODUCTION
+# openseespy mantiene un unico dominio global por proceso, por lo que cada curva
+# se evalua en un proceso independiente (cada uno con su propio dominio). Si un
+# proceso falla dentro de OpenSees (ej. segfault), el notebook sigue funcionando
+# y solo la combinacion que fallo queda marcada con un error.
+
+
+# %% [01] LIBRARIES
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import S01_GUI02_A02_2_fileText as TxT
+import S01_GUI02_A20_ResponseStore as Rst
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] JOBS
+# Function executed in the worker process. A job is (unit, model_args, load_args, min_max_args).
+# See data_plot() from S01_GUI02_A02_2_fileText.py.
+def evaluate_job(job):
+    unit_x, model_args_x, load_args_x, min_max_args_x = job
+    return TxT.data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x)
+
+
+# Function executed in the worker process to save the response in a file. A job is (url_args, unit, model_args,
+# load_args, ID_cyclic_strain, min_max_args), see file_txt(). Returns the dictionary saved without the arrays.
+def file_job(job):
+    url_arg_x, unit_x, model_args_x, load_args_x, ID_cyclic_strain, min_max_args_x = job
+    MatInfo = TxT.file_txt(url_arg_x, unit_x, model_args_x, load_args_x, ID_cyclic_strain,
+                           min_max_args_x = min_max_args_x)
+    return {key: value for key, value in MatInfo.items() if key not in Rst.array_keys}
+
+
+# Function to describe a job that couldn't be evaluated.
+def error_result(job, message):
+    return {"error": message, "job": list(job)}
+
+
+# %%% [02-01] POOL OF PROCESSES
+# Function to run the jobs in a pool of processes and yield (index, result) as they complete.
+# The indices of the jobs lost because a worker died are returned in the list crashed_x.
+def _run_pool(jobs_x, indices_x, max_workers, function_x, crashed_x):
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(function_x, jobs_x[index]): index for index in indices_x}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result()
+            except BrokenProcessPool:
+                crashed_x.append(index)
+            except Exception as e:
+                yield index, error_result(jobs_x[index], f"{type(e).__name__}: {e}")
+
+
+def iter_batch(jobs, max_workers=None, function_x=evaluate_job):
+    """
+    Evaluate the jobs in a pool of worker processes and yield the results as they complete.
+
+    Parameters:
+    jobs (list): List of jobs (unit, model_args, load_args, min_max_args).
+    max_workers (int): Number of worker processes. None uses the number of cores.
+    function_x (callable): Function executed for each job. It must be importable by the workers.
+
+    Yields:
+    tuple: (index of the job, result). A job that fails returns a dictionary with the key "error".
+    """
+    jobs = list(jobs)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(jobs) or 1))
+
+    # First run: all the jobs in parallel.
+    crashed = []
+    yield from _run_pool(jobs, range(len(jobs)), max_workers, function_x, crashed)
+
+    # A crashed worker breaks the whole pool, so the unfinished jobs are run again in a new pool.
+    if crashed:
+        retry, crashed = sorted(crashed), []
+        yield from _run_pool(jobs, retry, max_workers, function_x, crashed)
+
+    # If the pool breaks again, run each remaining job alone to find the job that crashes the process.
+    for index in sorted(crashed):
+        isolated = []
+        yield from _run_pool(jobs, [index], 1, function_x, isolated)
+        if isolated:
+            yield index, error_result(jobs[index], "The worker process crashed.")
+
+
+def run_batch(jobs, max_workers=None, function_x=evaluate_job):
+    """
+    Evaluate the jobs in a pool of worker processes and return the results in the order of the jobs.
+    See iter_batch().
+    """
+    jobs = list(jobs)
+    results = [None] * len(jobs)
+    for index, result in iter_batch(jobs, max_workers=max_workers, function_x=function_x):
+        results[index] = result
+    return results
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] run_batch()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import time
+
+    unit = 'kgf/cm**2'
+    load_args = ['cyclic', 'combined', '0.0001', '-0.002', '0.002', '2', '-0.004', '0.004', '2', '-0.006', '0.006', '2',
+                 '0', '0', '0', '0', '0', '0']
+    jobs = []
+    for i, Fy in enumerate(range(2800, 5000, 200)):
+        model_args = ['Steel02', i + 1, str(Fy), '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '0']
+        jobs.append((unit, model_args, load_args, []))
+
+    t0 = time.perf_counter()
+    results = run_batch(jobs)
+    print(f"{len(results)} jobs in {time.perf_counter() - t0:.2f} s")
+    for result in results:
+        print(result['material']['matTag'], result['Branches'].points)
+
+# %%% [03-01] run_batch() with file_job()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import tempfile
+
+    # Each worker writes its own file, without shared auxiliary files.
+    with tempfile.TemporaryDirectory() as directory:
+        file_jobs = [(directory + '/', unit, model_args, load_args, 'Default', []) for unit, model_args, load_args, _ in jobs]
+        t0 = time.perf_counter()
+        results = run_batch(file_jobs, function_x=file_job)
+        files = sorted(Rst.list_responses(directory))
+        print(f"{len(files)} files in {time.perf_counter() - t0:.2f} s, errors: {[r for r in results if 'error' in r]}")
+        print([TxT.read_response(os.path.join(directory, file))['Branches'].points for file in files])
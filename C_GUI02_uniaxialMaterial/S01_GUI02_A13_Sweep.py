@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A13_Sweep.py
+COMENTARIOS:    Barrido de parametros de un material bajo una misma carga.
+"""
+
+# %% [00] INTRODUCTION
+# Estudia como cambia la respuesta de un material al variar uno o mas parametros
+# de model_arg() (incluso los categoricos, ej. flag de Steel4 o GapClose de
+# ConcreteCM). Las variantes se evaluan en paralelo (S01_GUI02_A09_Batch.py), o
+# todas a la vez con engine='batch' para los modelos de
+# S01_GUI02_A18_BatchedMaterial.py, y todas las respuestas se guardan en un
+# unico archivo (.npz).
+
+
+# %% [01] LIBRARIES
+import json
+import itertools
+import numpy as np
+import S01_GUI02_A04_2_testUniaxialMaterial as Mat
+import S01_GUI02_A09_Batch as Bat
+import S01_GUI02_A18_BatchedMaterial as Bmat
+import S01_GUI02_A23_Branches as Brn
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] NAMES OF THE PARAMETERS
+# Names of the parameters of each model, in the same order as model_args[2:].
+# See model_arg() from S01_GUI02_A01_uniaxialMaterial.py.
+model_args_names = {
+    'ConcreteCM': ['fpcc', 'epcc', 'Ec', 'rc', 'xcrn', 'ft', 'et', 'rt', 'xcrp', 'GapClose'],
+    'Concrete07': ['fc', 'epsc', 'Ec', 'ft', 'et', 'xp', 'xn', 'r'],
+    'Concrete01': ['fpc', 'epsc0', 'fpcu', 'epscu'],
+    'Concrete02': ['fpc', 'epsc0', 'fpcu', 'epscu', 'lambda', 'ft', 'Ets'],
+    'SteelMPF': ['fyp', 'fyn', 'E0', 'bp', 'bn', 'R0', 'cR1', 'cR2', 'a1', 'a2', 'a3', 'a4'],
+    'Steel02': ['Fy', 'E0', 'b', 'R0', 'cR1', 'cR2', 'a1', 'a2', 'a3', 'a4', 'sigInit'],
+    'Steel01': ['Fy', 'E0', 'b', 'a1', 'a2', 'a3', 'a4'],
+    'Steel4': ['flag', 'Fy', 'E0', 'b_k', 'R0', 'r1', 'r2', 'b_kc', 'R0c', 'r1c', 'r2c', 'b_i', 'rho_i', 'b_I', 'R_i',
+               'I_yp', 'b_ic', 'rho_ic', 'b_Ic', 'R_ic', 'f_u', 'R_u', 'f_uc', 'R_uc', 'sig_init', 'cycNum'],
+    'Saatcioglu(1992)': ['fco', 'fl', 'e01', 'rho', 'e085'],
+    'Mander(1988)': ['fco', 'CSR', 'eco', 'Ec'],
+    'Belarbi(1994)': ['fcr', 'eps_cr', 'Ecr'],
+}
+
+# Names of the parameters of the MinMax material that can be swept, position in min_max_args.
+min_max_args_names = {'minStrain': 3, 'maxStrain': 4}
+
+
+# %%% [02-01] DESIGN OF THE SWEEP
+# Function to create the values of each variant.
+def design_points(space, design='grid', n_samples=None, seed=None):
+    """
+    Create the parameter values of each variant of the sweep.
+
+    Parameters:
+    space (dict): name -> list of values (levels or categories), or tuple (low, high) for a range.
+                  In a 'grid' design a range must be (low, high, n_levels).
+    design (str): 'grid' (full factorial), 'lhs' (Latin hypercube) or 'random'.
+    n_samples (int): Number of variants for the 'lhs' and 'random' designs.
+    seed (int): Seed of the random generator.
+
+    Returns:
+    list: One dictionary name -> value per variant.
+    """
+    names = list(space)
+
+    if design == 'grid':
+        levels = []
+        for name in names:
+            spec = space[name]
+            if isinstance(spec, tuple):
+                if len(spec) != 3:
+                    raise ValueError(f"The range of '{name}' in a grid design must be (low, high, n_levels).")
+                levels.append(np.linspace(spec[0], spec[1], int(spec[2])).tolist())
+            else:
+                levels.append(list(spec))
+        return [dict(zip(names, values)) for values in itertools.product(*levels)]
+
+    if design not in ('lhs', 'random'):
+        raise ValueError(f"Unknown design '{design}'. Use 'grid', 'lhs' or 'random'.")
+    if not n_samples:
+        raise ValueError(f"The design '{design}' needs n_samples.")
+
+    # Sample the unit interval: one stratum per variant in a Latin hypercube, uniform in random.
+    rng = np.random.default_rng(seed)
+    if design == 'lhs':
+        u = (np.array([rng.permutation(n_samples) for _ in names]).T + rng.random((n_samples, len(names)))) / n_samples
+    else:
+        u = rng.random((n_samples, len(names)))
+
+    points = [{} for _ in range(n_samples)]
+    for j, name in enumerate(names):
+        spec = space[name]
+        if isinstance(spec, tuple):
+            low, high = spec[:2]
+            values = (low + u[:, j] * (high - low)).tolist()
+        else:
+            spec = list(spec)
+            values = [spec[k] for k in np.minimum((u[:, j] * len(spec)).astype(int), len(spec) - 1)]
+        for point, value in zip(points, values):
+            point[name] = value
+    return points
+
+
+# Function to create the arguments of a variant.
+def variant_args(model_args_x, min_max_args_x, point):
+    names = model_args_names[model_args_x[0]]
+    model_args_v, min_max_args_v = list(model_args_x), list(min_max_args_x)
+    for name, value in point.items():
+        if name in names:
+            model_args_v[2 + names.index(name)] = str(value)
+        elif name in min_max_args_names and len(min_max_args_v) != 0:
+            min_max_args_v[min_max_args_names[name]] = str(value)
+        else:
+            raise KeyError(f"'{name}' is not a parameter of {model_args_x[0]}.")
+    return model_args_v, min_max_args_v
+
+
+# %%% [02-02] SWEEP
+# Function to evaluate the variants with the batched engine. Returns (DataPlot (M, N, C), errors), a variant with
+# parameters that can't be parsed is NaN and has an error.
+def batch_sweep(jobs_x):
+    params, limits, errors, valid = [], [], {}, []
+    for index, (unit_v, model_args_v, load_args_v, min_max_args_v) in enumerate(jobs_x):
+        # Parse everything before appending, so params and limits stay aligned with valid.
+        try:
+            params_v = Mat.parse_model_args(model_args_v)[2]
+            limits_v = Mat.parse_min_max_args(min_max_args_v)[2:] if len(min_max_args_v) != 0 else None
+        except (ValueError, TypeError) as e:
+            errors[index] = f"{type(e).__name__}: {e}"
+            continue
+        params.append(params_v)
+        if limits_v is not None:
+            limits.append(limits_v)
+        valid.append(index)
+
+    if len(valid) == 0:
+        return np.full((len(jobs_x), 0, 0), np.nan), errors
+    model_x, load_args_x = jobs_x[0][1][0], jobs_x[0][2]
+    data_valid = Bmat.batch_data_plot(model_x, params, load_args_x, limits if len(limits) != 0 else None)
+    data = np.full((len(jobs_x),) + data_valid.shape[1:], np.nan)
+    data[valid] = data_valid
+    return data, errors
+
+
+def sweep(unit_x, model_args_x, load_args_x, space, design='grid', n_samples=None, seed=None, min_max_args_x = [],
+          max_workers=None, engine='opensees'):
+    """
+    Evaluate every variant of the sweep under the same strain load.
+
+    With engine='batch' the models of batched_kernels (S01_GUI02_A18_BatchedMaterial.py) evaluate all the variants
+    at once without opensees, the other models are evaluated in parallel with data_plot() as with engine='opensees'.
+
+    Returns:
+    dict: Result set with the keys
+          'names' (swept parameters), 'params' (values of each variant), 'DataPlot' (array (M, N, C) with the
+          DataPlot of each variant, NaN if the variant failed), 'errors' (index -> message), and the base
+          'unit', 'model_args', 'min_max_args', 'load_args'.
+    """
+    points = design_points(space, design=design, n_samples=n_samples, seed=seed)
+    jobs = []
+    for point in points:
+        model_args_v, min_max_args_v = variant_args(model_args_x, min_max_args_x, point)
+        jobs.append((unit_x, model_args_v, list(load_args_x), min_max_args_v))
+
+    if engine == 'batch' and model_args_x[0] in Bmat.batched_kernels and len(jobs) != 0:
+        data, errors = batch_sweep(jobs)
+    else:
+        results = Bat.run_batch(jobs, max_workers=max_workers)
+
+        # Stack the responses (the columns of their branches). All the variants share the strain load, so they have
+        # the same shape.
+        errors = {index: result['error'] for index, result in enumerate(results) if 'error' in result}
+        arrays = {index: Brn.response_branches(result).to_columns() for index, result in enumerate(results)
+                  if 'error' not in result}
+        shape = next(iter(arrays.values())).shape if arrays else (0, 0)
+        data = np.full((len(results),) + shape, np.nan)
+        for index, array in arrays.items():
+            data[index] = array
+
+    return {
+        "names": list(space),
+        "params": points,
+        "DataPlot": data,
+        "errors": errors,
+        "unit": unit_x,
+        "model_args": list(model_args_x),
+        "min_max_args": list(min_max_args_x),
+        "load_args": list(load_args_x),
+    }
+
+
+# %%% [02-03] SAVE / READ RESULT SET
+# Function to save the result set of a sweep in one compact file (.npz).
+def save_sweep(url_x, result):
+    meta = {key: value for key, value in result.items() if key not in ('DataPlot', 'errors')}
+    meta['errors'] = {str(index): message for index, message in result['errors'].items()}
+    np.savez_compressed(url_x, DataPlot=result['DataPlot'], meta=np.array(json.dumps(meta)))
+
+
+# Function to read the result set of a sweep.
+def read_sweep(url_x):
+    with np.load(url_x, allow_pickle=False) as file:
+        result = json.loads(str(file['meta']))
+        result['DataPlot'] = file['DataPlot']
+    result['errors'] = {int(index): message for index, message in result['errors'].items()}
+    return result
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] sweep()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import os
+    import time
+    import tempfile
+
+    unit = 'kgf/cm**2'
+    model_args = ['Steel02', 1, '4200', '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '0']
+    load_args = ['cyclic', 'combined', '0.0001', '-0.002', '0.002', '2', '-0.004', '0.004', '2', '-0.006', '0.006', '2',
+                 '0', '0', '0', '0', '0', '0']
+
+    # Example 1: full grid of R0 and b.
+    t0 = time.perf_counter()
+    result = sweep(unit, model_args, load_args, {'R0': (10, 25, 4), 'b': [0.005, 0.01, 0.02]})
+    print(f"grid: {result['DataPlot'].shape} in {time.perf_counter() - t0:.2f} s")
+
+    # Example 2: the same grid with the batched engine, and a Monte Carlo sample of 10000 variants.
+    t0 = time.perf_counter()
+    result_batch = sweep(unit, model_args, load_args, {'R0': (10, 25, 4), 'b': [0.005, 0.01, 0.02]}, engine='batch')
+    print(f"grid (batch): {result_batch['DataPlot'].shape} in {time.perf_counter() - t0:.2f} s, "
+          f"max. difference = {np.nanmax(np.abs(result_batch['DataPlot'] - result['DataPlot'])):.1e}")
+    t0 = time.perf_counter()
+    result_batch = sweep(unit, model_args, load_args, {'Fy': (3500, 5000), 'b': (0.005, 0.02), 'R0': (15, 20)},
+                         design='random', n_samples=10000, seed=0, engine='batch')
+    print(f"random (batch): {result_batch['DataPlot'].shape} in {time.perf_counter() - t0:.2f} s")
+
+    # Example 3: Latin hypercube of ConcreteCM, including the categorical GapClose.
+    model_args = ['ConcreteCM', 1, '-250.0', '-0.002', '238751.9633', '7', '1.05', '34.78', '0.0001', '7', '10000', '1']
+    t0 = time.perf_counter()
+    result = sweep(unit, model_args, load_args, {'rc': (3, 10), 'xcrn': (1.01, 1.2), 'GapClose': [0, 1]},
+                   design='lhs', n_samples=200, seed=0)
+    print(f"lhs: {result['DataPlot'].shape} in {time.perf_counter() - t0:.2f} s")
+
+    # The result set in one file, read back (a temporary directory, it isn't a response of the GUI).
+    with tempfile.TemporaryDirectory() as directory:
+        url = os.path.join(directory, 'Sweep_ConcreteCM.npz')
+        save_sweep(url, result)
+        result_read = read_sweep(url)
+        print(f"saved: {os.path.getsize(url) / 1024:.0f} kB, same DataPlot: "
+              f"{np.array_equal(result_read['DataPlot'], result['DataPlot'], equal_nan=True)}, "
+              f"same params: {result_read['params'] == result['params']}, errors: {result_read['errors']}")
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A14_Cache.py
+COMENTARIOS:    Cache de respuestas de data_plot() en memoria y en disco.
+"""
+
+# %% [00] INTRODUCTION
+# La GUI vuelve a graficar el material ante cualquier cambio (unidad grafica,
+# regularizacion, archivos de comparacion), aunque los parametros del material
+# no cambien. Las respuestas se guardan con una llave que depende solo del
+# contenido (unidad, material, carga, MinMax, version de openseespy, version
+# y tipo del motor), en memoria (LRU acotado) y en disco (con limite de tamaño).
+# Se guardan solo las ramas de la respuesta (S01_GUI02_A23_Branches.py), en disco
+# como .npz sin perdida (S01_GUI02_A20_ResponseStore.py); DataPlot y DataState se
+# crean de las ramas solo si se usan.
+
+
+# %% [01] LIBRARIES
+import os
+import json
+import hashlib
+import zipfile
+from collections import OrderedDict
+from importlib import metadata
+import S01_GUI02_A02_2_fileText as TxT
+import S01_GUI02_A20_ResponseStore as Rst
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] KEY OF THE RESPONSES
+# Function to obtain the version of openseespy installed.
+def opensees_version():
+    try:
+        return metadata.version('openseespy')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+# Function to write the arguments in a canonical way. The widgets give strings, so '-250' and '-250.0' are the same.
+def canonical_args(args_x):
+    canonical = []
+    for value in args_x:
+        try:
+            canonical.append(repr(float(value)))
+        except (TypeError, ValueError):
+            canonical.append(str(value))
+    return canonical
+
+
+# Function to calculate the key of a response.
+def response_key(unit_x, model_args_x, load_args_x, min_max_args_x = [], record_x = (), engine_x = 'opensees',
+                 steps_x = 'fixed'):
+    content = [unit_x, canonical_args(model_args_x), canonical_args(load_args_x), canonical_args(min_max_args_x),
+               list(record_x), opensees_version(), TxT.engine_version, engine_x, steps_x]
+    return hashlib.sha256(json.dumps(content).encode('utf8')).hexdigest()
+
+
+# %%% [02-01] CACHE
+# The disk tier is lossless (see storage_policy from S01_GUI02_A20_ResponseStore.py).
+cache_policy = {'precision': 'float64', 'delta': True, 'chunk_rows': 16384}
+
+# Extensions of the files of the disk tier. The .json files (previous versions, with DataPlot) are only evicted.
+cache_extensions = ('.npz', '.json')
+
+
+# Function to get the dictionary kept by the cache: without DataPlot and DataState, they are created from the branches.
+def branches_only(dictionary_x):
+    if 'Branches' not in dictionary_x:
+        return dict(dictionary_x)
+    return {key: value for key, value in dictionary_x.items() if key not in ('DataPlot', 'DataState')}
+
+
+# Function to get the response returned by the cache from the dictionary kept, a new one in each call.
+def cached_response(dictionary_x):
+    return Rst.columns_response(dictionary_x) if 'Branches' in dictionary_x else dict(dictionary_x)
+
+
+class ResponseCache:
+    """
+    Two tier cache of the dictionaries returned by data_plot().
+
+    Parameters:
+    directory (str): Directory of the disk tier. None disables the disk tier.
+    max_entries (int): Number of responses kept in memory (least recently used are discarded).
+    max_bytes (int): Size limit of the disk tier (least recently used files are deleted).
+    """
+
+    def __init__(self, directory=None, max_entries=64, max_bytes=256 * 1024**2):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        # Memory tier
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return cached_response(self.memory[key])
+
+        # Disk tier
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                dictionary = branches_only(Rst.read_response(path))
+                os.utime(path)  # The modification time is used as last access for the eviction.
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                dictionary = None
+            if dictionary is not None:
+                self._put_memory(key, dictionary)
+                self.hits += 1
+                return cached_response(dictionary)
+
+        self.misses += 1
+        return None
+
+    def _put_memory(self, key, dictionary):
+        self.memory[key] = dictionary
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def put(self, key, dictionary):
+        dictionary = branches_only(dictionary)
+        self._put_memory(key, dictionary)
+
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            # Write in a temporary file and rename it, so other processes never read a partial file.
+            path_tmp = f"{path}.{os.getpid()}.tmp"
+            # The branches are saved as they are (S01_GUI02_A23_Branches.py), without the padding of DataPlot.
+            with open(path_tmp, 'wb') as file:
+                Rst.save_response(file, dictionary, cache_policy)
+            os.replace(path_tmp, path)
+            self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(cache_extensions):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        self.memory.clear()
+        if self.directory is not None and os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(cache_extensions):
+                    os.remove(entry.path)
+
+    def data_plot(self, unit_x, model_args_x, load_args_x, min_max_args_x = [], record_x = (), engine_x = 'opensees',
+                  steps_x = 'fixed'):
+        """
+        Same as TxT.data_plot(), but the response is only calculated if it isn't in the cache.
+        """
+        key = response_key(unit_x, model_args_x, load_args_x, min_max_args_x, record_x, engine_x, steps_x)
+        dictionary = self.get(key)
+        if dictionary is None:
+            dictionary = TxT.data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x,
+                                       record_x = record_x, engine_x = engine_x, steps_x = steps_x)
+            self.put(key, dictionary)
+        return dictionary
+
+    def data_plot_stream(self, unit_x, model_args_x, load_args_x, min_max_args_x = [], record_x = (),
+                         engine_x = 'opensees', chunk_x = None, steps_x = 'fixed'):
+        """
+        Same as TxT.data_plot_stream(). A response in the cache doesn't yield chunks, it's returned directly.
+        """
+        key = response_key(unit_x, model_args_x, load_args_x, min_max_args_x, record_x, engine_x, steps_x)
+        dictionary = self.get(key)
+        if dictionary is None:
+            dictionary = yield from TxT.data_plot_stream(unit_x, model_args_x, load_args_x,
+                                                         min_max_args_x = min_max_args_x, record_x = record_x,
+                                                         engine_x = engine_x, chunk_x = chunk_x, steps_x = steps_x)
+            self.put(key, dictionary)
+        return dictionary
+
+
+# %%% [02-02] DEFAULT CACHE OF THE GUI
+cache = ResponseCache('C_GUI02_uniaxialMaterial/C_GUI02_Cache')
+
+
+def cached_data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = [], record_x = (), engine_x = 'opensees',
+                     steps_x = 'fixed'):
+    return cache.data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x, record_x = record_x,
+                           engine_x = engine_x, steps_x = steps_x)
+
+
+def cached_data_plot_stream(unit_x, model_args_x, load_args_x, min_max_args_x = [], record_x = (),
+                            engine_x = 'opensees', chunk_x = TxT.stream_chunk, steps_x = 'fixed'):
+    return cache.data_plot_stream(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x,
+                                  record_x = record_x, engine_x = engine_x, chunk_x = chunk_x, steps_x = steps_x)
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] cached_data_plot()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import time
+
+    unit = 'kgf/cm**2'
+    model_args = ['ConcreteCM', 1, '-250.0', '-0.002', '238751.9633', '7', '1.05', '34.78', '0.0001', '7', '10000', '1']
+    load_args = ['monotonic', '-', '0.0001', '-0.008', '0']
+
+    for i in range(3):
+        t0 = time.perf_counter()
+        dictionary = cached_data_plot(unit, model_args, load_args)
+        print(f"Call {i}: {time.perf_counter() - t0:.4f} s, hits = {cache.hits}, misses = {cache.misses}")
+
+    # The disk tier keeps the branches (.npz), a new cache (ej. a new session) reads them without evaluating again.
+    import tempfile
+    import numpy as np
+    with tempfile.TemporaryDirectory() as directory:
+        dictionary = ResponseCache(directory).data_plot(unit, model_args, load_args, record_x = ('tangent',))
+        cache_disk = ResponseCache(directory)
+        dictionary_disk = cache_disk.data_plot(unit, model_args, load_args, record_x = ('tangent',))
+        print(f"disk: hits = {cache_disk.hits}, same branches: {dictionary_disk['Branches'] == dictionary['Branches']}, "
+              f"same DataPlot: {np.array_equal(dictionary_disk['DataPlot'], dictionary['DataPlot'], equal_nan=True)}, "
+              f"files: {os.listdir(directory)}")
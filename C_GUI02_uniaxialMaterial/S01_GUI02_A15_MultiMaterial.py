@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A15_MultiMaterial.py
+COMENTARIOS:    Evalua muchos materiales bajo la misma carga en un unico dominio.
+"""
+
+# %% [00] INTRODUCTION
+# Para comparar N materiales bajo la misma historia de deformaciones, data_plot()
+# se llamaba N veces (N veces ops.wipe(), N veces strain_load(), N veces el archivo
+# auxiliar). Aqui la historia de deformaciones se calcula una vez, todos los
+# materiales se definen en un mismo dominio de opensees y se obtiene una matriz
+# de esfuerzos con una columna por material. Los resultados tienen el mismo
+# formato que data_plot(), por lo que se grafican con S01_GUI02_A05_CallGraphic.py.
+
+
+# %% [01] LIBRARIES
+import numpy as np
+import openseespy.opensees as ops
+import S01_GUI02_A02_2_fileText as TxT
+import S01_GUI02_A04_2_testUniaxialMaterial as Mat
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] MATERIALS IN ONE DOMAIN
+# Function to give each material its own tags in the shared domain. Two materials of the comparison may have the
+# same MatTag (ej. files created in different sessions), so the tags of the domain are 2*k + 1 and 2*k + 2.
+def domain_args(model_args_x, min_max_args_x, index_x):
+    model_args_d = list(model_args_x)
+    model_args_d[1] = 2 * index_x + 1
+    min_max_args_d = list(min_max_args_x)
+    if len(min_max_args_d) != 0:
+        min_max_args_d[1], min_max_args_d[2] = 2 * index_x + 1, 2 * index_x + 2
+    return model_args_d, min_max_args_d
+
+
+def lockstep_stresses(strains_x, materials_x):
+    """
+    Apply the same strain history to several opensees materials defined in one domain.
+
+    testUniaxialMaterial() only changes the material under test, each material keeps its own committed state.
+    Every material is driven along the whole history before the next one, because changing the material under
+    test in every step is slower than the strain steps themselves.
+
+    Parameters:
+    strains_x (list): Strain history.
+    materials_x (list): List of (model_args, min_max_args), as returned by model_arg() and min_max_model_arg().
+
+    Returns:
+    numpy.ndarray: Stresses, one row per strain and one column per material.
+    """
+    stresses = np.empty((len(strains_x), len(materials_x)))
+    with Mat.domain_lock:
+        ops.wipe()
+        tags = []
+        for index, (model_args_x, min_max_args_x) in enumerate(materials_x):
+            model_args_d, min_max_args_d = domain_args(model_args_x, min_max_args_x, index)
+            tags.append(Mat.build_material(model_args_d, min_max_args_d))
+
+        for j, tag in enumerate(tags):
+            ops.testUniaxialMaterial(tag)
+            for i, strain in enumerate(strains_x):
+                ops.setStrain(strain)
+                stresses[i, j] = ops.getStress()
+    return stresses
+
+
+# %%% [02-01] DATA PLOT OF MANY MATERIALS
+# Function to create the dictionary of a material, the same as data_plot() returns.
+def plot_dictionary(unit_x, model_args_x, load_args_x, min_max_args_x, data_x):
+    dictionary = {"DataPlot": data_x.tolist()}
+    dictionary['unit'] = unit_x
+    dictionary['model'] = model_args_x[0]
+    dictionary['load_type'] = load_args_x[0]
+    dictionary['cyclic_type'] = load_args_x[1]
+    if len(min_max_args_x) != 0:
+        dictionary['material'] = {'matTag': min_max_args_x[1]}
+    else:
+        dictionary['material'] = {'matTag': model_args_x[1]}
+    return dictionary
+
+
+def data_plot_many(unit_x, materials_x, load_args_x):
+    """
+    Same as data_plot() for several materials under the same strain load.
+
+    Parameters:
+    unit_x (str): Unit of the materials.
+    materials_x (list): List of (model_args, min_max_args). min_max_args is [] if there isn't a MinMax material.
+    load_args_x (list): Arguments of the strain load, as returned by read_selected_files_strain().
+
+    Returns:
+    list: One dictionary per material, in the same order, with the keys of data_plot().
+    """
+    materials_x = [(list(model_args_x), list(min_max_args_x)) for model_args_x, min_max_args_x in materials_x]
+    dictionaries = [None] * len(materials_x)
+
+    # The user defined models don't use opensees, they are evaluated by data_plot().
+    index_opss = [index for index, (model_args_x, _) in enumerate(materials_x) if model_args_x[0] in Mat.material_builders]
+    for index, (model_args_x, min_max_args_x) in enumerate(materials_x):
+        if index not in index_opss:
+            dictionaries[index] = TxT.data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x)
+    if len(index_opss) == 0:
+        return dictionaries
+    materials_opss = [materials_x[index] for index in index_opss]
+
+    if load_args_x[0] == 'monotonic':
+        # Compression and tension start from the virgin material, so each one is a pass over a new domain.
+        strains_C, strains_T = TxT.strain_load(load_args_x)
+        stresses_C = lockstep_stresses(strains_C, materials_opss)
+        stresses_T = lockstep_stresses(strains_T, materials_opss)
+
+        # Ensure both columns are the same length by padding with NaNs
+        max_length = max(len(strains_C), len(strains_T))
+        columns = np.full((max_length, 4), np.nan)
+        columns[:len(strains_C), 0] = strains_C
+        columns[:len(strains_T), 2] = strains_T
+        for j, index in enumerate(index_opss):
+            data = columns.copy()
+            data[:len(strains_C), 1] = stresses_C[:, j]
+            data[:len(strains_T), 3] = stresses_T[:, j]
+            model_args_x, min_max_args_x = materials_x[index]
+            dictionaries[index] = plot_dictionary(unit_x, model_args_x, load_args_x, min_max_args_x, data)
+
+    elif load_args_x[0] == 'cyclic':
+        strains = np.asarray(TxT.strain_load(load_args_x), dtype=np.float64)
+        stresses = lockstep_stresses(strains.tolist(), materials_opss)
+        for j, index in enumerate(index_opss):
+            data = np.column_stack((strains, stresses[:, j]))
+            model_args_x, min_max_args_x = materials_x[index]
+            dictionaries[index] = plot_dictionary(unit_x, model_args_x, load_args_x, min_max_args_x, data)
+
+    return dictionaries
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] data_plot_many()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import time
+
+    unit = 'kgf/cm**2'
+    load_args = ['cyclic', 'combined', '0.0001', '-0.002', '0.002', '2', '-0.004', '0.004', '2', '-0.006', '0.006', '2',
+                 '0', '0', '0', '0', '0', '0']
+    materials = []
+    for Fy in range(3000, 5000, 100):
+        materials.append((['Steel02', 1, str(Fy), '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '0'], []))
+
+    t0 = time.perf_counter()
+    dictionaries_1 = [TxT.data_plot(unit, model_args, load_args, min_max_args_x = min_max_args)
+                      for model_args, min_max_args in materials]
+    t1 = time.perf_counter()
+    dictionaries_2 = data_plot_many(unit, materials, load_args)
+    t2 = time.perf_counter()
+
+    error = max(np.nanmax(np.abs(np.array(d_1['DataPlot']) - np.array(d_2['DataPlot'])))
+                for d_1, d_2 in zip(dictionaries_1, dictionaries_2))
+    print(f"{len(materials)} materials: data_plot() {t1 - t0:.3f} s, data_plot_many() {t2 - t1:.3f} s, "
+          f"max. difference = {error}")
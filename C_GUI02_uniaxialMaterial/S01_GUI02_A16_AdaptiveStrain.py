@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A16_AdaptiveStrain.py
+COMENTARIOS:    Carga de deformaciones con paso adaptivo.
+"""
+
+# %% [00] INTRODUCTION
+# strain_load() usa el mismo delta_e en toda la historia de deformaciones. Con un
+# delta_e pequeño la curva es precisa pero lenta, y con uno grande se pierden el
+# peak, el agrietamiento y las descargas. Aqui el paso se ajusta con la rigidez
+# tangente del material: se refina donde la rigidez cambia y se agranda en las
+# ramas lineales. Los puntos de reversa de la carga (picos y ceros) se alcanzan
+# siempre de forma exacta.
+# Para la vista previa de la GUI se agranda delta_e de la carga, de modo que la
+# evaluacion tome un tiempo dado (ej. 150 ms) segun la velocidad medida del
+# material, manteniendo todos los picos y puntos de reversa.
+
+
+# %% [01] LIBRARIES
+import time
+import numpy as np
+import openseespy.opensees as ops
+import S01_GUI02_A02_2_fileText as TxT
+import S01_GUI02_A04_2_testUniaxialMaterial as Mat
+import S01_GUI02_A20_ResponseStore as Rst
+import S01_GUI02_A23_Branches as Brn
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] REVERSAL TARGETS OF THE STRAIN LOAD
+def strain_targets(load_args_x):
+    """
+    Reversal points of the strain load, the same points visited by strain_load() from S01_GUI02_A02_2_fileText.py.
+
+    Parameters:
+    load_args_x (list): Arguments of the strain load, as returned by read_selected_files_strain().
+
+    Returns:
+    list: For a monotonic load [targets_C, targets_T], for a cyclic load [targets].
+          Each list of targets starts at 0 and it's empty if the branch has no strains.
+    """
+    load_type, cyclic_type = load_args_x[:2]
+    delta_e = float(load_args_x[2])
+
+    # A peak smaller than delta_e has no points in strain_load()
+    def has_points(e_max):
+        return int(abs(e_max) / delta_e) > 0
+
+    if load_type == 'monotonic':
+        e_max_c, e_max_t = float(load_args_x[3]), float(load_args_x[4])
+        targets_C = [0.0, e_max_c] if has_points(e_max_c) else []
+        targets_T = [0.0, e_max_t] if has_points(e_max_t) else []
+        return [targets_C, targets_T]
+
+    targets = [0.0]
+    if cyclic_type in ('compression', 'traction'):
+        peaks = load_args_x[3:]
+        for e_max, pulses in zip(peaks[0::2], peaks[1::2]):
+            e_max, pulses = float(e_max), int(pulses)
+            if has_points(e_max):
+                targets += [e_max, 0.0] * pulses
+
+    elif cyclic_type == 'combined':
+        peaks = load_args_x[3:]
+        for e_max_c, e_max_t, pulses in zip(peaks[0::3], peaks[1::3], peaks[2::3]):
+            e_max_c, e_max_t, pulses = float(e_max_c), float(e_max_t), int(pulses)
+            if pulses != 0:
+                targets += [e_max_c, e_max_t, 0.0] * pulses
+
+    targets = TxT.remove_consecutive_duplicates(targets).tolist()
+    return [targets] if len(targets) > 1 else [[]]
+
+
+# %%% [02-01] ADAPTIVE STEPS
+# Function to walk the reversal targets with a fixed step, the last step of each branch goes to the target.
+def coarse_history(targets_x, step_x):
+    strains = targets_x[:1]
+    for target in targets_x[1:]:
+        strain = strains[-1]
+        points = max(1, int(np.ceil(abs(target - strain) / step_x)))
+        strains += np.linspace(strain, target, points + 1)[1:].tolist()
+    return strains
+
+
+def adaptive_history(targets_x, model_args_x, min_max_args_x = [], delta_min=0.0001, delta_max=None, tol=0.005,
+                     record_x=()):
+    """
+    Drive the opensees material through the reversal targets with an adaptive strain step.
+
+    setStrain() commits the state of the material, so a step can't be rejected and the size of each step is
+    predicted with the tangent of the last point. Two limits are used, relative to the stress scale of the
+    history (the largest stress of a first pass with steps of delta_max):
+    - Curvature: the change of the tangent in the last step estimates the error of the straight line between
+      two points (|E_1 - E_0| * step / 8). The step is scaled so that this error is about tol times the scale.
+    - Kinks: a sudden change of stiffness (yield, cracking, closing of cracks) can't be predicted, and the
+      straight line cuts the corner at most |E| * step / 4. The step is limited so the stress changes less than
+      4 * tol times the scale. A branch that starts with tangent 0 (open gap) uses the last stiffness until
+      the gap closes.
+    Every load reversal starts again with delta_min.
+
+    Parameters:
+    targets_x (list): Reversal points of the strain load, as returned by strain_targets().
+    model_args_x (list): Arguments of the material, as returned by model_arg().
+    min_max_args_x (list): Arguments of the MinMax material, as returned by min_max_model_arg().
+    delta_min (float): Smallest strain step, the delta_e of the strain load.
+    delta_max (float): Largest strain step. None uses 20 * delta_min.
+    tol (float): Allowed error of the straight line between two points, relative to the stress scale.
+    record_x (list): Names of TxT.state_getters to record after each step, as opensees_response().
+
+    Returns:
+    tuple: (strains, stresses, states, evaluations). states is a dictionary name -> list with a value per strain,
+           evaluations is the number of calls to the material, including the first pass.
+    """
+    names = [name for name in record_x if name in TxT.state_getters]
+    if len(targets_x) == 0:
+        return [], [], {name: [] for name in names}, 0
+    if delta_max is None:
+        delta_max = 20 * delta_min
+
+    # First pass: stress scale of the history.
+    strains_coarse = coarse_history(targets_x, delta_max)
+    stresses_coarse = TxT.opensees_stresses(strains_coarse, model_args_x, min_max_args_x)
+    scale = max(np.max(np.abs(stresses_coarse)), np.finfo(float).tiny)
+
+    # The domain is kept until the last step.
+    with Mat.domain_lock:
+        Mat.test_material(model_args_x, min_max_args_x)
+        strain = targets_x[0]
+        ops.setStrain(strain)
+        strains, stresses = [strain], [ops.getStress()]
+        tangent = ops.getTangent()
+        states = {name: [TxT.state_getters[name]()] for name in names}
+        stiffness = abs(tangent)
+
+        for target in targets_x[1:]:
+            step = delta_min
+            # A branch that starts without stiffness (ej. open cracks after a reversal) ends closing the gap.
+            closing = tangent == 0
+            while strain != target:
+                # The last step goes to the target, it's never shorter than delta_min.
+                if abs(target - strain) < step + delta_min:
+                    strain_new = target
+                else:
+                    strain_new = strain + np.sign(target - strain) * step
+                ops.setStrain(strain_new)
+                stress, tangent_new = ops.getStress(), ops.getTangent()
+
+                # Predict the next step
+                error = abs(tangent_new - tangent) * abs(strain_new - strain) / 8
+                factor = 1.5 if error == 0 else min(1.5, max(0.2, 0.9 * np.sqrt(tol * scale / error)))
+                # Without stiffness the next kink is closing the gap, it has about the last stiffness.
+                stiffness = abs(tangent_new) if tangent_new != 0 else stiffness
+                step = step * factor
+                if stiffness != 0 and (tangent_new != 0 or closing):
+                    step = min(step, 4 * tol * scale / stiffness)
+                step = min(delta_max, max(delta_min, step))
+
+                strain, tangent = strain_new, tangent_new
+                strains.append(strain)
+                stresses.append(stress)
+                for name, values in states.items():
+                    values.append(tangent if name == 'tangent' else TxT.state_getters[name]())
+
+    return strains, stresses, states, len(strains_coarse) + len(strains)
+
+
+# %%% [02-02] DATA PLOT WITH ADAPTIVE STEPS
+def data_plot_adaptive(unit_x, model_args_x, load_args_x, min_max_args_x = [], delta_max=None, tol=0.005,
+                       record_x=()):
+    """
+    Same as data_plot() from S01_GUI02_A02_2_fileText.py, with adaptive strain steps. delta_e of the strain load
+    is the smallest step. The user defined models don't have a tangent, they use data_plot().
+
+    Returns:
+    dict: The keys of data_plot() and 'points', with the number of points of the fixed and the adaptive steps
+          and the evaluations of the material.
+    """
+    if model_args_x[0] not in Mat.material_builders:
+        return TxT.data_plot(unit_x, model_args_x, load_args_x, min_max_args_x = min_max_args_x, record_x = record_x)
+    return TxT.run_stream(data_plot_adaptive_stream(unit_x, model_args_x, load_args_x, min_max_args_x,
+                                                    delta_max=delta_max, tol=tol, record_x=record_x))
+
+
+# Generator version of data_plot_adaptive() for the opensees models, used by data_plot_stream(steps_x='adaptive') from
+# S01_GUI02_A02_2_fileText.py. It yields (branch, strains, stresses) once per branch of the load, the dictionary is the
+# value of StopIteration.
+def data_plot_adaptive_stream(unit_x, model_args_x, load_args_x, min_max_args_x = [], delta_max=None, tol=0.005,
+                              record_x=()):
+    delta_e = float(load_args_x[2])
+    histories = []
+    for branch, targets in enumerate(strain_targets(load_args_x)):
+        history = adaptive_history(targets, model_args_x, min_max_args_x, delta_min=delta_e, delta_max=delta_max,
+                                   tol=tol, record_x=record_x)
+        histories.append(history)
+        if len(history[0]) != 0:
+            yield branch, history[0], history[1]
+
+    if load_args_x[0] == 'monotonic':
+        # Each branch with its own length (S01_GUI02_A23_Branches.py)
+        (strains_C, stresses_C, states_C, _), (strains_T, stresses_T, states_T, _) = histories
+        layout = Brn.from_branches([('compression', TxT.branch_quantities(strains_C, stresses_C, states_C, record_x)),
+                                    ('tension', TxT.branch_quantities(strains_T, stresses_T, states_T, record_x))])
+        points_fixed = sum(len(strains) for strains in TxT.strain_load(load_args_x))
+    else:
+        (strains, stresses, states, _), = histories
+        layout = Brn.from_cycles(TxT.branch_quantities(strains, stresses, states, record_x))
+        points_fixed = len(TxT.strain_load(load_args_x))
+
+    # DataPlot is created from the branches only if it's used, as in data_plot().
+    dictionary = Rst.columns_response({'Branches': layout})
+    dictionary['unit'] = unit_x
+    dictionary['model'] = model_args_x[0]
+    dictionary['load_type'] = load_args_x[0]
+    dictionary['cyclic_type'] = load_args_x[1]
+    if len(min_max_args_x) != 0:
+        dictionary['material'] = {'matTag': min_max_args_x[1]}
+    else:
+        dictionary['material'] = {'matTag': model_args_x[1]}
+    dictionary['points'] = {'fixed': points_fixed, 'adaptive': sum(len(history[0]) for history in histories),
+                            'evaluations': sum(history[3] for history in histories)}
+    return dictionary
+
+
+# %%% [02-03] REPORT
+# Function to compare the curve with adaptive steps against the curve with fixed steps.
+def step_report(dictionary_fixed, dictionary_adaptive):
+    """
+    Compare the adaptive curve with the fixed step curve of the same material and strain load.
+
+    Both curves visit the same reversal points, so they are compared as functions of the accumulated strain
+    (sum of |delta strain|). The adaptive curve is interpolated at the points of the fixed curve.
+
+    Returns:
+    dict: 'fixed' and 'adaptive' number of points, 'saved' points, 'evaluations' of the material with adaptive
+          steps (including the first pass), 'ratio' fixed / evaluations, and 'error', the largest difference of
+          stress relative to the largest stress of the fixed curve.
+    """
+    curves_fixed = Brn.response_branches(dictionary_fixed).curves()
+    curves_adaptive = Brn.response_branches(dictionary_adaptive).curves()
+
+    error, scale, points_fixed, points_adaptive = 0.0, 0.0, 0, 0
+    for (_, strain_f, stress_f), (_, strain_a, stress_a) in zip(curves_fixed, curves_adaptive):
+        strain_f, stress_f = strain_f[~np.isnan(strain_f)], stress_f[~np.isnan(strain_f)]
+        strain_a, stress_a = strain_a[~np.isnan(strain_a)], stress_a[~np.isnan(strain_a)]
+        points_fixed, points_adaptive = points_fixed + len(strain_f), points_adaptive + len(strain_a)
+        if len(strain_f) == 0 or len(strain_a) == 0:
+            continue
+        path_f = np.concatenate(([0.0], np.cumsum(np.abs(np.diff(strain_f)))))
+        path_a = np.concatenate(([0.0], np.cumsum(np.abs(np.diff(strain_a)))))
+        error = max(error, np.max(np.abs(np.interp(path_f, path_a, stress_a) - stress_f)))
+        scale = max(scale, np.max(np.abs(stress_f)))
+
+    evaluations = dictionary_adaptive.get('points', {}).get('evaluations', points_adaptive)
+    return {
+        'fixed': points_fixed,
+        'adaptive': points_adaptive,
+        'saved': points_fixed - points_adaptive,
+        'evaluations': evaluations,
+        'ratio': points_fixed / max(evaluations, 1),
+        'error': error / scale if scale != 0 else 0.0,
+    }
+
+
+# %%% [02-04] PREVIEW RESOLUTION
+# Function to calculate the length of each branch of strain_load(), a branch goes from a reversal point to the next.
+def strain_branches(load_args_x):
+    load_type, cyclic_type = load_args_x[:2]
+    peaks = load_args_x[3:]
+    if load_type == 'monotonic':
+        return [abs(float(peaks[0])), abs(float(peaks[1]))]
+    branches = []
+    if cyclic_type in ('compression', 'traction'):
+        for e_max, pulses in zip(peaks[0::2], peaks[1::2]):
+            branches += [abs(float(e_max))] * 2 * int(pulses)
+    elif cyclic_type == 'combined':
+        for e_max_c, e_max_t, pulses in zip(peaks[0::3], peaks[1::3], peaks[2::3]):
+            e_max_c, e_max_t = abs(float(e_max_c)), abs(float(e_max_t))
+            branches += [e_max_c, e_max_c + e_max_t, e_max_t] * int(pulses)
+    return branches
+
+
+def preview_load_args(load_args_x, points_x):
+    """
+    Strain load with a larger delta_e, so strain_load() gives about points_x strains. A branch of strain_load() with
+    at least 2 points keeps them, so the preview has the same peaks and reversal points as load_args_x.
+
+    Returns:
+    list: Arguments of the strain load, load_args_x itself if it has less than points_x strains.
+    """
+    delta_e = float(load_args_x[2])
+    branches = [length for length in strain_branches(load_args_x) if int(length / delta_e) >= 2]
+    if len(branches) == 0 or sum(int(length / delta_e) for length in branches) <= points_x:
+        return load_args_x
+    delta_preview = min(sum(branches) / max(points_x, 1), min(branches) / 2)
+    if delta_preview <= delta_e:
+        return load_args_x
+    load_args_preview = list(load_args_x)
+    load_args_preview[2] = repr(delta_preview)
+    return load_args_preview
+
+
+class PreviewResolution:
+    """
+    Resolution of the previews of the GUI. The strain load is decimated so a preview takes about budget_x seconds,
+    with the speed (seconds per strain) measured in the previous previews of each model and engine.
+
+    Parameters:
+    budget_x (float): Latency budget of a preview, in seconds.
+    rate_x (float): Seconds per strain before the first measure.
+    smooth_x (float): Weight of a new measure in the average of the speed.
+    """
+
+    def __init__(self, budget_x=0.15, rate_x=5e-6, smooth_x=0.5):
+        self.budget = budget_x
+        self.rate_initial = rate_x
+        self.smooth = smooth_x
+        self.rates = {}
+
+    def points(self, key_x):
+        return max(int(self.budget / self.rates.get(key_x, self.rate_initial)), 1)
+
+    def load_args(self, load_args_x, key_x):
+        return preview_load_args(load_args_x, self.points(key_x))
+
+    def measure(self, key_x, points_x, seconds_x):
+        if points_x == 0:
+            return
+        rate = seconds_x / points_x
+        previous = self.rates.get(key_x)
+        self.rates[key_x] = rate if previous is None else self.smooth * rate + (1 - self.smooth) * previous
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] data_plot_adaptive()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    unit = 'kgf/cm**2'
+    load_args_cyclic = ['cyclic', 'combined', '0.00001', '-0.002', '0.002', '2', '-0.004', '0.004', '2', '-0.006', '0.006',
+                        '2', '0', '0', '0', '0', '0', '0']
+    load_args_monotonic = ['monotonic', '-', '0.00001', '-0.008', '0.002']
+    examples = [
+        (['Steel02', 1, '4200', '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '0'], load_args_cyclic),
+        (['ConcreteCM', 1, '-250.0', '-0.002', '238751.9633', '7', '1.05', '34.78', '0.0001', '7', '10000', '1'],
+         load_args_monotonic),
+    ]
+    for model_args, load_args in examples:
+        dictionary_fixed = TxT.data_plot(unit, model_args, load_args)
+        dictionary_adaptive = data_plot_adaptive(unit, model_args, load_args)
+        report = step_report(dictionary_fixed, dictionary_adaptive)
+        print(f"{model_args[0]}: {report['fixed']} -> {report['adaptive']} points ({report['saved']} saved), "
+              f"{report['evaluations']} evaluations ({report['ratio']:.1f}x fewer), max. error = {100 * report['error']:.2f} %")
+
+
+# %%% [03-01] PreviewResolution()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    resolution = PreviewResolution(budget_x=0.15)
+    model_args = ['Steel02', 1, '4200', '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '0']
+    load_args = ['cyclic', 'combined', '0.000001', '-0.002', '0.002', '2', '-0.004', '0.004', '2', '-0.006', '0.006',
+                 '2', '0', '0', '0', '0', '0', '0']
+    targets = strain_targets(load_args)[0]
+    for i in range(4):
+        load_args_preview = resolution.load_args(load_args, model_args[0])
+        t0 = time.perf_counter()
+        dictionary = TxT.data_plot(unit, model_args, load_args_preview)
+        seconds = time.perf_counter() - t0
+        strains = Brn.response_branches(dictionary).quantities['strain'].tolist()
+        resolution.measure(model_args[0], len(strains), seconds)
+        print(f"preview {i}: {len(strains)} strains in {1000 * seconds:.0f} ms, "
+              f"all the reversal points: {set(targets) <= set(strains)}")
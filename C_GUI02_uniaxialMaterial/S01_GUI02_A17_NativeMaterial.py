@@ -0,0 +1,679 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A17_NativeMaterial.py
+COMENTARIOS:    Modelos de acero y hormigon implementados en python (sin opensees).
+"""
+
+# %% [00] INTRODUCTION
+# Para cada punto de la historia de deformaciones data_plot() llama a opensees
+# (setStrain, getStress), y esa ida y vuelta es lo que mas tarda en las vistas
+# previas y en los barridos de parametros. Aqui las reglas histereticas de
+# Steel01, Steel02 (Menegotto-Pinto), SteelMPF, Concrete01 (Kent-Scott-Park) y
+# Concrete02 (con traccion lineal) se evaluan en python, con una maquina de
+# estados que recorre toda la historia de una vez. Los argumentos son los mismos
+# de S01_GUI02_A04_2_testUniaxialMaterial.py, y verify_native() compara los
+# resultados con opensees.
+
+
+# %% [01] LIBRARIES
+import numpy as np
+import openseespy.opensees as ops
+import S01_GUI02_A04_2_testUniaxialMaterial as Mat
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] SUPPORT FUNCTIONS
+# Machine epsilon, opensees ignores the changes of strain smaller than it (DBL_EPSILON).
+EPS = np.finfo(np.float64).eps
+
+
+# Function to divide as opensees (C++) does, x / 0 is inf or nan instead of an exception. ej. a2 = 0 in Steel02.
+def divide(x, y):
+    try:
+        return float(x) / float(y)
+    except ZeroDivisionError:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(np.float64(x) / np.float64(y))
+
+
+# Function to split a strain history in branches. A branch is a run of steps in the same direction, the steps
+# equal to 0 don't change the direction. Returns a list of (start, end, direction), the first branch starts at
+# the first step different from 0.
+def branches(steps_x):
+    direction = np.sign(steps_x)
+    index = np.maximum.accumulate(np.where(direction != 0, np.arange(len(direction)), 0))
+    direction = direction[index] if len(direction) != 0 else direction
+    starts = np.flatnonzero((np.diff(direction, prepend=0) != 0) & (direction != 0))
+    ends = np.append(starts[1:], len(direction))
+    return [(int(start), int(end), int(direction[start])) for start, end in zip(starts, ends)]
+
+
+# Function to find the strains that change the committed state of Steel01, SteelMPF and Concrete01. Opensees
+# ignores a change of strain smaller than EPS (equal_x = True: a change equal to EPS is also a change, Concrete01),
+# the small changes accumulate until the change from the committed strain is larger than EPS. That is only solved
+# point by point if there are small changes different from 0.
+def active_strains(strains_x, equal_x = False):
+    steps = np.diff(strains_x, prepend=0.0)
+    active = np.abs(steps) >= EPS if equal_x else np.abs(steps) > EPS
+    if np.any((steps != 0) & ~active):
+        committed = 0.0
+        for i, strain in enumerate(strains_x.tolist()):
+            active[i] = abs(strain - committed) >= EPS if equal_x else abs(strain - committed) > EPS
+            if active[i]:
+                committed = strain
+    return active
+
+
+# Function to give a value to every strain, the strains that don't change the state repeat the previous value.
+def expand(values_x, active_x, initial_x):
+    index = np.cumsum(active_x) - 1
+    if len(values_x) == 0:
+        return np.full(len(active_x), initial_x, dtype=np.float64)
+    return np.where(index >= 0, values_x[np.maximum(index, 0)], initial_x)
+
+
+# Function to evaluate a Menegotto-Pinto branch, for a strain or an array of strains.
+# branch_x = (eps_r, sig_r, eps_0, sig_0, R, b, ...): origin, intersection of the asymptotes, curvature and hardening.
+def menegotto_pinto(branch_x, strains_x):
+    eps_r, sig_r, eps_0, sig_0, R, b = branch_x[:6]
+    eps_star = (strains_x - eps_r) / (eps_0 - eps_r)
+    dum1 = 1.0 + abs(eps_star) ** R
+    dum2 = dum1 ** (1.0 / R)
+    stresses = (b * eps_star + (1.0 - b) * eps_star / dum2) * (sig_0 - sig_r) + sig_r
+    tangents = (b + (1.0 - b) / (dum1 * dum2)) * (sig_0 - sig_r) / (eps_0 - eps_r)
+    return stresses, tangents
+
+
+# %%% [02-01] STEEL01
+def steel_01(strains_x, Fy, E0, b, a1, a2, a3, a4):
+    """
+    Bilinear steel with isotropic hardening, the same rules as Steel01 of opensees.
+
+    The state only changes in the reversals, so the loop is over the branches of the strain history and the points of
+    a branch are evaluated together: the elastic line from the first point, bounded by the yield lines.
+
+    Parameters:
+    strains_x (list): Strain history, it starts from the virgin material.
+    Fy, E0, b, a1, a2, a3, a4 (float): Parameters of Steel01, see steel_01() from S01_GUI02_A04_2_testUniaxialMaterial.py.
+
+    Returns:
+    tuple: (stresses, tangents) numpy arrays, a value per strain.
+    """
+    strains = np.asarray(strains_x, dtype=np.float64)
+    active = active_strains(strains)
+    eps = strains[active]
+    stresses, tangents = np.empty(len(eps)), np.empty(len(eps))
+    Esh, epsy, fy_one_minus_b = b * E0, Fy / E0, Fy * (1.0 - b)
+
+    # Committed state: strain, stress, loading direction, extreme strains and shift of the yield stress
+    c_strain, c_stress = 0.0, 0.0
+    c_max, c_min, shift_p, shift_n, loading = 0.0, 0.0, 1.0, 1.0, 0
+    for start, end, direction in branches(np.diff(eps, prepend=0.0)):
+        # First point, with the yield stresses before the reversal
+        strain = float(eps[start])
+        c1 = Esh * strain
+        c = c_stress + E0 * (strain - c_strain)
+        stress = c1 + shift_p * fy_one_minus_b
+        if not stress < c:
+            stress = c
+        if c1 - shift_n * fy_one_minus_b > stress:
+            stress = c1 - shift_n * fy_one_minus_b
+        stresses[start], tangents[start] = stress, E0 if abs(stress - c) < EPS else Esh
+
+        # Reversal of the load, the yield stress of the new direction is shifted
+        if loading == 1 and direction < 0:
+            c_max = max(c_max, c_strain)
+            shift_n = 1.0 + a1 * divide(c_max - c_min, 2.0 * a2 * epsy) ** 0.8
+        elif loading == -1 and direction > 0:
+            c_min = min(c_min, c_strain)
+            shift_p = 1.0 + a3 * divide(c_max - c_min, 2.0 * a4 * epsy) ** 0.8
+        loading = direction
+
+        # Rest of the branch, the elastic line doesn't return once it reaches a yield line
+        strains_b = eps[start + 1:end]
+        c = stress + E0 * (strains_b - strain)
+        c1 = Esh * strains_b
+        stresses_b = np.where(c1 + shift_p * fy_one_minus_b < c, c1 + shift_p * fy_one_minus_b, c)
+        stresses_b = np.where(c1 - shift_n * fy_one_minus_b > stresses_b, c1 - shift_n * fy_one_minus_b, stresses_b)
+        stresses[start + 1:end] = stresses_b
+        tangents[start + 1:end] = np.where(np.abs(stresses_b - c) < EPS, E0, Esh)
+        c_strain, c_stress = float(eps[end - 1]), float(stresses[end - 1])
+    return expand(stresses, active, 0.0), expand(tangents, active, E0)
+
+
+# %%% [02-02] STEEL02
+def steel_02(strains_x, Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit):
+    """
+    Giuffre-Menegotto-Pinto steel with isotropic hardening, the same rules as Steel02 of opensees.
+
+    Every reversal defines a new Menegotto-Pinto curve, so the loop is over the branches of the strain history and the
+    points of a branch are evaluated together.
+
+    Parameters:
+    strains_x (list): Strain history, it starts from the virgin material.
+    Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit (float): Parameters of Steel02, see steel_02() from
+    S01_GUI02_A04_2_testUniaxialMaterial.py.
+
+    Returns:
+    tuple: (stresses, tangents) numpy arrays, a value per strain.
+    """
+    Esh, epsy = b * E0, Fy / E0
+    # The initial stress is an initial strain of the material
+    eps_init = sigInit / E0 if sigInit != 0 else 0.0
+    eps = np.asarray(strains_x, dtype=np.float64) + eps_init
+    steps = np.diff(eps, prepend=eps_init)
+    stresses, tangents = np.full(len(eps), float(sigInit)), np.full(len(eps), float(E0))
+
+    # The material is virgin until the first change of strain larger than 10 EPS
+    moved = np.flatnonzero(np.abs(steps) >= 10 * EPS)
+    if len(moved) == 0:
+        return stresses, tangents
+    first = int(moved[0])
+    steps[:first] = 0.0
+
+    eps_max, eps_min = epsy, -epsy
+    eps_r, sig_r = 0.0, 0.0
+    for start, end, direction in branches(steps):
+        if start == first:
+            eps_s0, sig_s0 = (eps_max, Fy) if direction > 0 else (eps_min, -Fy)
+            eps_pl = eps_s0
+        else:
+            # Reversal of the load: new origin (eps_r, sig_r) and new asymptote (eps_s0, sig_s0)
+            eps_r, sig_r = float(eps[start - 1]), float(stresses[start - 1])
+            if direction > 0:
+                eps_min = min(eps_min, eps_r)
+                shift = 1.0 + a3 * divide(eps_max - eps_min, 2.0 * a4 * epsy) ** 0.8
+                eps_s0 = (Fy * shift - Esh * epsy * shift - sig_r + E0 * eps_r) / (E0 - Esh)
+                sig_s0 = Fy * shift + Esh * (eps_s0 - epsy * shift)
+                eps_pl = eps_max
+            else:
+                eps_max = max(eps_max, eps_r)
+                shift = 1.0 + a1 * divide(eps_max - eps_min, 2.0 * a2 * epsy) ** 0.8
+                eps_s0 = (-Fy * shift + Esh * epsy * shift - sig_r + E0 * eps_r) / (E0 - Esh)
+                sig_s0 = -Fy * shift + Esh * (eps_s0 + epsy * shift)
+                eps_pl = eps_min
+
+        # Curvature of the transition, it decreases with the plastic excursion
+        xi = abs((eps_pl - eps_s0) / epsy)
+        R = R0 * (1.0 - (cR1 * xi) / (cR2 + xi))
+        stresses[start:end], tangents[start:end] = menegotto_pinto((eps_r, sig_r, eps_s0, sig_s0, R, b), eps[start:end])
+    return stresses, tangents
+
+
+# %%% [02-03] STEELMPF
+def steel_mpf(strains_x, fyp, fyn, E0, bp, bn, R0, cR1, cR2, a1, a2, a3, a4):
+    """
+    Menegotto-Pinto steel with asymmetric yield and memory of the previous branch, following SteelMPF of opensees.
+
+    Each reversal starts a branch with its own asymptote and curvature. A partial unloading-reloading rejoins the
+    previous branch of the same direction when the curves cross. The curvature degrades with the largest
+    excursion of each direction, measured from the previous reversal (elastic reversals included), and the yield
+    stress of each direction is shifted (isotropic hardening) once the opposite direction has yielded.
+
+    Parameters:
+    strains_x (list): Strain history, it starts from the virgin material.
+    fyp, fyn, E0, bp, bn, R0, cR1, cR2, a1, a2, a3, a4 (float): Parameters of SteelMPF, see steel_mpf() from
+    S01_GUI02_A04_2_testUniaxialMaterial.py.
+
+    Returns:
+    tuple: (stresses, tangents) numpy arrays, a value per strain.
+    """
+    strains = np.asarray(strains_x, dtype=np.float64)
+    active = active_strains(strains)
+    eps = strains[active]
+    stresses, tangents = np.empty(len(eps)), np.empty(len(eps))
+    eyp, eyn = fyp / E0, fyn / E0
+
+    # Branch: (eps_r, sig_r, eps_0, sig_0, R, b, reference strain of the curvature, xi of the branch).
+    # The virgin material is a loading branch from the origin, a first compression is a reversal.
+    branch = (0.0, 0.0, eyp, fyp, R0, bp, 0.0, 0.0)
+    direction, parent = 1, None
+    previous = {1: None, -1: None}  # Last branch of each direction, with its parent.
+    xi, eps_ref, reversals = {1: 0.0, -1: 0.0}, eyp, 0
+    # Opensees only treats the virgin branch as a loading branch when the first strain moves the material in tension.
+    # If the history starts with a strain of 0 (the protocols of the GUI) the first reversal doesn't degrade the
+    # curvature, otherwise it does, measured from the yield strain in compression.
+    if len(eps) != 0 and active[0] and eps[0] > 0:
+        reversals, eps_ref = 1, -eyn
+    eps_max, eps_min = 0.0, 0.0
+
+    c_strain, c_stress = 0.0, 0.0
+    for start, end, new_direction in branches(np.diff(eps, prepend=0.0)):
+        if new_direction != direction:
+            eps_r, sig_r = c_strain, c_stress
+            if direction > 0:
+                eps_max = max(eps_max, eps_r)
+            else:
+                eps_min = min(eps_min, eps_r)
+
+            # Asymptote of the new branch, with the shift of the yield stress
+            if new_direction < 0:
+                shift = 1.0 + a1 * max(0.0, (eps_max - a2 * eyp) / eyp) if eps_max > eyp else 1.0
+                Esh, fy, ey, b = bn * E0, fyn * shift, eyn * shift, bn
+                eps_0 = (-fy + Esh * ey - sig_r + E0 * eps_r) / (E0 - Esh)
+                sig_0 = -fy + Esh * (eps_0 + ey)
+            else:
+                shift = 1.0 + a3 * max(0.0, (-eps_min - a4 * eyn) / eyn) if -eps_min > eyn else 1.0
+                Esh, fy, ey, b = bp * E0, fyp * shift, eyp * shift, bp
+                eps_0 = (fy - Esh * ey - sig_r + E0 * eps_r) / (E0 - Esh)
+                sig_0 = fy + Esh * (eps_0 - ey)
+
+            # Curvature, the first reversal doesn't degrade it
+            reversals += 1
+            if reversals > 1:
+                xi[new_direction] = max(xi[new_direction], abs(eps_0 - eps_ref) / (eyp if new_direction > 0 else eyn))
+                eps_ref = eps_r
+            R = R0 * (1.0 - cR1 * xi[new_direction] / (cR2 + xi[new_direction]))
+
+            # Previous branch of the new direction, it's remembered only if the reversal is inside of it
+            candidate = previous[new_direction]
+            if candidate is not None:
+                stress_candidate = menegotto_pinto(candidate[0], eps_r)[0]
+                if new_direction > 0 and (eps_r <= candidate[0][0] or stress_candidate < sig_r):
+                    candidate = None
+                elif new_direction < 0 and (eps_r >= candidate[0][0] or stress_candidate > sig_r):
+                    candidate = None
+            previous[direction] = (branch, parent)
+            branch, parent, direction = (eps_r, sig_r, eps_0, sig_0, R, b, eps_r, xi[new_direction]), candidate, new_direction
+
+        stresses[start:end], tangents[start:end] = menegotto_pinto(branch, eps[start:end])
+        # Rejoin the remembered branch where the curves cross
+        if parent is not None:
+            stresses_p, tangents_p = menegotto_pinto(parent[0], eps[start:end])
+            cross = np.flatnonzero(stresses_p < stresses[start:end] if direction > 0 else stresses_p > stresses[start:end])
+            if len(cross) != 0:
+                stresses[start + cross[0]:end], tangents[start + cross[0]:end] = stresses_p[cross[0]:], tangents_p[cross[0]:]
+                branch, parent = parent[0], None
+                eps_ref, xi[direction] = branch[6], branch[7]
+        c_strain, c_stress = float(eps[end - 1]), float(stresses[end - 1])
+    return expand(stresses, active, 0.0), expand(tangents, active, E0)
+
+
+# %%% [02-04] CONCRETE01
+# Function to evaluate the compression envelope of Concrete01 (Kent-Scott-Park): parabola until epsc0, linear until
+# epsU and constant residual stress. The parameters are negative.
+def kent_park_envelope(strains_x, fpc, epsc0, fpcu, epsU):
+    Ec0 = 2.0 * fpc / epsc0
+    eta = strains_x / epsc0
+    slope = (fpc - fpcu) / (epsc0 - epsU)
+    stresses = np.where(strains_x > epsc0, fpc * (2.0 * eta - eta * eta),
+                        np.where(strains_x > epsU, fpc + slope * (strains_x - epsc0), fpcu))
+    tangents = np.where(strains_x > epsc0, Ec0 * (1.0 - eta), np.where(strains_x > epsU, slope, 0.0))
+    return stresses, tangents
+
+
+# Function to find the unloading line of Concrete01 from a point of the envelope, for a strain or an array of strains.
+# Returns (end strain, slope): the line reaches a stress 0 at the end strain (Karsan-Jirsa).
+def kent_park_unloading(strains_x, stresses_x, fpc, epsc0, epsU):
+    Ec0 = 2.0 * fpc / epsc0
+    eta = np.where(strains_x < epsU, epsU, strains_x) / epsc0
+    ratio = np.where(eta < 2.0, 0.145 * eta * eta + 0.13 * eta, 0.707 * (eta - 2.0) + 0.834)
+    temp1 = strains_x - ratio * epsc0
+    temp2 = stresses_x / Ec0
+    secant = temp1 <= temp2
+    ends = np.where(temp1 > -EPS, ratio * epsc0, np.where(secant, strains_x - temp1, strains_x - temp2))
+    slopes = np.where(temp1 > -EPS, Ec0, np.where(secant, stresses_x / np.minimum(temp1, -EPS), Ec0))
+    return ends, slopes
+
+
+def concrete_01(strains_x, fpc, epsc0, fpcu, epsU):
+    """
+    Kent-Scott-Park concrete without tension, the same rules as Concrete01 of opensees.
+
+    The unloading line only changes when the strain goes beyond the smallest strain of the history, so the loop is
+    over the branches of the strain history and the points of a branch are evaluated together: the reloading line, the
+    envelope after the smallest strain, and the unloading line bounded by a stress 0.
+
+    Parameters:
+    strains_x (list): Strain history, it starts from the virgin material.
+    fpc, epsc0, fpcu, epsU (float): Parameters of Concrete01, see concrete_01() from
+    S01_GUI02_A04_2_testUniaxialMaterial.py. Opensees uses them as negative values, whatever the sign.
+
+    Returns:
+    tuple: (stresses, tangents) numpy arrays, a value per strain.
+    """
+    fpc, epsc0, fpcu, epsU = -abs(fpc), -abs(epsc0), -abs(fpcu), -abs(epsU)
+    Ec0 = 2.0 * fpc / epsc0
+    strains = np.asarray(strains_x, dtype=np.float64)
+    active = active_strains(strains, equal_x = True)
+    eps = strains[active]
+    stresses, tangents = np.zeros(len(eps)), np.zeros(len(eps))
+
+    # Committed state: strain, stress, smallest strain and unloading line
+    c_strain, c_stress = 0.0, 0.0
+    c_min, c_end, c_slope = 0.0, 0.0, Ec0
+    for start, end, direction in branches(np.diff(eps, prepend=0.0)):
+        strains_b = eps[start:end]
+        strains_p = np.concatenate(([c_strain], strains_b[:-1]))
+        if direction < 0:
+            # Reloading line until the end strain (stress 0 before it and in tension)
+            stresses_b = np.where(strains_b < c_end, c_slope * (strains_b - c_end), 0.0)
+            tangents_b = np.where(strains_b < c_end, c_slope, 0.0)
+            slopes = np.full(len(strains_b), c_slope)
+
+            # Envelope after the smallest strain, each point defines a new unloading line
+            envelope = np.flatnonzero(strains_b <= c_min)
+            if len(envelope) != 0:
+                first = envelope[0]
+                stresses_b[first:], tangents_b[first:] = kent_park_envelope(strains_b[first:], fpc, epsc0, fpcu, epsU)
+                ends, slopes[first:] = kent_park_unloading(strains_b[first:], stresses_b[first:], fpc, epsc0, epsU)
+
+                # If the branch returns to the smallest strain, the line from the previous point and the envelope are
+                # equal but for the rounding, and opensees takes the larger one. The reloading line is followed point
+                # by point as opensees does, so the previous stress is the same to the last bit.
+                if strains_b[first] >= c_min - 64.0 * EPS * abs(c_min):
+                    stress_p, strain_p = c_stress, c_strain
+                    reloading = stresses_b[:first].tolist()
+                    for i, strain in enumerate(strains_b[:first].tolist()):
+                        temp = stress_p + c_slope * strain - c_slope * strain_p
+                        if strain <= 0.0 and temp > reloading[i]:
+                            reloading[i] = temp
+                        stress_p, strain_p = reloading[i], strain
+                    stresses_b[:first] = reloading
+
+            # Opensees keeps the unloading line from the previous point if it is above (only a rounding difference)
+            slopes_p = np.concatenate(([c_slope], slopes[:-1]))
+            stresses_p = np.concatenate(([c_stress], stresses_b[:-1]))
+            temp = stresses_p + slopes_p * strains_b - slopes_p * strains_p
+            above = (temp > stresses_b) & (strains_b <= 0.0)
+            stresses_b[above], tangents_b[above] = temp[above], slopes[above]
+            if len(envelope) != 0:
+                c_min, c_end, c_slope = float(strains_b[-1]), float(ends[-1]), float(slopes[-1])
+        else:
+            # Unloading line from the committed point, the stress is 0 once it reaches the end strain. It is followed
+            # point by point as opensees does (the next branch starts from its last stress), until the stress is 0.
+            unloading, stress_p, strain_p = [], c_stress, c_strain
+            for strain in strains_b.tolist():
+                temp = stress_p + c_slope * strain - c_slope * strain_p
+                if strain > 0.0 or temp > 0.0:
+                    break
+                unloading.append(temp)
+                stress_p, strain_p = temp, strain
+            stresses_b, tangents_b = np.zeros(len(strains_b)), np.zeros(len(strains_b))
+            stresses_b[:len(unloading)], tangents_b[:len(unloading)] = unloading, c_slope
+        stresses[start:end], tangents[start:end] = stresses_b, tangents_b
+        c_strain, c_stress = float(eps[end - 1]), float(stresses[end - 1])
+    return expand(stresses, active, 0.0), expand(tangents, active, Ec0)
+
+
+# %%% [02-05] CONCRETE02
+# Function to evaluate the compression envelope of Concrete02, the same curve as Concrete01.
+def concrete_02_compression(strains_x, fpc, epsc0, fpcu, epsU):
+    Ec0 = 2.0 * fpc / epsc0
+    ratio = strains_x / epsc0
+    stresses = np.where(strains_x >= epsc0, fpc * ratio * (2.0 - ratio),
+                        np.where(strains_x > epsU, (fpcu - fpc) * (strains_x - epsc0) / (epsU - epsc0) + fpc, fpcu))
+    tangents = np.where(strains_x >= epsc0, Ec0 * (1.0 - ratio),
+                        np.where(strains_x > epsU, (fpcu - fpc) / (epsU - epsc0), 1.0e-10))
+    return stresses, tangents
+
+
+# Function to evaluate the tension envelope of Concrete02: linear until ft and linear softening with Ets.
+def concrete_02_tension(strains_x, Ec0, ft, Ets):
+    eps0 = ft / Ec0
+    epsu = ft * (1.0 / Ets + 1.0 / Ec0)
+    stresses = np.where(strains_x <= eps0, strains_x * Ec0, np.where(strains_x <= epsu, ft - Ets * (strains_x - eps0), 0.0))
+    tangents = np.where(strains_x <= eps0, Ec0, np.where(strains_x <= epsu, -Ets, 1.0e-10))
+    return stresses, tangents
+
+
+def concrete_02(strains_x, fpc, epsc0, fpcu, epsU, lamb, ft, Ets):
+    """
+    Concrete with linear tension softening, the same rules as Concrete02 of opensees.
+
+    The unloading and reloading lines only change when the strain goes beyond the smallest strain (compression) or the
+    largest tension strain of the history, so the loop is over the branches of the strain history and the points of a
+    branch are evaluated together, by regions: compression envelope, unloading-reloading in compression, reloading in
+    tension and tension envelope.
+
+    Parameters:
+    strains_x (list): Strain history, it starts from the virgin material.
+    fpc, epsc0, fpcu, epsU, lamb, ft, Ets (float): Parameters of Concrete02, see concrete_02() from
+    S01_GUI02_A04_2_testUniaxialMaterial.py. Opensees uses fpc, epsc0, fpcu and epsU as negative values, whatever
+    the sign.
+
+    Returns:
+    tuple: (stresses, tangents) numpy arrays, a value per strain.
+    """
+    fpc, epsc0, fpcu, epsU = -abs(fpc), -abs(epsc0), -abs(fpcu), -abs(epsU)
+    Ec0 = 2.0 * fpc / epsc0
+    strains = np.asarray(strains_x, dtype=np.float64)
+    # Opensees ignores a change smaller than EPS from the previous strain, also if that strain was ignored
+    previous = np.concatenate(([0.0], strains[:-1]))
+    active = np.abs(strains - previous) >= EPS
+    eps, eps_p = strains[active], previous[active]
+    stresses, tangents = np.zeros(len(eps)), np.zeros(len(eps))
+
+    # Point where all the unloading lines meet, on the initial elastic line
+    eps_r = divide(fpcu - lamb * Ec0 * epsU, Ec0 * (1.0 - lamb))
+    sig_r = Ec0 * eps_r
+
+    # Committed state: stress, smallest strain and largest tension strain (from ept)
+    c_stress, ec_min, dept = 0.0, 0.0, 0.0
+    lines_min = None
+    for start, end, direction in branches(np.diff(eps, prepend=0.0)):
+        strains_b = eps[start:end]
+        stresses_b, tangents_b = np.zeros(len(strains_b)), np.zeros(len(strains_b))
+
+        # Unloading-reloading lines of the smallest strain: er and the strain ept where the stress is 0
+        if lines_min != ec_min:
+            sig_m = float(concrete_02_compression(np.float64(ec_min), fpc, epsc0, fpcu, epsU)[0])
+            er = divide(sig_m - sig_r, ec_min - eps_r)
+            ept = ec_min - divide(sig_m, er)
+            lines_min = ec_min
+        epn = ept + dept
+
+        # Regions of the branch: [compression envelope | unloading-reloading in compression | reloading in tension |
+        # tension envelope], a branch goes through them in order (the compression envelope only in compression)
+        if direction < 0:
+            n_envelope = int(np.count_nonzero(strains_b < ec_min))
+            n_tension = int(np.count_nonzero(strains_b > ept))
+            regions = [('tension', 0, n_tension), ('compression', n_tension, len(strains_b) - n_envelope),
+                       ('envelope_c', len(strains_b) - n_envelope, len(strains_b))]
+        else:
+            n_compression = int(np.count_nonzero(strains_b <= ept))
+            n_envelope = int(np.count_nonzero(strains_b > epn))
+            regions = [('compression', 0, n_compression), ('tension', n_compression, len(strains_b) - n_envelope),
+                       ('envelope_t', len(strains_b) - n_envelope, len(strains_b))]
+
+        for region, first, last in regions:
+            if first == last:
+                continue
+            strains_r = strains_b[first:last]
+            if region == 'envelope_c':
+                stresses_b[first:last], tangents_b[first:last] = concrete_02_compression(strains_r, fpc, epsc0, fpcu, epsU)
+                ec_min = float(strains_r[-1])
+            elif region == 'envelope_t':
+                stresses_b[first:last], tangents_b[first:last] = concrete_02_tension(strains_r - ept, Ec0, ft, Ets)
+                dept = float(strains_r[-1]) - ept
+            elif region == 'tension':
+                # Secant line to the largest tension point
+                stress_n = float(concrete_02_tension(dept, Ec0, ft, Ets)[0])
+                secant = divide(stress_n, dept) if dept != 0.0 else Ec0
+                stresses_b[first:last], tangents_b[first:last] = secant * (strains_r - ept), secant
+            else:
+                # Elastic line bounded by the unloading (sig_min) and reloading (sig_max) lines. The first point is
+                # from the committed stress, the rest of the region from the first point.
+                stress_p = c_stress if first == 0 else float(stresses_b[first - 1])
+                sig_min = sig_m + er * (strains_r - ec_min)
+                sig_max = er * 0.5 * (strains_r - ept)
+                elastic = np.empty(len(strains_r))
+                elastic[0] = stress_p + Ec0 * (strains_r[0] - eps_p[start + first])
+                if er < Ec0:
+                    # A bound isn't left once it is reached, the elastic line is steeper than er and er / 2
+                    elastic[0] = sig_min[0] if elastic[0] <= sig_min[0] else elastic[0]
+                    elastic[0] = sig_max[0] if elastic[0] >= sig_max[0] else elastic[0]
+                    elastic[1:] = elastic[0] + Ec0 * (strains_r[1:] - strains_r[0])
+                else:
+                    for i in range(len(strains_r)):
+                        if i != 0:
+                            elastic[i] = elastic[i - 1] + Ec0 * (strains_r[i] - strains_r[i - 1])
+                        elastic[i] = sig_min[i] if elastic[i] <= sig_min[i] else elastic[i]
+                        elastic[i] = sig_max[i] if elastic[i] >= sig_max[i] else elastic[i]
+                stresses_r = np.where(elastic <= sig_min, sig_min, elastic)
+                tangents_r = np.where(elastic <= sig_min, er, Ec0)
+                tangents_b[first:last] = np.where(stresses_r >= sig_max, 0.5 * er, tangents_r)
+                stresses_b[first:last] = np.where(stresses_r >= sig_max, sig_max, stresses_r)
+        stresses[start:end], tangents[start:end] = stresses_b, tangents_b
+        c_stress = float(stresses[end - 1])
+    return expand(stresses, active, 0.0), expand(tangents, active, Ec0)
+
+
+# Dispatch table: model name -> native function. The arguments are the same as material_builders of
+# S01_GUI02_A04_2_testUniaxialMaterial.py, with the strain history instead of the mat_tag.
+native_kernels = {
+    'SteelMPF': steel_mpf,
+    'Steel02': steel_02,
+    'Steel01': steel_01,
+    'Concrete01': concrete_01,
+    'Concrete02': concrete_02,
+}
+
+
+# Function to get the initial tangent of a native model, MinMax uses it when the material fails.
+def initial_tangent(model_x, params_x):
+    if model_x in ('Concrete01', 'Concrete02'):
+        return 2.0 * abs(params_x[0]) / abs(params_x[1])
+    return params_x[2] if model_x == 'SteelMPF' else params_x[1]
+
+
+# %%% [02-06] RESPONSE OF THE MATERIAL
+# Quantities that native_response() can record. The native models have no damping tangent, opensees returns 0.
+native_states = ['tangent', 'damp_tangent']
+
+
+def native_response(strains_x, model_args_x, min_max_args_x = [], record_x = ()):
+    """
+    Same as opensees_response() from S01_GUI02_A02_2_fileText.py, evaluated with the native functions.
+
+    Parameters:
+    strains_x (list): Strain history.
+    model_args_x (list): Arguments of the material, as returned by model_arg(). The model must be in native_kernels.
+    min_max_args_x (list): Arguments of the MinMax material, as returned by min_max_model_arg().
+    record_x (list): Names of native_states to record after each step.
+
+    Returns:
+    tuple: (stresses, states) where states is a dictionary name -> list with a value per strain.
+    """
+    model, mat_tag, params = Mat.parse_model_args(model_args_x)
+    strains = np.asarray(strains_x, dtype=np.float64)
+    E0 = initial_tangent(model, params)
+
+    # MinMax: the material fails when the strain reaches a limit. It doesn't see the later strains, the stress is 0
+    # and the tangent is 1e-8 times the initial tangent.
+    n_active = len(strains)
+    if len(min_max_args_x) != 0:
+        matTag_minmax, OtherTag_minmax, minStrain, maxStrain = Mat.parse_min_max_args(min_max_args_x)
+        failed = np.nonzero((strains >= maxStrain) | (strains <= minStrain))[0]
+        if len(failed) != 0:
+            n_active = failed[0]
+
+    stresses, tangents = np.zeros(len(strains)), np.full(len(strains), 1.0e-8 * E0)
+    stresses[:n_active], tangents[:n_active] = native_kernels[model](strains[:n_active], *params)
+
+    states = {}
+    for name in record_x:
+        if name == 'tangent':
+            states[name] = tangents.tolist()
+        elif name == 'damp_tangent':
+            states[name] = [0.0] * len(strains)
+    return stresses.tolist(), states
+
+
+# %%% [02-07] VERIFICATION
+def verify_native(strains_x, model_args_x, min_max_args_x = [], tol_x = 1e-6):
+    """
+    Compare native_response() with opensees for a strain history.
+
+    Parameters:
+    strains_x (list): Strain history.
+    model_args_x (list): Arguments of the material, the model must be in native_kernels.
+    min_max_args_x (list): Arguments of the MinMax material.
+    tol_x (float): Tolerance of the relative error.
+
+    Returns:
+    dict: 'stress' and 'tangent' with the largest error relative to the largest value of opensees, 'index' with the
+          first strain where the stress error is larger than tol_x (None if there isn't) and 'passed'.
+    """
+    stresses, states = native_response(strains_x, model_args_x, min_max_args_x, record_x = ['tangent'])
+
+    stresses_opss, tangents_opss = [], []
+    with Mat.domain_lock:
+        Mat.test_material(model_args_x, min_max_args_x)
+        for strain in strains_x:
+            ops.setStrain(strain)
+            stresses_opss.append(ops.getStress())
+            tangents_opss.append(ops.getTangent())
+
+    errors = {}
+    for name, values, values_opss in [('stress', stresses, stresses_opss), ('tangent', states['tangent'], tangents_opss)]:
+        values, values_opss = np.array(values), np.array(values_opss)
+        scale = max(np.max(np.abs(values_opss), initial=0.0), EPS)
+        errors[name] = np.abs(values - values_opss) / scale
+    index = np.nonzero(errors['stress'] > tol_x)[0]
+    return {'stress': float(np.max(errors['stress'], initial=0.0)),
+            'tangent': float(np.max(errors['tangent'], initial=0.0)),
+            'index': int(index[0]) if len(index) != 0 else None,
+            'passed': len(index) == 0 and np.max(errors['tangent'], initial=0.0) <= tol_x}
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] verify_native()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import time
+    import S01_GUI02_A02_2_fileText as TxT
+
+    # Protocols of the GUI: the default monotonic load (compression and tension) and the cyclic loads
+    peaks_c, peaks_t = ['-0.0010', '1', '-0.0020', '1', '-0.0030', '1', '-0.0040', '1', '-0.0050', '1'], \
+        ['0.00005', '1', '0.00010', '1', '0.00015', '1', '0.00020', '1', '0.00025', '1']
+    strains_c, strains_t = TxT.strain_load(['monotonic', '-', '0.0001', '-0.006', '0.0005'])
+    protocols = {
+        'monotonic C': strains_c,
+        'monotonic T': strains_t,
+        'cyclic C': TxT.strain_load(['cyclic', 'compression', '0.0001'] + peaks_c),
+        'cyclic T': TxT.strain_load(['cyclic', 'traction', '0.00001'] + peaks_t),
+        'cyclic CT': TxT.strain_load(['cyclic', 'combined', '0.0001', '-0.002', '0.002', '2', '-0.004', '0.004', '2',
+                                      '-0.01', '0.01', '2', '0', '0', '0', '0', '0', '0']),
+    }
+    materials = [
+        (['Steel01', 1, '4200', '2100000', '0.02', '0.05', '1', '0.05', '1'], []),
+        (['Steel02', 1, '4200', '2100000', '0.01', '18', '0.925', '0.15', '0.03', '1', '0.03', '1', '0'], []),
+        (['Steel02', 1, '4200', '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '1000'], []),
+        (['SteelMPF', 1, '4200', '3000', '2100000', '0.02', '0.005', '20', '0.925', '0.15', '0.05', '1', '0.05', '1'], []),
+        (['Steel02', 1, '4200', '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '0'],
+         ['MinMax', 2, '1', '-0.008', '0.009']),
+        (['Concrete01', 1, '-250.0', '-0.002', '-50', '0.007'], []),
+        (['Concrete02', 1, '-250.0', '-0.002', '-50', '0.007', '0.6', '34.78', '75000'], []),
+        (['Concrete02', 1, '-250.0', '-0.002', '-50', '0.007', '0.1', '34.78', '7500'], []),
+        (['Concrete01', 1, '-250.0', '-0.002', '-50', '0.007'], ['MinMax', 2, '1', '-0.0035', '0.01']),
+    ]
+    for model_args, min_max_args in materials:
+        for protocol, strains in protocols.items():
+            t0 = time.perf_counter()
+            TxT.opensees_response(strains, model_args, min_max_args, record_x = ['tangent'])
+            t1 = time.perf_counter()
+            native_response(strains, model_args, min_max_args, record_x = ['tangent'])
+            t2 = time.perf_counter()
+            result = verify_native(strains, model_args, min_max_args)
+            print(f"{model_args[0]:10s} MinMax={len(min_max_args) != 0:d} {protocol:11s}: opensees {t1 - t0:.4f} s, "
+                  f"native {t2 - t1:.4f} s, stress error = {result['stress']:.1e}, "
+                  f"tangent error = {result['tangent']:.1e}, passed = {result['passed']}")
+
+# %%% [03-01] verify_native() with random strain histories
+# Run only if it is the main file.
+if __name__ == '__main__':
+    # The protocols of the GUI are smooth and start at 0. A random walk has reversals at any strain, elastic ones
+    # included, and starts with the material already moved.
+    rng = np.random.default_rng(0)
+    walks = [np.cumsum(rng.normal(0, scale, 400)) for scale in (2e-4, 1e-3) for _ in range(20)]
+    for model_args, min_max_args in materials + [
+            (['SteelMPF', 1, '4200', '4200', '2100000', '0.01', '0.01', '20', '0.925', '0.15', '0', '1', '0', '1'], [])]:
+        results = [verify_native(strains.tolist(), model_args, min_max_args, tol_x = 1e-8) for strains in walks]
+        print(f"{model_args[0]:10s} MinMax={len(min_max_args) != 0:d} random walks: "
+              f"{sum(result['passed'] for result in results)}/{len(results)} passed, "
+              f"stress error = {max(result['stress'] for result in results):.1e}")
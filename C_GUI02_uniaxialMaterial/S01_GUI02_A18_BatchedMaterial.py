@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A18_BatchedMaterial.py
+COMENTARIOS:    Evalua M conjuntos de parametros bajo una misma historia de deformaciones.
+"""
+
+# %% [00] INTRODUCTION
+# Los barridos, las calibraciones y las simulaciones de Monte Carlo evaluan el
+# mismo modelo con miles de conjuntos de parametros bajo una misma carga. Aqui
+# las reglas de Steel01, Steel02 y Concrete01 (las mismas de
+# S01_GUI02_A17_NativeMaterial.py) avanzan los M estados del material a la vez:
+# como la historia de deformaciones es comun, las inversiones de carga tambien lo
+# son, y cada tramo se evalua como una matriz (M, puntos del tramo). Los
+# parametros son una matriz (M, n_params), con el orden de material_builders de
+# S01_GUI02_A04_2_testUniaxialMaterial.py, y el resultado es una matriz (M, N).
+
+
+# %% [01] LIBRARIES
+import numpy as np
+import S01_GUI02_A02_2_fileText as TxT
+import S01_GUI02_A17_NativeMaterial as Nat
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] SUPPORT FUNCTIONS
+# Function to give a value to every strain of each material, the strains that don't change the state repeat the
+# previous value. Same as expand() from S01_GUI02_A17_NativeMaterial.py, for a matrix (M, active strains).
+def expand_rows(values_x, active_x, initial_x):
+    index = np.cumsum(active_x) - 1
+    expanded = np.empty((values_x.shape[0], len(active_x)))
+    expanded[:, index >= 0] = values_x[:, index[index >= 0]]
+    expanded[:, index < 0] = initial_x
+    return expanded
+
+
+# %%% [02-01] STEEL01
+def steel_01(strains_x, params_x):
+    """
+    Steel01 for M parameter sets, see steel_01() from S01_GUI02_A17_NativeMaterial.py.
+
+    The committed strain, the loading direction and the extreme strains only depend on the strain history, so they
+    are the same for every material. The stresses and the shifts of the yield stress are vectors of M values.
+
+    Parameters:
+    strains_x (list): Strain history, it starts from the virgin material.
+    params_x (numpy.ndarray): Matrix (M, 7), a row (Fy, E0, b, a1, a2, a3, a4) per material.
+
+    Returns:
+    numpy.ndarray: Stresses (M, N).
+    """
+    Fy, E0, b, a1, a2, a3, a4 = params_x.T
+    strains = np.asarray(strains_x, dtype=np.float64)
+    active = Nat.active_strains(strains)
+    eps = strains[active]
+    stresses = np.empty((len(params_x), len(eps)))
+    Esh, epsy, fy_one_minus_b = b * E0, Fy / E0, Fy * (1.0 - b)
+
+    # Committed state, the shifts of the yield stress are different for each material
+    c_strain, c_stress = 0.0, np.zeros(len(params_x))
+    c_max, c_min, loading = 0.0, 0.0, 0
+    shift_p, shift_n = np.ones(len(params_x)), np.ones(len(params_x))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start, end, direction in Nat.branches(np.diff(eps, prepend=0.0)):
+            # First point, with the yield stresses before the reversal
+            strain = float(eps[start])
+            c1 = Esh * strain
+            c = c_stress + E0 * (strain - c_strain)
+            stress = np.where(c1 + shift_p * fy_one_minus_b < c, c1 + shift_p * fy_one_minus_b, c)
+            stress = np.where(c1 - shift_n * fy_one_minus_b > stress, c1 - shift_n * fy_one_minus_b, stress)
+            stresses[:, start] = stress
+
+            # Reversal of the load, the yield stress of the new direction is shifted
+            if loading == 1 and direction < 0:
+                c_max = max(c_max, c_strain)
+                shift_n = 1.0 + a1 * ((c_max - c_min) / (2.0 * a2 * epsy)) ** 0.8
+            elif loading == -1 and direction > 0:
+                c_min = min(c_min, c_strain)
+                shift_p = 1.0 + a3 * ((c_max - c_min) / (2.0 * a4 * epsy)) ** 0.8
+            loading = direction
+
+            # Rest of the branch, the elastic line doesn't return once it reaches a yield line
+            strains_b = eps[start + 1:end]
+            c = stress[:, None] + E0[:, None] * (strains_b - strain)
+            c1 = Esh[:, None] * strains_b
+            yield_p, yield_n = (shift_p * fy_one_minus_b)[:, None], (shift_n * fy_one_minus_b)[:, None]
+            stresses_b = np.where(c1 + yield_p < c, c1 + yield_p, c)
+            stresses_b = np.where(c1 - yield_n > stresses_b, c1 - yield_n, stresses_b)
+            stresses[:, start + 1:end] = stresses_b
+            c_strain, c_stress = float(eps[end - 1]), stresses[:, end - 1]
+    return expand_rows(stresses, active, 0.0)
+
+
+# %%% [02-02] STEEL02
+def steel_02(strains_x, params_x):
+    """
+    Steel02 for M parameter sets, see steel_02() from S01_GUI02_A17_NativeMaterial.py.
+
+    Parameters:
+    strains_x (list): Strain history, it starts from the virgin material.
+    params_x (numpy.ndarray): Matrix (M, 11), a row (Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit) per material.
+
+    Returns:
+    numpy.ndarray: Stresses (M, N).
+    """
+    Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit = params_x.T
+    Esh, epsy = b * E0, Fy / E0
+    strains = np.asarray(strains_x, dtype=np.float64)
+    steps = np.diff(strains, prepend=0.0)
+    # The initial stress is an initial strain of each material
+    eps_init = np.where(sigInit != 0, sigInit / E0, 0.0)
+    eps = strains[None, :] + eps_init[:, None]
+    stresses = np.repeat(sigInit[:, None], len(strains), axis=1)
+
+    # The materials are virgin until the first change of strain larger than 10 EPS
+    moved = np.flatnonzero(np.abs(steps) >= 10 * Nat.EPS)
+    if len(moved) == 0:
+        return stresses
+    first = int(moved[0])
+    steps[:first] = 0.0
+
+    eps_max, eps_min = epsy.copy(), -epsy
+    eps_r, sig_r = np.zeros(len(params_x)), np.zeros(len(params_x))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start, end, direction in Nat.branches(steps):
+            if start == first:
+                eps_s0, sig_s0 = (eps_max, Fy) if direction > 0 else (eps_min, -Fy)
+                eps_pl = eps_s0
+            else:
+                # Reversal of the load: new origin (eps_r, sig_r) and new asymptote (eps_s0, sig_s0)
+                eps_r, sig_r = eps[:, start - 1], stresses[:, start - 1]
+                if direction > 0:
+                    eps_min = np.minimum(eps_min, eps_r)
+                    shift = 1.0 + a3 * ((eps_max - eps_min) / (2.0 * a4 * epsy)) ** 0.8
+                    eps_s0 = (Fy * shift - Esh * epsy * shift - sig_r + E0 * eps_r) / (E0 - Esh)
+                    sig_s0 = Fy * shift + Esh * (eps_s0 - epsy * shift)
+                    eps_pl = eps_max
+                else:
+                    eps_max = np.maximum(eps_max, eps_r)
+                    shift = 1.0 + a1 * ((eps_max - eps_min) / (2.0 * a2 * epsy)) ** 0.8
+                    eps_s0 = (-Fy * shift + Esh * epsy * shift - sig_r + E0 * eps_r) / (E0 - Esh)
+                    sig_s0 = -Fy * shift + Esh * (eps_s0 + epsy * shift)
+                    eps_pl = eps_min
+
+            # Curvature of the transition, it decreases with the plastic excursion
+            xi = np.abs((eps_pl - eps_s0) / epsy)
+            R = R0 * (1.0 - (cR1 * xi) / (cR2 + xi))
+            branch = (eps_r[:, None], sig_r[:, None], eps_s0[:, None], sig_s0[:, None], R[:, None], b[:, None])
+            stresses[:, start:end] = Nat.menegotto_pinto(branch, eps[:, start:end])[0]
+    return stresses
+
+
+# %%% [02-03] CONCRETE01
+def concrete_01(strains_x, params_x):
+    """
+    Concrete01 for M parameter sets, see concrete_01() from S01_GUI02_A17_NativeMaterial.py.
+
+    The smallest strain of the history is the same for every material, the unloading lines (end strain and slope)
+    are vectors of M values. The unloading line is evaluated from the committed point, so the stresses can differ
+    from opensees in the last bits.
+
+    Parameters:
+    strains_x (list): Strain history, it starts from the virgin material.
+    params_x (numpy.ndarray): Matrix (M, 4), a row (fpc, epsc0, fpcu, epsU) per material.
+
+    Returns:
+    numpy.ndarray: Stresses (M, N).
+    """
+    fpc, epsc0, fpcu, epsU = (-np.abs(params_x.T)[:, :, None])
+    Ec0 = 2.0 * fpc[:, 0] / epsc0[:, 0]
+    strains = np.asarray(strains_x, dtype=np.float64)
+    active = Nat.active_strains(strains, equal_x = True)
+    eps = strains[active]
+    stresses = np.empty((len(params_x), len(eps)))
+
+    # Committed state: strain, stress, smallest strain and unloading line of each material
+    c_strain, c_stress, c_min = 0.0, np.zeros(len(params_x)), 0.0
+    c_end, c_slope = np.zeros(len(params_x)), Ec0
+    for start, end, direction in Nat.branches(np.diff(eps, prepend=0.0)):
+        strains_b = eps[start:end]
+        if direction < 0:
+            # Reloading line until the end strain (stress 0 before it and in tension)
+            stresses_b = np.where(strains_b < c_end[:, None], c_slope[:, None] * (strains_b - c_end[:, None]), 0.0)
+            slopes = np.repeat(c_slope[:, None], len(strains_b), axis=1)
+
+            # Envelope after the smallest strain, each point defines a new unloading line
+            envelope = np.flatnonzero(strains_b <= c_min)
+            if len(envelope) != 0:
+                first = envelope[0]
+                stresses_b[:, first:] = Nat.kent_park_envelope(strains_b[first:], fpc, epsc0, fpcu, epsU)[0]
+                ends, slopes[:, first:] = Nat.kent_park_unloading(strains_b[first:], stresses_b[:, first:], fpc, epsc0,
+                                                                  epsU)
+
+            # Opensees keeps the unloading line from the previous point if it is above (only a rounding difference)
+            slopes_p = np.concatenate((c_slope[:, None], slopes[:, :-1]), axis=1)
+            stresses_p = np.concatenate((c_stress[:, None], stresses_b[:, :-1]), axis=1)
+            strains_p = np.concatenate(([c_strain], strains_b[:-1]))
+            temp = stresses_p + slopes_p * strains_b - slopes_p * strains_p
+            stresses_b = np.where((temp > stresses_b) & (strains_b <= 0.0), temp, stresses_b)
+            if len(envelope) != 0:
+                c_min, c_end, c_slope = float(strains_b[-1]), ends[:, -1], slopes[:, -1]
+        else:
+            # Unloading line from the committed point, the stress is 0 once it reaches the end strain
+            temp = c_stress[:, None] + c_slope[:, None] * strains_b - c_slope[:, None] * c_strain
+            stresses_b = np.where((temp <= 0.0) & (strains_b <= 0.0), temp, 0.0)
+        stresses[:, start:end] = stresses_b
+        c_strain, c_stress = float(eps[end - 1]), stresses[:, end - 1]
+    return expand_rows(stresses, active, 0.0)
+
+
+# Dispatch table: model name -> batched function. The columns of the parameters are the arguments of
+# material_builders of S01_GUI02_A04_2_testUniaxialMaterial.py, without the mat_tag.
+batched_kernels = {
+    'Steel02': steel_02,
+    'Steel01': steel_01,
+    'Concrete01': concrete_01,
+}
+
+
+# %%% [02-04] RESPONSE OF THE MATERIALS
+def batch_response(strains_x, model_x, params_x, limits_x = None):
+    """
+    Stresses of M parameter sets of a model under one strain history.
+
+    Parameters:
+    strains_x (list): Strain history.
+    model_x (str): Name of the model, it must be in batched_kernels.
+    params_x (numpy.ndarray): Matrix (M, n_params), a row of parameters per material.
+    limits_x (numpy.ndarray): Matrix (M, 2) with (minStrain, maxStrain) of a MinMax material for each row, or None.
+
+    Returns:
+    numpy.ndarray: Stresses (M, N).
+    """
+    strains = np.asarray(strains_x, dtype=np.float64)
+    params = np.atleast_2d(np.asarray(params_x, dtype=np.float64))
+    stresses = batched_kernels[model_x](strains, params)
+
+    # MinMax: the material fails when the strain reaches a limit, the stress is 0 from there on
+    if limits_x is not None:
+        limits = np.atleast_2d(np.asarray(limits_x, dtype=np.float64))
+        failed = (strains[None, :] <= limits[:, :1]) | (strains[None, :] >= limits[:, 1:])
+        stresses[np.logical_or.accumulate(failed, axis=1)] = 0.0
+    return stresses
+
+
+# %%% [02-05] DATA PLOT OF THE MATERIALS
+def batch_data_plot(model_x, params_x, load_args_x, limits_x = None):
+    """
+    DataPlot of data_plot() from S01_GUI02_A02_2_fileText.py for M parameter sets of a model.
+
+    Parameters:
+    model_x (str): Name of the model, it must be in batched_kernels.
+    params_x (numpy.ndarray): Matrix (M, n_params), a row of parameters per material.
+    load_args_x (list): Arguments of the strain load, as returned by read_selected_files_strain().
+    limits_x (numpy.ndarray): Matrix (M, 2) with (minStrain, maxStrain) of a MinMax material for each row, or None.
+
+    Returns:
+    numpy.ndarray: Array (M, N, C) with the DataPlot of each material, C = 4 for the monotonic load (compression and
+                   tension, padded with NaN) and C = 2 for the cyclic loads.
+    """
+    params = np.atleast_2d(np.asarray(params_x, dtype=np.float64))
+    if load_args_x[0] == 'monotonic':
+        strains_C, strains_T = TxT.strain_load(load_args_x)
+        data = np.full((len(params), max(len(strains_C), len(strains_T)), 4), np.nan)
+        data[:, :len(strains_C), 0], data[:, :len(strains_T), 2] = strains_C, strains_T
+        data[:, :len(strains_C), 1] = batch_response(strains_C, model_x, params, limits_x)
+        data[:, :len(strains_T), 3] = batch_response(strains_T, model_x, params, limits_x)
+    else:
+        strains = TxT.strain_load(load_args_x)
+        data = np.empty((len(params), len(strains), 2))
+        data[:, :, 0] = strains
+        data[:, :, 1] = batch_response(strains, model_x, params, limits_x)
+    return data
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] batch_response()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import time
+
+    load_args = ['cyclic', 'combined', '0.0001', '-0.002', '0.002', '2', '-0.004', '0.004', '2', '-0.01', '0.01', '2',
+                 '0', '0', '0', '0', '0', '0']
+    strains = TxT.strain_load(load_args)
+    rng = np.random.default_rng(0)
+    M = 10000
+
+    # Random parameter sets around the default values of the GUI
+    samples = {
+        'Steel01': np.column_stack((rng.uniform(2800, 5000, M), rng.uniform(1.9e6, 2.1e6, M), rng.uniform(0.005, 0.05, M),
+                                    rng.uniform(0, 0.1, M), np.ones(M), rng.uniform(0, 0.1, M), np.ones(M))),
+        'Steel02': np.column_stack((rng.uniform(2800, 5000, M), rng.uniform(1.9e6, 2.1e6, M), rng.uniform(0.005, 0.05, M),
+                                    rng.uniform(10, 25, M), np.full(M, 0.925), np.full(M, 0.15), rng.uniform(0, 0.1, M),
+                                    np.ones(M), rng.uniform(0, 0.1, M), np.ones(M), rng.choice([0.0, 1000.0], M))),
+        'Concrete01': np.column_stack((-rng.uniform(150, 500, M), -rng.uniform(0.0015, 0.003, M),
+                                       -rng.uniform(0, 150, M), -rng.uniform(0.004, 0.01, M))),
+    }
+    for model, params in samples.items():
+        t0 = time.perf_counter()
+        stresses = batch_response(strains, model, params)
+        t1 = time.perf_counter()
+
+        # Compare a subset with opensees, one material at a time
+        check = rng.choice(M, 50, replace=False)
+        t2 = time.perf_counter()
+        stresses_opss = np.array([TxT.opensees_response(strains, [model, 1] + [str(value) for value in params[i]])[0]
+                                  for i in check])
+        t3 = time.perf_counter()
+        error = np.max(np.abs(stresses[check] - stresses_opss)) / np.max(np.abs(stresses_opss))
+        print(f"{model:10s} {stresses.shape}: batch {t1 - t0:.2f} s, opensees (estimated for M) "
+              f"{(t3 - t2) * M / len(check):.2f} s, error = {error:.1e}")
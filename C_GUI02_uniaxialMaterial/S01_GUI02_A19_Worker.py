@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A19_Worker.py
+COMENTARIOS:    Ejecuta los callbacks de la GUI en un hilo de trabajo, con cancelacion y antirrebote.
+"""
+
+# %% [00] INTRODUCTION
+# Los callbacks de la GUI (show_material_model, add_response, show_cyclic_video)
+# se ejecutan en un hilo de trabajo, para que el notebook no se congele mientras
+# se calcula la respuesta. Solo hay un pedido en ejecucion: un pedido nuevo
+# cancela el anterior, que se detiene en el siguiente punto de control (cada
+# chunk de data_plot_stream(), cada fotograma del video) y el nuevo empieza
+# cuando el anterior termino. El dominio de opensees es compartido, su unico
+# dueño es quien tiene Mat.domain_lock (S01_GUI02_A04_2_testUniaxialMaterial.py).
+# Los widgets de parametros disparan un callback por cada tecla; Debouncer junta
+# las rafagas de cambios en un solo calculo con el ultimo estado, y no calcula
+# si los parametros efectivos no cambiaron.
+
+
+# %% [01] LIBRARIES
+import threading
+import time
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] CANCELLATION
+class Cancelled(Exception):
+    """
+    A newer request replaced the request in execution.
+    """
+
+
+# %%% [02-01] WORKER
+class Worker:
+    """
+    Runs one request at a time in a background thread. A new request cancels the previous one.
+
+    Parameters:
+    report_x (callable): Function that receives the progress messages and the errors, ej. to show them in the GUI.
+    report_period (float): Minimum time between two progress messages of a stream, in seconds.
+    """
+
+    def __init__(self, report_x=None, report_period=0.1):
+        self.report = report_x
+        self.report_period = report_period
+        self.lock = threading.Lock()
+        self.current = None  # (thread, cancel event) of the last request
+        self.local = threading.local()  # Cancel event of the request of each thread
+
+    def submit(self, function_x, *args, **kwargs):
+        """
+        Cancel the request in execution and run function_x(*args, **kwargs) when it stops.
+
+        Returns:
+        threading.Thread: Thread of the request.
+        """
+        cancel = threading.Event()
+        with self.lock:
+            previous = self.current
+            if previous is not None:
+                previous[1].set()
+            thread = threading.Thread(target=self._run, args=(previous, cancel, function_x, args, kwargs), daemon=True)
+            self.current = (thread, cancel)
+        thread.start()
+        return thread
+
+    def _run(self, previous, cancel, function_x, args, kwargs):
+        # The requests never overlap, they share the widgets, the figures of pyplot and the domain of opensees.
+        if previous is not None:
+            previous[0].join()
+        if cancel.is_set():
+            return
+        self.local.cancel = cancel
+        try:
+            function_x(*args, **kwargs)
+        except Cancelled:
+            pass
+        except Exception as e:
+            # The callbacks show their message before raising, an unexpected error is shown as well.
+            if self.report is not None:
+                self.report(str(e) or type(e).__name__)
+        finally:
+            self.local.cancel = None
+
+    def wait(self):
+        """
+        Wait until the last request ends.
+        """
+        with self.lock:
+            current = self.current
+        if current is not None:
+            current[0].join()
+
+    def cancelled(self):
+        cancel = getattr(self.local, 'cancel', None)
+        return cancel is not None and cancel.is_set()
+
+    # Checkpoint of the requests. Outside the worker it never raises.
+    def check(self):
+        if self.cancelled():
+            raise Cancelled()
+
+    def cancellable(self, stream_x, message_x=None):
+        """
+        Generator with the chunks of stream_x (ej. data_plot_stream()) that stops when the request is cancelled.
+
+        Parameters:
+        message_x (str): Progress message, formatted with the number of strains calculated, ej. 'Strains: {}'.
+
+        Returns:
+        The return value of stream_x.
+        """
+        strains, last = 0, None
+        try:
+            while True:
+                self.check()
+                try:
+                    chunk = next(stream_x)
+                except StopIteration as stop:
+                    return stop.value
+                strains += len(chunk[1])
+                if message_x is not None and self.report is not None and \
+                        (last is None or time.perf_counter() - last >= self.report_period):
+                    self.report(message_x.format(strains))
+                    last = time.perf_counter()
+                yield chunk
+        finally:
+            # Closing the stream releases the domain of opensees.
+            stream_x.close()
+
+
+# %%% [02-02] DEBOUNCER
+class Debouncer:
+    """
+    Merges the bursts of changes of the registered widgets in one call of function_x, quiet_x seconds after the last
+    change. The call is skipped if key_x() (the effective parameters) is the same as the last key remembered.
+
+    Parameters:
+    function_x (callable): Function without arguments, it reads the latest state of the widgets.
+    key_x (callable): Function that returns the effective parameters (hashable). None never skips a call.
+    quiet_x (float): Quiet period, in seconds.
+    """
+
+    def __init__(self, function_x, key_x=None, quiet_x=0.3):
+        self.function = function_x
+        self.key = key_x
+        self.quiet = quiet_x
+        self.lock = threading.Lock()
+        self.timer = None
+        self.last_key = None
+        self.calls = 0
+        self.skips = 0
+
+    # Handler of the widgets, ej. widget.observe(debouncer.trigger, names='value').
+    def trigger(self, change=None):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.quiet, self.fire)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def fire(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if self.key is not None:
+            try:
+                key = self.key()
+            except Exception:
+                key = None  # The parameters can't be read, ej. a value being typed. The function shows the error.
+            if key is not None and key == self.last_key:
+                self.skips += 1
+                return
+        self.calls += 1
+        self.function()
+
+    # The function must remember the key of what it shows, so a call from other place (ej. a button) is considered.
+    def remember(self, key):
+        self.last_key = key
+
+    def forget(self):
+        self.last_key = None
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] Worker()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import S01_GUI02_A02_2_fileText as TxT
+
+    unit = 'kgf/cm**2'
+    model_args = ['Steel02', 1, '4200', '2100000', '0.01', '18', '0.925', '0.15', '0', '1', '0', '1', '0']
+    load_args = ['cyclic', 'combined', '0.000001', '-0.002', '0.002', '2', '-0.004', '0.004', '2', '-0.006', '0.006',
+                 '2', '0', '0', '0', '0', '0', '0']
+    messages, results = [], []
+
+    def request(name):
+        stream = TxT.data_plot_stream(unit, model_args, load_args, chunk_x = TxT.stream_chunk)
+        dictionary = TxT.run_stream(worker.cancellable(stream, f'{name}: {{}} strains'))
+        results.append((name, dictionary['Branches'].points))
+
+    # Three requests in a burst: the first two are cancelled, only the last one ends.
+    worker = Worker(report_x=messages.append, report_period=0)
+    t0 = time.perf_counter()
+    for name in ['request 1', 'request 2', 'request 3']:
+        worker.submit(request, name)
+        time.sleep(0.05)
+    worker.wait()
+    print(f"results: {results}, last message: {messages[-1]}, {time.perf_counter() - t0:.2f} s")
+
+# %%% [03-01] Debouncer()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    state = {'value': '-250'}
+    shown = []
+
+    def show():
+        shown.append(state['value'])
+        debouncer.remember(float(state['value']))
+
+    # Typing '-250.0' after '-250' is a burst of 6 changes: one call, and it's skipped because the value is the same.
+    debouncer = Debouncer(show, key_x=lambda: float(state['value']), quiet_x=0.05)
+    debouncer.trigger()
+    time.sleep(0.1)
+    for value in ['-', '-2', '-25', '-250', '-250.', '-250.0']:
+        state['value'] = value
+        debouncer.trigger()
+        time.sleep(0.01)
+    time.sleep(0.1)
+    print(f"shown: {shown}, calls = {debouncer.calls}, skips = {debouncer.skips}")
@@ -0,0 +1,917 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A20_ResponseStore.py
+COMENTARIOS:    Guarda las respuestas de los materiales en archivos binarios (.npz).
+"""
+
+# %% [00] INTRODUCTION
+# file_txt() guardaba la respuesta como texto JSON, con DataPlot escrito numero a
+# numero. Los archivos eran varias veces mas grandes que los datos y cada lectura
+# debia convertir el texto a float. Aqui los arreglos (DataPlot y cada cantidad de
+# DataState) se guardan en binario dentro de un contenedor .npz, y el resto del
+# diccionario (carga, material, codigo, unidad, modelo) como JSON en 'meta'.
+# Los archivos .txt existentes se siguen leyendo con read_response() de
+# S01_GUI02_A02_2_fileText.py.
+# Opcionalmente muchas respuestas se guardan en un solo archivo (.npa): cada
+# registro es el .npz de una respuesta con su clave (ej. 'monotonic/MatTag_1_...npz'),
+# los registros solo se agregan al final (un registro nuevo reemplaza al anterior
+# de la misma clave, un registro vacio lo elimina) y compact() reescribe el archivo
+# solo con los registros vigentes. Varios procesos pueden escribir en el mismo
+# archivo: cada escritura y compact() toman un bloqueo del sistema operativo sobre
+# '<archivo>.npa.lock'. Una respuesta dentro del archivo se nombra como
+# 'responses.npa/monotonic/MatTag_1_...npz', y las funciones de lectura y
+# escritura de este modulo la tratan igual que a un archivo .npz.
+# Los arreglos se guardan segun storage_policy: precision (float64 o float32),
+# columnas de deformacion como diferencias (delta) y compresion sin perdida por
+# bloques de filas, de modo que read_rows() lee solo los bloques pedidos. Los
+# archivos escritos sin estas opciones se siguen leyendo igual.
+# Las respuestas se guardan como ramas (S01_GUI02_A23_Branches.py): un arreglo por
+# cantidad con todas las ramas seguidas, sus offsets y sus nombres, sin el relleno
+# de NaN de DataPlot. Al leerlas, 'Branches' tiene los arreglos leidos (las ramas y
+# curvas son vistas de ellos), y DataPlot y DataState se crean solo si se usan.
+
+
+# %% [01] LIBRARIES
+import io
+import os
+import json
+import struct
+import zipfile
+import tempfile
+import threading
+import functools
+import contextlib
+import numpy as np
+import S01_GUI02_A23_Branches as Brn
+try:
+    import fcntl
+except ImportError:  # Windows, the archives are locked with msvcrt.
+    fcntl = None
+    import msvcrt
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] FORMAT
+# Extension of the responses, and of the responses written before as JSON text.
+response_extension = '.npz'
+legacy_extension = '.txt'
+response_extensions = (response_extension, legacy_extension)
+
+# Keys of the dictionary with arrays. The responses are stored as branches (S01_GUI02_A23_Branches.py): each quantity
+# as 'Branches.<name>' (ej. 'Branches.strain'), and the names and offsets of the branches as JSON in 'branches'. The
+# files written before have DataPlot and each quantity of DataState as 'DataState.<name>'.
+array_keys = ('DataPlot', 'DataState', 'Branches')
+
+# Extension of the archives with many responses, see Archive.
+archive_extension = '.npa'
+
+# Storage of the arrays of the new responses, see encode_array():
+#   precision: 'float64' or 'float32' (about 7 significant digits, the arrays are read as float64).
+#   delta: the strain columns of DataPlot (0, 2, ...) are saved as differences between rows, lossless.
+#   chunk_rows: rows of each block compressed (deflate, lossless), None doesn't compress. The bytes of a compressed
+#               block are grouped by their position in the values (byte shuffle), the similar bytes compress better.
+# {'precision': 'float64', 'delta': False, 'chunk_rows': None} is the format of the first .npz files.
+storage_policy = {'precision': 'float32', 'delta': True, 'chunk_rows': 16384}
+
+# Members of a .npz that aren't arrays of the response. The blocks of an array are saved as '<name>@<block>'.
+info_members = ('meta', 'encoding', 'branches')
+
+
+# %%% [02-01] WRITE / READ
+# Function to save the dictionary of a response (ej. file_txt()) in a .npz file, or in an archive (.npa/key).
+def write_response(url_x, dictionary_x, policy_x=None):
+    split = split_archive_path(url_x)
+    if split is not None:
+        open_archive(split[0]).append(split[1], dictionary_x, policy_x)
+        return url_x
+
+    # Write in a temporary file (unique for each writer) and rename it, so a reader never finds a partial file.
+    descriptor, url_tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(url_x) or '.')
+    with os.fdopen(descriptor, 'wb') as file:
+        save_response(file, dictionary_x, policy_x)
+    os.replace(url_tmp, url_x)
+    return url_x
+
+
+# Function to write the .npz of a response in an open file. policy_x changes some values of storage_policy.
+def save_response(file_x, dictionary_x, policy_x=None):
+    policy = {**storage_policy, **(policy_x or {})}
+    # The branches of the response, created from DataPlot if the dictionary doesn't have them.
+    layout = Brn.response_branches(dictionary_x)
+    start, stop = layout.offsets[0], layout.offsets[-1]
+    members = {'branches': np.array(json.dumps({'names': layout.names, 'continuous': layout.continuous,
+                                                'offsets': (layout.offsets - start).tolist()}))}
+    encodings = {}
+    for quantity, values in layout.quantities.items():
+        arrays, encoding = encode_array(f'Branches.{quantity}', values[start:stop], policy,
+                                        [0] if quantity == 'strain' else [])
+        members.update(arrays)
+        if encoding is not None:
+            encodings[f'Branches.{quantity}'] = encoding
+    if len(encodings) != 0:
+        members['encoding'] = np.array(json.dumps(encodings))
+    meta = {key: value for key, value in dictionary_x.items() if key not in array_keys}
+    save = np.savez if policy['chunk_rows'] is None else np.savez_compressed
+    save(file_x, meta=np.array(json.dumps(meta)), **members)
+
+
+# Function to open a response to read it: the path of a .npz, or the record of an archive (.npa/key) as a file.
+@contextlib.contextmanager
+def open_response(url_x):
+    split = split_archive_path(url_x)
+    if split is None:
+        yield url_x
+    else:
+        with open_archive(split[0]).open(split[1]) as file:
+            yield file
+
+
+# Function to read a response saved with write_response(), the same dictionary with numpy arrays.
+# With lazy_x the arrays are read the first time they are used (LazyResponse). convert_x is key -> function applied to
+# the values read, ej. response_schema from S01_GUI02_A02_2_fileText.py.
+def read_response(url_x, lazy_x=False, convert_x=None):
+    convert = convert_x or {}
+    if lazy_x:
+        names = array_names(url_x)
+        arrays = [key for key in array_keys if key in names or any(name.startswith(key + '.') for name in names)]
+        if 'Branches' in arrays:
+            arrays = ['Branches', 'DataPlot'] + (['DataState'] if len(state_quantities(names)) != 0 else [])
+
+        def load(key):
+            if key != 'Branches' and 'Branches' in arrays:
+                return convert_values({key: columns_of(response['Branches'], key)}, convert)[key]
+            return convert_values({key: read_array(url_x, key)}, convert)[key]
+        response = LazyResponse(convert_values(read_header(url_x), convert), arrays, load,
+                                lambda key: array_shape(url_x, key))
+        return response
+
+    with open_response(url_x) as source, np.load(source, allow_pickle=False) as file:
+        dictionary = json.loads(str(file['meta']))
+        encodings = read_encodings(file)
+        if 'branches' in file.files:
+            dictionary['Branches'] = load_branches(file, encodings)
+        else:
+            dictionary['DataPlot'] = load_member(file, encodings, 'DataPlot')
+            states = {name.split('.', 1)[1]: load_member(file, encodings, name) for name in member_names(file.files)
+                      if name.startswith('DataState.')}
+            if len(states) != 0:
+                dictionary['DataState'] = states
+    dictionary = convert_values(dictionary, convert)
+    if 'Branches' not in dictionary:
+        return dictionary
+    # DataPlot and DataState (previous layout, with padding) are created only if they are used.
+    if len(convert) == 0:
+        return columns_response(dictionary)
+    layout = dictionary['Branches']
+    arrays = ['DataPlot'] + (['DataState'] if len(state_quantities(layout.quantities)) != 0 else [])
+    return LazyResponse(dictionary, arrays, lambda key: convert_values({key: columns_of(layout, key)}, convert)[key])
+
+
+def convert_values(dictionary_x, convert_x):
+    for key, convert in convert_x.items():
+        if key in dictionary_x:
+            dictionary_x[key] = convert(dictionary_x[key])
+    return dictionary_x
+
+
+# %%%% [02-01-01] HEADER / ARRAYS
+# Function to read the branches (S01_GUI02_A23_Branches.py) of an open .npz (np.load).
+def load_branches(file_x, encodings_x):
+    info = json.loads(str(file_x['branches']))
+    quantities = {name.split('.', 1)[1]: load_member(file_x, encodings_x, name) for name in member_names(file_x.files)
+                  if name.startswith('Branches.')}
+    return Brn.Branches(quantities, info['offsets'], info['names'], info['continuous'])
+
+
+# Quantities of DataState from the names of the quantities (or of the members) of the branches.
+def state_quantities(names_x):
+    names = [name.split('.', 1)[1] if name.startswith('Branches.') else name for name in names_x]
+    return [name for name in names if name not in ('strain', 'stress')]
+
+
+# Function to get the previous layout of DataPlot or DataState from the branches (pairs of columns padded with NaN).
+def columns_of(layout_x, key_x):
+    if key_x == 'DataPlot':
+        return layout_x.to_columns()
+    return {name: layout_x.to_columns(name) for name in state_quantities(layout_x.quantities)}
+
+
+# Function to get a response with branches where DataPlot and DataState are created from the branches only if they are
+# used (LazyResponse). The loader is a partial and not a lambda, so the response can be pickled (ej. it's returned by
+# the processes of S01_GUI02_A09_Batch.py).
+def columns_response(dictionary_x):
+    layout = dictionary_x['Branches']
+    arrays = ['DataPlot'] + (['DataState'] if len(state_quantities(layout.quantities)) != 0 else [])
+    return LazyResponse({key: value for key, value in dictionary_x.items() if key not in ('DataPlot', 'DataState')},
+                        arrays, functools.partial(columns_of, layout))
+
+
+# Function to get the previous layout of a response (DataPlot and DataState as lists, without the branches), ej. to
+# write it as JSON in a .txt file.
+def columns_dictionary(dictionary_x):
+    layout = Brn.response_branches(dictionary_x)
+    dictionary = {key: value for key, value in dictionary_x.items() if key not in array_keys}
+    dictionary['DataPlot'] = layout.to_columns().tolist()
+    states = state_quantities(layout.quantities)
+    if len(states) != 0:
+        dictionary['DataState'] = {name: layout.to_columns(name).tolist() for name in states}
+    return dictionary
+
+
+# The members of a .npz are read one by one, the metadata is read without reading the arrays.
+def read_header(url_x):
+    with open_response(url_x) as source, np.load(source, allow_pickle=False) as file:
+        return json.loads(str(file['meta']))
+
+
+# Names of the arrays in the file (ej. 'DataPlot', 'DataState.tangent').
+def array_names(url_x):
+    with open_response(url_x) as source, zipfile.ZipFile(source) as members:
+        return member_names(name[:-len('.npy')] for name in members.namelist())
+
+
+# Function to read one of the array_keys. DataState is the dictionary with its quantities.
+def read_array(url_x, key_x):
+    with open_response(url_x) as source, np.load(source, allow_pickle=False) as file:
+        encodings = read_encodings(file)
+        if 'branches' in file.files and key_x in array_keys:
+            layout = load_branches(file, encodings)
+            return layout if key_x == 'Branches' else columns_of(layout, key_x)
+        if key_x == 'DataState':
+            return {name.split('.', 1)[1]: load_member(file, encodings, name) for name in member_names(file.files)
+                    if name.startswith('DataState.')}
+        return load_member(file, encodings, key_x)
+
+
+# Function to read the shape of an array (ej. 'DataPlot') from the header of its member, without reading the data.
+# The shape of 'Branches' is (points,), the one of DataPlot is read from the offsets of the branches.
+def array_shape(url_x, name_x):
+    with open_response(url_x) as source, np.load(source, allow_pickle=False) as file:
+        if 'branches' in file.files and name_x in ('Branches', 'DataPlot'):
+            info = json.loads(str(file['branches']))
+            offsets = info['offsets']
+            if name_x == 'Branches':
+                return (int(offsets[-1] - offsets[0]),)
+            # A continuous layout (the cycles of a cyclic load) is one curve, one pair of columns.
+            if info['continuous']:
+                lengths = [offsets[-1] - offsets[0]] if len(info['names']) != 0 else []
+            else:
+                lengths = np.diff(offsets)
+            return (int(max(lengths, default=0)), 2 * len(lengths))
+        encodings = read_encodings(file)
+        if name_x in encodings:
+            return tuple(encodings[name_x]['shape'])
+        with file.zip.open(name_x + '.npy') as member:
+            return read_npy_header(member)[0]
+
+
+# Function to read the header of a .npy (shape, fortran order, dtype), the file is left at the start of the data.
+def read_npy_header(file_x):
+    version = np.lib.format.read_magic(file_x)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(file_x)
+    return np.lib.format.read_array_header_2_0(file_x)
+
+
+# Function to read the rows start_x:stop_x of an array (ej. 'DataPlot', 'DataState.tangent'). With chunk_rows only the
+# blocks of those rows are decompressed, in a file not compressed only those rows are read.
+def read_rows(url_x, name_x, start_x, stop_x):
+    with open_response(url_x) as source, np.load(source, allow_pickle=False) as file:
+        encodings = read_encodings(file)
+        if name_x not in encodings:
+            return read_member_rows(file.zip, name_x, start_x, stop_x).astype(np.float64)
+        encoding = encodings[name_x]
+        rows = encoding['chunk_rows'] or max(encoding['shape'][0], 1)
+        start, stop = slice(start_x, stop_x).indices(encoding['shape'][0])[:2]
+        if stop <= start:
+            return np.empty((0,) + tuple(encoding['shape'][1:]))
+        blocks = []
+        for k in range(start // rows, (stop - 1) // rows + 1):
+            first, last = max(start - k * rows, 0), min(stop - k * rows, rows)
+            if encoding['delta'] or encoding['shuffle']:
+                # The differences restart in each block, a block is decoded whole.
+                blocks.append(decode_block(file[f'{name_x}@{k}'], encoding)[first:last])
+            else:
+                blocks.append(decode_block(read_member_rows(file.zip, f'{name_x}@{k}', first, last), encoding))
+        return np.concatenate(blocks)
+
+
+# Function to read the quantities of one branch (name or index), quantity -> array. Only its rows are read, see
+# read_rows(). quantities_x selects the quantities, ej. ['strain', 'stress'], None reads all of them.
+def read_branch(url_x, key_x, quantities_x=None):
+    with open_response(url_x) as source, np.load(source, allow_pickle=False) as file:
+        info = json.loads(str(file['branches']))
+        offsets = info['offsets']
+        names = quantities_x or [name for name in member_names(file.files) if name.startswith('Branches.')]
+    k = info['names'].index(key_x) if isinstance(key_x, str) else int(key_x)
+    names = [name if name.startswith('Branches.') else f'Branches.{name}' for name in names]
+    return {name.split('.', 1)[1]: read_rows(url_x, name, offsets[k], offsets[k + 1]) for name in names}
+
+
+# Function to read some rows of a .npy member (C order), only those bytes are read if the member isn't compressed.
+def read_member_rows(zip_x, member_x, start_x, stop_x):
+    with zip_x.open(member_x + '.npy') as file:
+        shape, fortran_order, dtype = read_npy_header(file)
+        start, stop = slice(start_x, stop_x).indices(shape[0])[:2]
+        stop = max(stop, start)
+        if fortran_order:
+            return np.lib.format.read_array(file)[start:stop]
+        row_bytes = dtype.itemsize * int(np.prod(shape[1:]))
+        file.seek(start * row_bytes, 1)
+        return np.frombuffer(file.read((stop - start) * row_bytes), dtype=dtype).reshape((stop - start,) + shape[1:])
+
+
+# %%%% [02-01-02] ENCODING
+# Unsigned integer of the same size of each precision: the differences are taken between the bits of the values, so
+# decoding gives exactly the same values (also NaN and inf).
+precision_bits = {'float64': np.uint64, 'float32': np.uint32}
+
+
+# Function to encode an array with the policy (see storage_policy).
+def encode_array(name_x, data_x, policy_x, delta_columns_x=()):
+    """
+    Parameters:
+    name_x (str): Name of the member, ej. 'DataPlot'.
+    data_x (array): Data of the array.
+    policy_x (dict): See storage_policy.
+    delta_columns_x (list): Columns saved as differences between rows (only with policy_x['delta']).
+
+    Returns:
+    tuple: (members, encoding). members is name -> array to save, encoding is saved in the member 'encoding' (None if
+           the array is saved as it is).
+    """
+    data = np.asarray(data_x, dtype=policy_x['precision'])
+    columns = list(delta_columns_x) if policy_x['delta'] and data.ndim in (1, 2) else []
+    if policy_x['precision'] == 'float64' and len(columns) == 0 and policy_x['chunk_rows'] is None:
+        return {name_x: data}, None
+    encoding = {'precision': policy_x['precision'], 'delta': columns, 'chunk_rows': policy_x['chunk_rows'],
+                'shuffle': policy_x['chunk_rows'] is not None, 'shape': list(data.shape)}
+    rows = policy_x['chunk_rows'] or max(len(data), 1)
+    row_bytes = data.itemsize * int(np.prod(data.shape[1:]))
+    members = {}
+    for k, start in enumerate(range(0, max(len(data), 1), rows)):
+        block = data[start:start + rows].copy()
+        if len(columns) != 0 and len(block) > 1:
+            bits = block.view(precision_bits[policy_x['precision']]).reshape(len(block), -1)
+            bits[1:, columns] = bits[1:, columns] - bits[:-1, columns]  # The unsigned integers wrap around, lossless.
+        if encoding['shuffle']:
+            block = np.ascontiguousarray(block.view(np.uint8).reshape(len(block), row_bytes).T)
+        members[f'{name_x}@{k}'] = block
+    return members, encoding
+
+
+# Function to decode a block saved by encode_array() (from its first row), as float64.
+def decode_block(block_x, encoding_x):
+    if encoding_x.get('shuffle', False):
+        block = np.ascontiguousarray(np.asarray(block_x).T).view(encoding_x['precision'])
+        block = block.reshape((len(block_x.T),) + tuple(encoding_x['shape'][1:]))
+    else:
+        block = np.array(block_x, dtype=encoding_x['precision'])
+    if len(encoding_x['delta']) != 0:
+        bits = block.view(precision_bits[encoding_x['precision']]).reshape(len(block), -1)
+        bits[:, encoding_x['delta']] = np.cumsum(bits[:, encoding_x['delta']], axis=0,
+                                                 dtype=precision_bits[encoding_x['precision']])
+    return block.astype(np.float64)
+
+
+def read_encodings(file_x):
+    return json.loads(str(file_x['encoding'])) if 'encoding' in file_x.files else {}
+
+
+# Function to read an array of an open .npz (np.load), decoding its blocks.
+def load_member(file_x, encodings_x, name_x):
+    if name_x not in encodings_x:
+        return file_x[name_x]
+    encoding = encodings_x[name_x]
+    blocks = [decode_block(file_x[name], encoding) for name in sorted(
+        (name for name in file_x.files if name.startswith(name_x + '@')), key=lambda name: int(name.split('@')[1]))]
+    return np.concatenate(blocks).reshape(encoding['shape'])
+
+
+# Names of the arrays from the names of the members (without the blocks '@k', 'meta' and 'encoding').
+def member_names(names_x):
+    names = []
+    for name in names_x:
+        name = name.split('@')[0]
+        if name not in info_members and name not in names:
+            names.append(name)
+    return names
+
+
+class LazyResponse(dict):
+    """
+    Dictionary of a response with the metadata. The arrays (DataPlot, DataState) are read from the file the first time
+    they are used, ej. the code of a response is shown without reading its arrays.
+
+    Parameters:
+    header_x (dict): Metadata of the response.
+    arrays_x (iterable): Keys of the arrays in the file.
+    load_x (callable): load_x(key) reads the array key.
+    shape_x (callable): shape_x(key) reads the shape of the array key without reading it. None reads the array.
+    """
+
+    def __init__(self, header_x, arrays_x, load_x, shape_x=None):
+        super().__init__(header_x)
+        self.arrays = set(arrays_x)  # Arrays not read yet
+        self.load = load_x
+        self.shape_of = shape_x
+
+    def __missing__(self, key):
+        if key not in self.arrays:
+            raise KeyError(key)
+        value = self.load(key)
+        self[key] = value
+        self.arrays.discard(key)
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self.arrays
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def shape(self, key):
+        if key in self.arrays and self.shape_of is not None:
+            return self.shape_of(key)
+        value = self[key]
+        return (value.points,) if isinstance(value, Brn.Branches) else np.shape(value)
+
+
+# %%%% [02-01-03] BENCHMARK
+# Function to compare storage policies with a response: size, write and read speed, and the largest difference of
+# DataPlot (relative to the range of each column, a plot of 1000 pixels shows differences above 1e-3).
+def storage_benchmark(dictionary_x, policies_x, repeat_x=5):
+    """
+    Parameters:
+    dictionary_x (dict): Response, ej. returned by file_txt() from S01_GUI02_A02_2_fileText.py.
+    policies_x (dict): name -> policy, see storage_policy.
+    repeat_x (int): Times each file is written and read.
+
+    Returns:
+    list: Dictionaries with name, size (bytes), write and read (MB/s of float64 data) and error of each policy.
+    """
+    import time
+    data_plot = np.asarray(dictionary_x['DataPlot'], dtype=np.float64)
+    data_bytes = data_plot.nbytes + sum(np.asarray(data, dtype=np.float64).nbytes for data in
+                                        dictionary_x.get('DataState', {}).values())
+    finite = np.where(np.isfinite(data_plot), data_plot, np.nan)
+    span = np.array([np.ptp(column[~np.isnan(column)]) if np.any(~np.isnan(column)) else 1.0 for column in finite.T])
+    span[span == 0] = 1
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, policy in policies_x.items():
+            url = os.path.join(directory, f'{name}{response_extension}')
+            t0 = time.perf_counter()
+            for _ in range(repeat_x):
+                write_response(url, dictionary_x, policy)
+            t1 = time.perf_counter()
+            for _ in range(repeat_x):
+                data = read_response(url)
+            t2 = time.perf_counter()
+            error = np.nanmax(np.abs(data['DataPlot'] - data_plot) / span) if data_plot.size != 0 else 0.0
+            results.append({'name': name, 'size': os.path.getsize(url), 'write': data_bytes * repeat_x / (t1 - t0) / 1e6,
+                            'read': data_bytes * repeat_x / (t2 - t1) / 1e6, 'error': float(error)})
+    return results
+
+
+# %%% [02-02] LIST
+# Function to list the responses of a directory (relative paths), binary and JSON text, and the responses of the
+# archives (ej. 'responses.npa/monotonic/MatTag_1_IdStrainLoad_Default.npz').
+def list_responses(directory_x):
+    responses = []
+    for root, dirs, files in os.walk(directory_x):
+        for file in files:
+            path = os.path.relpath(os.path.join(root, file), directory_x)
+            if file.endswith(response_extensions):
+                responses.append(path)
+            elif file.endswith(archive_extension):
+                responses += [f"{path}/{key}" for key in open_archive(os.path.join(root, file)).keys()]
+    return responses
+
+
+# Function to get (mtime, size) of a response, to know if it changed. In an archive it's (offset, size) of its record.
+def response_stat(url_x):
+    split = split_archive_path(url_x)
+    if split is None:
+        stat = os.stat(url_x)
+        return stat.st_mtime, stat.st_size
+    offset, length = open_archive(split[0]).record(split[1])
+    return float(offset), length
+
+
+# Function to read the bytes of a response (ej. for its hash).
+def read_bytes(url_x):
+    with open_response(url_x) as source:
+        if isinstance(source, str):
+            with open(source, 'rb') as file:
+                return file.read()
+        return source.read()
+
+
+# Function to delete a response, a file or a record of an archive.
+def delete_response(url_x):
+    split = split_archive_path(url_x)
+    if split is None:
+        os.remove(url_x)
+    else:
+        open_archive(split[0]).delete(split[1])
+
+
+# %%% [02-03] ARCHIVE
+# Header of the archive and of each record: (kind, length of the key, length of the .npz). The kind b'DEL ' deletes
+# the key, the records after a partial record (ej. the process stopped while writing) are ignored.
+archive_magic = b'NPA1'
+record_header = struct.Struct('<4sIQ')
+
+
+# Function to split the path of a response in an archive: 'dir/responses.npa/monotonic/MatTag_1.npz' ->
+# ('dir/responses.npa', 'monotonic/MatTag_1.npz'). None if the path isn't in an archive.
+def split_archive_path(url_x):
+    if not isinstance(url_x, str):
+        return None
+    url = url_x.replace('\\', '/')
+    index = url.find(archive_extension + '/')
+    if index == -1:
+        return None
+    return url[:index + len(archive_extension)], url[index + len(archive_extension) + 1:]
+
+
+# Function to lock a file between processes (the lock of a thread isn't seen by other processes). The lock is taken
+# on a separate file, compact() replaces the archive and a lock on it would be lost.
+@contextlib.contextmanager
+def file_lock(url_x):
+    with open(url_x, 'a+b') as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after 10 s, the other process is still writing.
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Function to identify the file of an archive, it changes when other process compacts it.
+def file_identity(url_x):
+    stat = os.stat(url_x)
+    return stat.st_dev, stat.st_ino, stat.st_size
+
+
+class Archive:
+    """
+    Many responses in one file, with an index in memory (key -> offset and size of the record).
+
+    The writes (append(), delete()) and compact() lock '<url_x>.lock', so several threads and processes can write the
+    same archive. Each write reads the records appended by the others before writing at the end.
+
+    Parameters:
+    url_x (str): File of the archive (.npa), it's created if it doesn't exist.
+    """
+
+    def __init__(self, url_x):
+        self.url = url_x
+        self.lock_url = url_x + '.lock'
+        self.lock = threading.Lock()
+        with file_lock(self.lock_url):
+            if not os.path.exists(url_x):
+                with open(url_x, 'wb') as file:
+                    file.write(archive_magic)
+        self.index, self.end, self.dead = {}, len(archive_magic), 0
+        self.scan()
+
+    def scan(self, start_x=None):
+        """
+        Read the headers of the records (the .npz are skipped) from start_x, or from the start of the file.
+        """
+        if start_x is None:
+            self.index, self.end, self.dead = {}, len(archive_magic), 0
+        with open(self.url, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            size, self.identity = stat.st_size, (stat.st_dev, stat.st_ino)
+            if file.read(len(archive_magic)) != archive_magic:
+                raise ValueError(f"'{self.url}' isn't an archive of responses.")
+            offset = self.end
+            while offset + record_header.size <= size:
+                file.seek(offset)
+                kind, key_length, length = record_header.unpack(file.read(record_header.size))
+                start = offset + record_header.size + key_length
+                if start + length > size:
+                    break
+                key = file.read(key_length).decode('utf-8')
+                if key in self.index:
+                    self.dead += record_header.size + key_length + self.index[key][1]
+                if kind == b'DEL ':
+                    self.index.pop(key, None)
+                    self.dead += start - offset
+                else:
+                    self.index[key] = (start, length)
+                offset = start + length
+        self.end = offset
+
+    def refresh(self):
+        # The archive changed in other process: appended (bigger) or compacted (other file, or smaller).
+        identity = file_identity(self.url)
+        if identity[:2] != self.identity or identity[2] < self.end:
+            self.scan()
+        elif identity[2] > self.end:
+            self.scan(self.end)
+
+    def _write(self, kind_x, key_x, payload_x):
+        key = key_x.encode('utf-8')
+        # With the lock no other process appends or compacts, so self.end is the end of the file after refresh().
+        with self.lock, file_lock(self.lock_url):
+            self.refresh()
+            with open(self.url, 'r+b') as file:
+                file.seek(self.end)
+                file.write(record_header.pack(kind_x, len(key), len(payload_x)) + key + payload_x)
+                file.truncate()
+            self.scan(self.end)
+
+    def append(self, key_x, dictionary_x, policy_x=None):
+        buffer = io.BytesIO()
+        save_response(buffer, dictionary_x, policy_x)
+        self._write(b'REC ', key_x, buffer.getvalue())
+
+    def delete(self, key_x):
+        if key_x in self.keys():
+            self._write(b'DEL ', key_x, b'')
+
+    def keys(self):
+        self.refresh()
+        return sorted(self.index)
+
+    def record(self, key_x):
+        self.refresh()
+        return self.index[key_x]
+
+    def open(self, key_x):
+        offset, length = self.record(key_x)
+        return RecordFile(self.url, offset, length)
+
+    def compact(self):
+        """
+        Rewrite the archive only with the records in use.
+
+        Returns:
+        int: Bytes released.
+        """
+        with self.lock, file_lock(self.lock_url):
+            self.refresh()
+            size = os.path.getsize(self.url)
+            descriptor, url_tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(self.url) or '.')
+            with open(self.url, 'rb') as source, os.fdopen(descriptor, 'wb') as file:
+                file.write(archive_magic)
+                for key in sorted(self.index):
+                    offset, length = self.index[key]
+                    source.seek(offset)
+                    encoded = key.encode('utf-8')
+                    file.write(record_header.pack(b'REC ', len(encoded), length) + encoded + source.read(length))
+            os.replace(url_tmp, self.url)
+            self.scan()
+            return size - os.path.getsize(self.url)
+
+
+class RecordFile(io.RawIOBase):
+    """
+    Record of an archive as a file (read only), so np.load() reads only the members needed.
+    """
+
+    def __init__(self, url_x, offset_x, length_x):
+        super().__init__()
+        self.file = open(url_x, 'rb')
+        self.offset, self.length, self.position = offset_x, length_x, 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, position, whence=0):
+        base = {0: 0, 1: self.position, 2: self.length}[whence]
+        self.position = min(max(base + position, 0), self.length)
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.length - self.position)
+        self.file.seek(self.offset + self.position)
+        data = self.file.read(size)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+# Archives opened, their index is kept in memory.
+archives = {}
+archives_lock = threading.Lock()
+
+
+def open_archive(url_x):
+    key = os.path.abspath(url_x)
+    with archives_lock:
+        if key not in archives:
+            archives[key] = Archive(url_x)
+        return archives[key]
+
+
+# Function to copy the responses of a directory (.npz and .txt) into an archive, with their relative paths as keys.
+def pack_directory(directory_x, url_x, read_x, remove_x=False):
+    """
+    Parameters:
+    read_x (callable): Function to read a response, ej. read_response() from S01_GUI02_A02_2_fileText.py.
+    remove_x (bool): Delete the files copied.
+    """
+    archive = open_archive(url_x)
+    for path in list_responses(directory_x):
+        url = os.path.join(directory_x, path)
+        if split_archive_path(url) is not None:
+            continue
+        key = path.replace('\\', '/')
+        if key.endswith(legacy_extension):
+            key = key[:-len(legacy_extension)] + response_extension
+        archive.append(key, read_x(url))
+        if remove_x:
+            os.remove(url)
+    return archive
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] write_response() / read_response()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import time
+    import S01_GUI02_A02_2_fileText as TxT
+
+    unit = 'kgf/cm**2'
+    model_args = ['ConcreteCM', 1, '-250.0', '-0.002', '238751.9633', '7', '1.05', '34.78', '0.0001', '7', '10000', '1']
+    load_args = ['cyclic', 'compression', '0.000002', '-0.001', '2', '-0.002', '2', '-0.003', '2', '-0.004', '2',
+                 '-0.005', '2']
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Same response in the previous format (.txt) and in the new one (.npz)
+        dictionary = TxT.file_txt(directory + '/', unit, model_args, load_args, 'Default', record_x = ('tangent',))
+        url_npz = os.path.join(directory, 'MatTag_1_IdStrainLoad_Default.npz')
+        url_txt = os.path.join(directory, 'MatTag_1_IdStrainLoad_Default.txt')
+        with open(url_txt, 'w') as file:
+            json.dump(columns_dictionary(dictionary), file)
+
+        for url in [url_txt, url_npz]:
+            t0 = time.perf_counter()
+            for _ in range(10):
+                data_dict = TxT.read_response(url)
+            seconds = (time.perf_counter() - t0) / 10
+            print(f"{os.path.basename(url)}: {os.path.getsize(url) / 1024:.0f} kB, read in {1000 * seconds:.1f} ms")
+
+        data_txt, data_npz = TxT.read_response(url_txt), TxT.read_response(url_npz)
+        # Same values with the precision of storage_policy
+        print("same DataPlot:", np.allclose(data_txt['DataPlot'], data_npz['DataPlot'], rtol=1e-6, equal_nan=True),
+              "same DataState:", np.allclose(np.array(data_txt['DataState']['tangent'], dtype=np.float64),
+                                             data_npz['DataState']['tangent'], rtol=1e-6, equal_nan=True),
+              "same code:", data_txt['code'] == data_npz['code'],
+              "listed:", sorted(list_responses(directory)))
+
+# %%% [03-01] read_response_header() / read_response(lazy_x=True)
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import shutil
+
+    # Show the code of 50 long cyclic responses: reading the whole files vs. only their metadata.
+    load_args = ['cyclic', 'compression', '0.0000005', '-0.001', '2', '-0.002', '2', '-0.003', '2', '-0.004', '2',
+                 '-0.005', '2']
+    with tempfile.TemporaryDirectory() as directory:
+        dictionary = TxT.file_txt(directory + '/', unit, model_args, load_args, 'Default', record_x = ('tangent',))
+        with open(os.path.join(directory, 'MatTag_1_IdStrainLoad_Default.txt'), 'w') as file:
+            json.dump(columns_dictionary(dictionary), file)
+        for extension in response_extensions:
+            urls = [os.path.join(directory, f'MatTag_{i}{extension}') for i in range(50)]
+            for url in urls:
+                shutil.copy(os.path.join(directory, f'MatTag_1_IdStrainLoad_Default{extension}'), url)
+            times = {}
+            for name, reader in [('whole', TxT.read_response), ('header', TxT.read_response_header)]:
+                t0 = time.perf_counter()
+                codes = [reader(url)['code'] for url in urls]
+                times[name] = time.perf_counter() - t0
+            data_dict = TxT.read_response(urls[0], lazy_x = True)
+            loaded = [key for key in array_keys if dict.__contains__(data_dict, key)]
+            shape = data_dict['DataPlot'].shape
+            print(f"50 x {extension} ({shape[0]} points): whole {times['whole']:.3f} s, header {times['header']:.3f} s, "
+                  f"lazy arrays loaded before use: {loaded}, after: "
+                  f"{[key for key in array_keys if dict.__contains__(data_dict, key)]}")
+
+# %%% [03-02] Archive()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import random
+
+    # 1000 short responses as files and in an archive: listing, random access, delete and compaction.
+    load_args = ['cyclic', 'compression', '0.0001', '-0.001', '2', '-0.002', '2', '-0.003', '2', '-0.004', '2',
+                 '-0.005', '2']
+    with tempfile.TemporaryDirectory() as directory:
+        os.mkdir(os.path.join(directory, 'cyclic_compression'))
+        dictionary = TxT.file_txt(directory + '/cyclic_compression/', unit, model_args, load_args, 'Default')
+        for i in range(1000):
+            write_response(os.path.join(directory, 'cyclic_compression', f'MatTag_{i}_IdStrainLoad_Default.npz'),
+                           dictionary)
+        t0 = time.perf_counter()
+        archive = pack_directory(directory, os.path.join(directory, 'responses.npa'), TxT.read_response,
+                                 remove_x = True)
+        print(f"pack 1000 files: {time.perf_counter() - t0:.2f} s, {os.path.getsize(archive.url) / 1024:.0f} kB, "
+              f"files left: {len(os.listdir(os.path.join(directory, 'cyclic_compression')))}")
+
+        t0 = time.perf_counter()
+        archives.clear()
+        paths = list_responses(directory)
+        print(f"list (index read from the headers): {len(paths)} responses in {1000 * (time.perf_counter() - t0):.1f} ms")
+
+        urls = [os.path.join(directory, path) for path in random.sample(paths, 100)]
+        t0 = time.perf_counter()
+        data = [TxT.read_response(url) for url in urls]
+        print(f"random access (read_response): {1000 * (time.perf_counter() - t0) / 100:.2f} ms per response, "
+              f"same DataPlot: {all(np.allclose(d['DataPlot'], dictionary['DataPlot'], rtol=1e-6, equal_nan=True) for d in data)}, "
+              f"header: {TxT.read_response_header(urls[0])['model']}, "
+              f"lazy points: {TxT.read_response(urls[0], lazy_x = True).shape('DataPlot')[0]}")
+
+        for url in urls:
+            delete_response(url)
+        write_response(os.path.join(directory, paths[0]), dictionary)  # Append again (replaces the record)
+        size = os.path.getsize(archive.url)
+        released = archive.compact()
+        print(f"delete 100 and rewrite 1: {len(list_responses(directory))} responses, compact {size / 1024:.0f} kB -> "
+              f"{os.path.getsize(archive.url) / 1024:.0f} kB ({released / 1024:.0f} kB released), "
+              f"still readable: {TxT.read_response_header(os.path.join(directory, paths[0]))['model']}")
+
+        # 8 processes append 200 responses to the same archive while it's compacted: no record is lost.
+        from concurrent.futures import ProcessPoolExecutor
+        shared = os.path.join(directory, 'shared.npa')
+        urls = [f"{shared}/cyclic_compression/MatTag_{i}_IdStrainLoad_Default.npz" for i in range(200)]
+        t0 = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(write_response, url, dictionary) for url in urls]
+            for _ in range(5):
+                time.sleep(0.05)
+                open_archive(shared).compact()
+            for future in futures:
+                future.result()
+        print(f"8 processes, 200 appends and 5 compactions: {time.perf_counter() - t0:.2f} s, "
+              f"{len(open_archive(shared).keys())} responses in the archive")
+
+# %%% [03-03] storage_policy / read_rows()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    # Cyclic response of 120000 points (two columns of strain and stress) and a monotonic one padded with NaN.
+    load_args = ['cyclic', 'compression', '0.0000005', '-0.001', '2', '-0.002', '2', '-0.003', '2', '-0.004', '2',
+                 '-0.005', '2']
+    monotonic_args = ['monotonic', '-', '0.000001', '-0.008', '0']
+    policies = {'float64': {'precision': 'float64', 'delta': False, 'chunk_rows': None},
+                'float32': {'precision': 'float32', 'delta': False, 'chunk_rows': None},
+                'float64+zip': {'precision': 'float64', 'delta': False, 'chunk_rows': 16384},
+                'float64+delta+zip': {'precision': 'float64', 'delta': True, 'chunk_rows': 16384},
+                'float32+zip': {'precision': 'float32', 'delta': False, 'chunk_rows': 16384},
+                'float32+delta+zip': {'precision': 'float32', 'delta': True, 'chunk_rows': 16384}}
+    with tempfile.TemporaryDirectory() as directory:
+        for args in [load_args, monotonic_args]:
+            dictionary = TxT.file_txt(directory + '/', unit, model_args, args, 'Default', record_x = ('tangent',))
+            with open(os.path.join(directory, 'response.txt'), 'w') as file:
+                json.dump(columns_dictionary(dictionary), file)
+            print(f"{args[0]} {np.shape(dictionary['DataPlot'])}, "
+                  f"JSON text {os.path.getsize(os.path.join(directory, 'response.txt')) / 1024:.0f} kB:")
+            for result in storage_benchmark(dictionary, policies):
+                print(f"    {result['name']:<18} {result['size'] / 1024:8.0f} kB, write {result['write']:6.0f} MB/s, "
+                      f"read {result['read']:6.0f} MB/s, largest difference {result['error']:.1e}")
+
+        # Partial read: 1000 rows of the middle of the stresses, only one block is decompressed. A cycle of the load.
+        url = os.path.join(directory, 'MatTag_1_IdStrainLoad_Default.npz')
+        write_response(url, TxT.file_txt(directory + '/', unit, model_args, load_args, 'Default'))
+        rows = read_response(url)['Branches'].points
+        t0 = time.perf_counter()
+        for _ in range(20):
+            whole = read_response(url)['Branches'].quantities['stress'][rows // 2:rows // 2 + 1000]
+        t1 = time.perf_counter()
+        for _ in range(20):
+            part = read_rows(url, 'Branches.stress', rows // 2, rows // 2 + 1000)
+        t2 = time.perf_counter()
+        cycle = read_branch(url, 'cycle 5', ['strain', 'stress'])
+        print(f"1000 rows: whole {1000 * (t1 - t0) / 20:.1f} ms, read_rows {1000 * (t2 - t1) / 20:.1f} ms, "
+              f"same: {np.array_equal(whole, part, equal_nan=True)}, cycle 5: {len(cycle['strain'])} points, "
+              f"same: {np.array_equal(cycle['stress'], read_response(url)['Branches'].branch('cycle 5')['stress'])}")
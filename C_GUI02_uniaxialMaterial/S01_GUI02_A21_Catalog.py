@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A21_Catalog.py
+COMENTARIOS:    Catalogo (SQLite) de los archivos de respuestas.
+"""
+
+# %% [00] INTRODUCTION
+# refresh_files() recorria las carpetas de respuestas con os.walk() cada vez, y el
+# modelo, la unidad o la carga de una respuesta solo se conocian abriendo el
+# archivo. El catalogo guarda una fila por respuesta (ruta, modelo, matTag, unidad,
+# tipo de carga, tipo ciclico, ID de la carga, numero de puntos y hash del
+# contenido) en una base de datos SQLite con indices, y se actualiza al escribir o
+# borrar un archivo desde la GUI. Los cambios hechos fuera de la GUI se recogen con
+# sync(), que solo abre los archivos nuevos o modificados. Las respuestas de un
+# archivo .npa (ver Archive en S01_GUI02_A20_ResponseStore.py) se catalogan igual,
+# con la posicion de su registro en vez de la fecha de modificacion.
+
+
+# %% [01] LIBRARIES
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import S01_GUI02_A02_2_fileText as TxT
+import S01_GUI02_A20_ResponseStore as Rst
+import S01_GUI02_A23_Branches as Brn
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] SCHEMA
+# Columns of the catalog. The path is relative to the directory of the responses, with '/' as separator.
+catalog_columns = ('path', 'model', 'mat_tag', 'unit', 'load_type', 'cyclic_type', 'load_id', 'points', 'hash',
+                   'mtime', 'size')
+
+# Columns that can be used to filter the responses, all of them with an index.
+filter_columns = ('model', 'mat_tag', 'unit', 'load_type', 'cyclic_type', 'load_id')
+
+catalog_schema = f"""
+CREATE TABLE IF NOT EXISTS responses (
+    path TEXT PRIMARY KEY, model TEXT, mat_tag INTEGER, unit TEXT, load_type TEXT, cyclic_type TEXT, load_id TEXT,
+    points INTEGER, hash TEXT, mtime REAL, size INTEGER
+);
+{''.join(f'CREATE INDEX IF NOT EXISTS responses_{column} ON responses ({column});' for column in filter_columns)}
+"""
+
+# ID of the strain load in the name of the files, see file_txt() from S01_GUI02_A02_2_fileText.py.
+load_id_pattern = re.compile(r'_IdStrainLoad_(.*)\.[^.]+$')
+
+
+# %%% [02-01] RECORDS
+# Function to create the record of a response file from its dictionary (ej. the one returned by file_txt()).
+def response_record(path_x, url_x, dictionary_x):
+    content_hash = hashlib.sha1(Rst.read_bytes(url_x)).hexdigest()
+    mtime, size = Rst.response_stat(url_x)
+    match = load_id_pattern.search(os.path.basename(url_x))
+    # The dictionary returned by file_txt() has the name of the model as it is written ("-ConcreteCM").
+    model = TxT.response_schema['model'](dictionary_x['model']) if 'model' in dictionary_x else None
+    # Points of all the branches of the response (S01_GUI02_A23_Branches.py). In a LazyResponse they are read from the
+    # offsets of the branches, without reading the arrays.
+    if isinstance(dictionary_x, Rst.LazyResponse):
+        points = dictionary_x.shape('Branches')[0]
+    else:
+        points = Brn.response_branches(dictionary_x).points
+    return (path_x, model, dictionary_x.get('material', {}).get('matTag'), dictionary_x.get('unit'),
+            dictionary_x.get('load_type'), dictionary_x.get('cyclic_type'), match.group(1) if match else None,
+            points, content_hash, mtime, size)
+
+
+# %%% [02-02] CATALOG
+class Catalog:
+    """
+    Index of the response files of a directory in an SQLite database.
+
+    Parameters:
+    directory_x (str): Directory with the responses (ej. 'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial').
+    url_x (str): File of the database. None uses 'catalog.sqlite' in directory_x.
+    """
+
+    def __init__(self, directory_x, url_x=None):
+        self.directory = directory_x
+        self.url = url_x if url_x is not None else os.path.join(directory_x, 'catalog.sqlite')
+        # The GUI writes from the worker thread, the connection is shared with a lock.
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.url, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.executescript(catalog_schema)
+
+    def path(self, url_x):
+        return os.path.relpath(url_x, self.directory).replace('\\', '/')
+
+    def add(self, url_x, dictionary_x=None):
+        """
+        Add (or update) the response file url_x. dictionary_x is its content, if it's known the file isn't read.
+        """
+        if dictionary_x is None:
+            dictionary_x = TxT.read_response(url_x, lazy_x=True)
+        self.write([response_record(self.path(url_x), url_x, dictionary_x)])
+
+    # Function to write the records in one transaction.
+    def write(self, records_x):
+        with self.lock, self.connection:
+            self.connection.executemany(f"INSERT OR REPLACE INTO responses VALUES "
+                                        f"({', '.join('?' * len(catalog_columns))})", records_x)
+
+    def remove(self, url_x):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM responses WHERE path = ?", (self.path(url_x),))
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+
+    def update(self, urls_x):
+        """
+        Update the records of the files urls_x: add the new or modified files (size or modification time) and remove
+        the files that don't exist.
+
+        Returns:
+        tuple: (number of files added or updated, number of files removed).
+        """
+        with self.lock:
+            known = {path: (mtime, size) for path, mtime, size in
+                     self.connection.execute("SELECT path, mtime, size FROM responses")}
+        records, removed = [], []
+        for url in urls_x:
+            path = self.path(url)
+            try:
+                stat = Rst.response_stat(url)
+            except (OSError, KeyError):
+                if path in known:
+                    removed.append((path,))
+                continue
+            if known.get(path) != stat:
+                try:
+                    records.append(response_record(path, url, TxT.read_response(url, lazy_x=True)))
+                except Exception:
+                    pass  # A file that can't be read isn't listed.
+        self.write(records)
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM responses WHERE path = ?", removed)
+        return len(records), len(removed)
+
+    def sync(self):
+        """
+        Update the catalog with all the files of the directory, see update().
+        """
+        urls = [os.path.join(self.directory, path) for path in Rst.list_responses(self.directory)]
+        found = set(self.path(url) for url in urls)
+        with self.lock:
+            deleted = [os.path.join(self.directory, path) for (path,) in
+                       self.connection.execute("SELECT path FROM responses") if path not in found]
+        return self.update(urls + deleted)
+
+    def select(self, columns_x=('path',), **filters):
+        """
+        Rows of the responses that satisfy the filters, ordered by path.
+
+        Parameters:
+        columns_x (tuple): Columns of the rows, see catalog_columns.
+        filters: column=value, or column=list of values. Only the columns of filter_columns.
+
+        Returns:
+        list: Tuples with the columns.
+        """
+        conditions, values = [], []
+        for column, value in filters.items():
+            if column not in filter_columns:
+                raise KeyError(f"'{column}' isn't a column of the catalog that can be filtered.")
+            value = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            conditions.append(f"{column} IN ({', '.join('?' * len(value))})")
+            values += value
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.lock:
+            return self.connection.execute(f"SELECT {', '.join(columns_x)} FROM responses{where} ORDER BY path",
+                                           values).fetchall()
+
+    def list(self, **filters):
+        """
+        Paths of the responses (relative to the directory) that satisfy the filters, see select().
+        """
+        return [row[0] for row in self.select(('path',), **filters)]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] Catalog()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import time
+    import tempfile
+    import numpy as np
+
+    models = ['Steel01', 'Steel02', 'ConcreteCM', 'Concrete01']
+    with tempfile.TemporaryDirectory() as directory:
+        # 10000 responses in the folders of the GUI
+        t0 = time.perf_counter()
+        folders = ['monotonic', 'cyclic_traction', 'cyclic_compression', 'cyclic_combined']
+        cyclic_types = ['-', 'traction', 'compression', 'combined']
+        for folder in folders:
+            os.mkdir(os.path.join(directory, folder))
+        for i in range(10000):
+            dictionary = {'load_type': 'monotonic' if i % 4 == 0 else 'cyclic', 'cyclic_type': cyclic_types[i % 4],
+                          'material': {'matTag': i}, 'DataPlot': np.zeros((10, 2)), 'unit': ['MPa', 'ksi'][i % 2],
+                          'model': models[i % 4], 'code': ''}
+            Rst.write_response(os.path.join(directory, folders[i % 4], f"MatTag_{i}_IdStrainLoad_{i % 7}.npz"), dictionary)
+        print(f"write 10000 files: {time.perf_counter() - t0:.2f} s")
+
+        catalog = Catalog(directory)
+        t0 = time.perf_counter()
+        added, removed = catalog.sync()
+        print(f"first sync: {added} added, {removed} removed, {time.perf_counter() - t0:.2f} s")
+
+        os.remove(os.path.join(directory, 'monotonic', 'MatTag_0_IdStrainLoad_0.npz'))
+        t0 = time.perf_counter()
+        added, removed = catalog.sync()
+        print(f"second sync: {added} added, {removed} removed, {time.perf_counter() - t0:.2f} s")
+
+        for filters in [{}, {'model': 'Steel02', 'unit': 'ksi'}, {'load_type': 'cyclic', 'load_id': ['1', '2']}]:
+            t0 = time.perf_counter()
+            paths = catalog.list(**filters)
+            print(f"list {filters}: {len(paths)} responses in {1000 * (time.perf_counter() - t0):.1f} ms")
+        catalog.close()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A22_Watcher.py
+COMENTARIOS:    Vigila las carpetas de la GUI y entrega solo los archivos que cambiaron.
+"""
+
+# %% [00] INTRODUCTION
+# refresh_files() reconstruia las tres listas de checkboxes en cada cambio. El
+# vigilante entrega solo la diferencia (archivos agregados, eliminados o
+# modificados; un renombre es un eliminado mas un agregado) de cada carpeta, y la
+# GUI actualiza las listas con esa diferencia, conservando los checkboxes que no
+# cambiaron (y su seleccion). Si watchdog esta instalado (inotify en Linux,
+# ReadDirectoryChangesW en Windows) solo se revisan los archivos de los eventos;
+# si no, las carpetas se recorren cada period_x segundos. En ambos casos los
+# cambios se juntan durante period_x segundos y se entregan en un solo llamado.
+
+
+# %% [01] LIBRARIES
+import os
+import threading
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # Optional dependency, without it the directories are polled.
+    Observer, FileSystemEventHandler = None, object
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] SNAPSHOT
+# Function to get the files of a directory with the extensions_x: relative path ('/' as separator) -> (mtime, size).
+def snapshot(directory_x, extensions_x):
+    files = {}
+    for root, dirs, names in os.walk(directory_x):
+        for name in names:
+            if name.endswith(extensions_x):
+                url = os.path.join(root, name)
+                try:
+                    stat = os.stat(url)
+                except OSError:
+                    continue  # Deleted while the directory is walked.
+                files[os.path.relpath(url, directory_x).replace('\\', '/')] = (stat.st_mtime, stat.st_size)
+    return files
+
+
+# Function to compare two snapshots. Returns (added, removed, modified), sorted lists of relative paths.
+def snapshot_diff(old_x, new_x):
+    added = sorted(path for path in new_x if path not in old_x)
+    removed = sorted(path for path in old_x if path not in new_x)
+    modified = sorted(path for path in new_x if path in old_x and new_x[path] != old_x[path])
+    return added, removed, modified
+
+
+# %%% [02-01] EVENTS (WATCHDOG)
+class _EventHandler(FileSystemEventHandler):
+    """
+    Sends the paths of the events of one directory to the watcher.
+    """
+
+    def __init__(self, watcher_x, name_x):
+        super().__init__()
+        self.watcher = watcher_x
+        self.name = name_x
+
+    def on_any_event(self, event):
+        if event.event_type in ('opened', 'closed', 'closed_no_write'):
+            return
+        if event.is_directory:
+            self.watcher.touch(self.name, None)  # A folder moved or deleted, the whole directory is compared.
+            return
+        self.watcher.touch(self.name, event.src_path)
+        if getattr(event, 'dest_path', ''):
+            self.watcher.touch(self.name, event.dest_path)
+
+
+# %%% [02-02] WATCHER
+class Watcher:
+    """
+    Watches the files of some directories and reports the changes.
+
+    Parameters:
+    directories_x (dict): name -> (directory, extensions), ej. {'responses': (directory, ('.npz', '.txt'))}.
+    on_change_x (callable): Called as on_change_x(name, added, removed, modified) with the relative paths, from the
+                            thread of the watcher.
+    period_x (float): Time to gather the changes (and period of the polling), in seconds.
+    polling_x (bool): True polls the directories. None polls only if watchdog isn't installed.
+    """
+
+    def __init__(self, directories_x, on_change_x, period_x=0.5, polling_x=None):
+        self.directories = directories_x
+        self.on_change = on_change_x
+        self.period = period_x
+        self.polling = Observer is None if polling_x is None else polling_x
+        self.lock = threading.Lock()
+        self.snapshots = {name: snapshot(directory, extensions) for name, (directory, extensions) in
+                          directories_x.items()}
+        self.pending = {name: set() for name in directories_x}  # Paths of the events, None compares all the files
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.observer = None
+
+    def start(self):
+        if not self.polling:
+            self.observer = Observer()
+            for name, (directory, extensions) in self.directories.items():
+                self.observer.schedule(_EventHandler(self, name), directory, recursive=True)
+            self.observer.start()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _loop(self):
+        while not self.stop_event.wait(self.period):
+            try:
+                self.poll()
+            except Exception:
+                pass  # The watcher never stops, ej. a directory deleted and created again by delete_all().
+
+    def touch(self, name_x, url_x):
+        with self.lock:
+            self.pending[name_x].add(url_x)
+
+    def poll(self):
+        """
+        Compare the files with the last snapshot (all of them if polling, only the ones of the events otherwise) and
+        report the changes.
+
+        Returns:
+        list: (name, added, removed, modified) of each directory with changes.
+        """
+        changes = []
+        for name, (directory, extensions) in self.directories.items():
+            with self.lock:
+                pending, self.pending[name] = self.pending[name], set()
+            old = self.snapshots[name]
+            if self.polling or None in pending:
+                new = snapshot(directory, extensions)
+            elif len(pending) != 0:
+                new = dict(old)
+                for url in pending:
+                    path = os.path.relpath(url, directory).replace('\\', '/')
+                    if not path.endswith(extensions) or path.startswith('../'):
+                        continue
+                    try:
+                        stat = os.stat(url)
+                        new[path] = (stat.st_mtime, stat.st_size)
+                    except OSError:
+                        new.pop(path, None)
+            else:
+                continue
+            self.snapshots[name] = new
+            added, removed, modified = snapshot_diff(old, new)
+            if added or removed or modified:
+                changes.append((name, added, removed, modified))
+                self.on_change(name, added, removed, modified)
+        return changes
+
+
+# %%% [02-03] UPDATE OF A LIST
+# Function to get the new list of items after the changes, keeping the items of the paths that didn't change.
+def apply_diff(items_x, paths_x, create_x, path_x=lambda item: item):
+    """
+    Parameters:
+    items_x (list): Current items, ej. checkboxes.
+    paths_x (list): Paths that the list must have, in order.
+    create_x (callable): Function to create the item of a new path.
+    path_x (callable): Function to get the path of an item, ej. lambda checkbox: checkbox.description.
+
+    Returns:
+    list: Items of paths_x, the same objects of items_x for the paths already listed.
+    """
+    current = {path_x(item): item for item in items_x}
+    return [current[path] if path in current else create_x(path) for path in paths_x]
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] Watcher()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    import time
+    import tempfile
+
+    for polling in [True, False] if Observer is not None else [True]:
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, 'monotonic'))
+            for i in range(3000):
+                open(os.path.join(directory, 'monotonic', f'MatTag_{i}.npz'), 'w').close()
+            changes = []
+            watcher = Watcher({'responses': (directory, ('.npz', '.txt'))},
+                              lambda *change: changes.append(change), period_x=0.2, polling_x=polling).start()
+
+            # Add, rename and delete, a selected item keeps its object.
+            items = [{'description': path, 'value': False} for path in sorted(watcher.snapshots['responses'])]
+            items[1]['value'] = True
+            open(os.path.join(directory, 'monotonic', 'MatTag_new.npz'), 'w').close()
+            os.rename(os.path.join(directory, 'monotonic', 'MatTag_0.npz'),
+                      os.path.join(directory, 'monotonic', 'MatTag_0_renamed.npz'))
+            os.remove(os.path.join(directory, 'monotonic', 'MatTag_2.npz'))
+            time.sleep(0.6)
+            watcher.stop()
+
+            for name, added, removed, modified in changes:
+                paths = sorted(set(item['description'] for item in items) - set(removed) | set(added))
+                items_new = apply_diff(items, paths, lambda path: {'description': path, 'value': False},
+                                       lambda item: item['description'])
+                print(f"{'polling' if polling else 'watchdog'}: added {added}, removed {removed}, "
+                      f"{len(items)} -> {len(items_new)} items, selected: {[i['description'] for i in items_new if i['value']]}")
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+ACTUALIZACION:  2026-10-18
+AUTOR:          Marcelo Ortiz Á.
+SCRIPT:         S01_GUI02_A23_Branches.py
+COMENTARIOS:    Respuesta de un material como ramas de largo variable (sin relleno de NaN).
+"""
+
+# %% [00] INTRODUCTION
+# DataPlot junta las ramas de la carga (compresion y traccion en una carga
+# monotonica) como pares de columnas, rellenando la rama mas corta con NaN, y las
+# graficas recorren los pares por indice (2*i, 2*i + 1). Aqui cada cantidad
+# (strain, stress y las cantidades de DataState, ej. tangent) es un solo arreglo
+# con todas las ramas seguidas, y offsets indica donde empieza cada rama. Las ramas
+# tienen nombre: 'compression' y 'tension' en una carga monotonica, y 'cycle k' en
+# una carga ciclica (cada ciclo empieza en deformacion 0). Una rama, un rango de
+# filas o una curva de la grafica son vistas (slices) de esos arreglos, sin copiar.
+# DataPlot y DataState se obtienen con to_columns() para el codigo que aun usa
+# columnas.
+
+
+# %% [01] LIBRARIES
+import numpy as np
+
+
+# %% [02] FUNCTIONS
+
+# %%% [02-00] BRANCHES
+class Branches:
+    """
+    Ragged layout of a response: a buffer per quantity with all the branches, and the offsets of the branches.
+
+    Parameters:
+    quantities_x (dict): quantity -> 1D array with all the branches, 'strain' and 'stress' at least.
+    offsets_x (array): Start of each branch and end of the last one (length = branches + 1).
+    names_x (list): Name of each branch, ej. ['compression', 'tension'] or ['cycle 1', 'cycle 2', ...].
+    continuous_x (bool): The branches are consecutive parts of one load path (the cycles of a cyclic load), they are
+                         plotted as one curve.
+    """
+
+    def __init__(self, quantities_x, offsets_x, names_x, continuous_x=False):
+        self.quantities = {name: np.asarray(values) for name, values in quantities_x.items()}
+        self.offsets = np.asarray(offsets_x, dtype=np.int64)
+        self.names = list(names_x)
+        self.continuous = bool(continuous_x)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __eq__(self, other):
+        if not isinstance(other, Branches):
+            return NotImplemented
+        return (self.names == other.names and self.continuous == other.continuous and
+                np.array_equal(self.offsets, other.offsets) and self.quantities.keys() == other.quantities.keys() and
+                all(np.array_equal(values, other.quantities[name], equal_nan=True)
+                    for name, values in self.quantities.items()))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Branches({self.names}, {self.points} points, quantities {list(self.quantities)})"
+
+    @property
+    def points(self):
+        return int(self.offsets[-1] - self.offsets[0]) if len(self.offsets) != 0 else 0
+
+    def index(self, key_x):
+        return self.names.index(key_x) if isinstance(key_x, str) else int(key_x)
+
+    def branch(self, key_x):
+        """
+        Quantities of a branch (name or index), quantity -> view of the buffer.
+        """
+        k = self.index(key_x)
+        start, stop = self.offsets[k], self.offsets[k + 1]
+        return {name: values[start:stop] for name, values in self.quantities.items()}
+
+    def curves(self, quantity_x='stress'):
+        """
+        Curves of the graphic (strain vs quantity_x), views of the buffers.
+
+        Returns:
+        list: (name, strains, values) of each branch. The branches of a continuous layout are one curve.
+        """
+        if len(self.names) == 0:
+            return []
+        strains, values = self.quantities['strain'], self.quantities[quantity_x]
+        if self.continuous:
+            start, stop = self.offsets[0], self.offsets[-1]
+            return [(self.names[0], strains[start:stop], values[start:stop])]
+        return [(name, strains[start:stop], values[start:stop]) for name, start, stop in
+                zip(self.names, self.offsets[:-1], self.offsets[1:])]
+
+    def rows(self, start_x, stop_x):
+        """
+        Layout of the rows start_x:stop_x of the buffers (views), ej. a part of a cyclic load for a frame of the video.
+        The branches outside the rows are dropped.
+        """
+        start, stop = slice(start_x, stop_x).indices(self.points)[:2]
+        start, stop = start + self.offsets[0], max(stop, start) + self.offsets[0]
+        offsets = np.clip(self.offsets, start, stop)
+        keep = [k for k in range(len(self.names)) if offsets[k + 1] > offsets[k]]
+        if len(keep) == 0:
+            return Branches(self.quantities, [start, start], [], self.continuous)
+        return Branches(self.quantities, offsets[keep[0]:keep[-1] + 2], self.names[keep[0]:keep[-1] + 1],
+                        self.continuous)
+
+    def scaled(self, quantity_x, factor_x):
+        """
+        Same layout with quantity_x multiplied by factor_x (ej. conversion of unit). The other buffers are shared, with
+        factor_x = 1 nothing is copied.
+        """
+        if factor_x == 1:
+            return self
+        quantities = dict(self.quantities)
+        quantities[quantity_x] = self.quantities[quantity_x] * factor_x
+        return Branches(quantities, self.offsets, self.names, self.continuous)
+
+    def to_columns(self, quantity_x='stress'):
+        """
+        Previous layout (DataPlot): a pair of columns (strain, quantity_x) for each curve, the short ones padded with NaN.
+        """
+        curves = self.curves(quantity_x)
+        data = np.full((max((len(strains) for name, strains, values in curves), default=0), 2 * len(curves)), np.nan)
+        for k, (name, strains, values) in enumerate(curves):
+            data[:len(strains), 2 * k] = strains
+            data[:len(values), 2 * k + 1] = values
+        return data
+
+
+# %%% [02-01] CREATE
+# Function to create the layout from the branches, each one is (name, {quantity: values}).
+def from_branches(branches_x, continuous_x=False):
+    names = [name for name, quantities in branches_x]
+    lengths = [len(quantities['strain']) for name, quantities in branches_x]
+    offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+    quantity_names = []
+    for name, quantities in branches_x:
+        quantity_names += [quantity for quantity in quantities if quantity not in quantity_names]
+    buffers = {}
+    for quantity in quantity_names:
+        buffers[quantity] = np.full(offsets[-1], np.nan)
+        for (name, quantities), start, stop in zip(branches_x, offsets[:-1], offsets[1:]):
+            if quantity in quantities:
+                values = np.asarray(quantities[quantity], dtype=np.float64)
+                buffers[quantity][start:start + len(values)] = values[:stop - start]
+    return Branches(buffers, offsets, names, continuous_x)
+
+
+# Function to get the offsets of the cycles of a strain load: each cycle starts where the strain is 0.
+def cycle_offsets(strains_x):
+    strains = np.asarray(strains_x)
+    starts = np.flatnonzero(strains == 0.0)
+    starts = starts[starts < len(strains) - 1]  # A 0 at the end closes the last cycle.
+    if len(starts) == 0 or starts[0] != 0:
+        starts = np.concatenate(([0], starts))
+    return np.append(starts, len(strains)).astype(np.int64)
+
+
+# Function to create the layout of a cyclic load, the branches are its cycles. quantities_x is quantity -> values.
+def from_cycles(quantities_x):
+    strains = np.asarray(quantities_x['strain'], dtype=np.float64)
+    offsets = cycle_offsets(strains) if len(strains) != 0 else np.array([0, 0])
+    quantities = {name: np.asarray(values, dtype=np.float64) for name, values in quantities_x.items()}
+    return Branches(quantities, offsets, [f'cycle {k + 1}' for k in range(len(offsets) - 1)], continuous_x=True)
+
+
+# Function to create the layout from the previous one (DataPlot and DataState of a response). The NaN of the padding at
+# the end of each pair of columns are dropped. In a cyclic load (one pair of columns) the buffers are views of data_x.
+def from_columns(data_x, states_x=None, load_type_x='monotonic'):
+    data = np.asarray(data_x, dtype=np.float64).reshape(len(data_x), -1)
+    states = {name: np.asarray(values, dtype=np.float64) for name, values in (states_x or {}).items()}
+    pairs = data.shape[1] // 2
+    if load_type_x == 'cyclic' and pairs == 1:
+        quantities = {'strain': data[:, 0], 'stress': data[:, 1]}
+        quantities.update({name: values[:, 1] for name, values in states.items()})
+        return from_cycles(quantities)
+    names = ['compression', 'tension'] if load_type_x == 'monotonic' and pairs == 2 else \
+        [f'branch {k + 1}' for k in range(pairs)]
+    branches = []
+    for k in range(pairs):
+        filled = np.flatnonzero(~np.isnan(data[:, 2 * k]))
+        length = filled[-1] + 1 if len(filled) != 0 else 0
+        quantities = {'strain': data[:length, 2 * k], 'stress': data[:length, 2 * k + 1]}
+        quantities.update({name: values[:length, 2 * k + 1] for name, values in states.items()})
+        branches.append((names[k], quantities))
+    return from_branches(branches)
+
+
+# Function to get the layout of a response dictionary: 'Branches', or created from 'DataPlot' (previous responses).
+def response_branches(dictionary_x):
+    if 'Branches' in dictionary_x:
+        return dictionary_x['Branches']
+    return from_columns(dictionary_x['DataPlot'], dictionary_x.get('DataState'), dictionary_x.get('load_type'))
+
+
+# %% [03] TEST FUNCTIONS
+
+# %%% [03-00] from_branches() / from_cycles()
+# Run only if it is the main file.
+if __name__ == '__main__':
+    # Monotonic load: compression longer than tension
+    compression = {'strain': np.linspace(0, -0.004, 4000), 'stress': np.linspace(0, -250, 4000)}
+    tension = {'strain': np.linspace(0, 0.0002, 200), 'stress': np.linspace(0, 20, 200)}
+    layout = from_branches([('compression', compression), ('tension', tension)])
+    columns = layout.to_columns()
+    print(layout, "| DataPlot:", columns.shape, f"{columns.nbytes / 1024:.0f} kB with NaN,",
+          f"{sum(values.nbytes for values in layout.quantities.values()) / 1024:.0f} kB ragged")
+    print("tension is a view:", np.shares_memory(layout.branch('tension')['stress'], layout.quantities['stress']),
+          "| back from DataPlot:", [len(branch) for branch in [from_columns(columns).branch(k)['strain']
+                                                               for k in range(2)]])
+
+    # Cyclic load: 3 cycles of 0 -> peak -> 0
+    strains = np.concatenate([np.linspace(0, -0.001 * k, 50).tolist() + np.linspace(-0.001 * k, 0, 50)[1:-1].tolist()
+                              for k in (1, 2, 3)] + [[0.0]])
+    layout = from_cycles({'strain': strains, 'stress': 2e5 * strains})
+    part = layout.rows(120, 250)
+    print(layout, "| offsets:", layout.offsets.tolist(), "| curves:", len(layout.curves()),
+          "| rows 120:250:", part.names, part.offsets.tolist(),
+          "view:", np.shares_memory(part.curves()[0][1], strains))
@@ -17,6 +17,8 @@ from ipywidgets import HBox, VBox, Dropdown, IntText, Textarea, Output, Text
 from IPython.display import display, Image, Video
 import os
 import shutil
+import time
+import threading
 import numpy as np
 import urllib.parse
 from typing import Optional
@@ -29,6 +31,14 @@ import S01_GUI02_A02_2_fileText as TxT
 import S01_GUI02_A03_Graphic as Grf
 import S01_GUI02_A07_UserDefFunIndications as Ind
 import S01_GUI02_A08_Video as Vid
+import S01_GUI02_A14_Cache as Cch
+import S01_GUI02_A15_MultiMaterial as Mul
+import S01_GUI02_A16_AdaptiveStrain as Adp
+import S01_GUI02_A19_Worker as Wrk
+import S01_GUI02_A20_ResponseStore as Rst
+import S01_GUI02_A21_Catalog as Cat
+import S01_GUI02_A22_Watcher as Wch
+import S01_GUI02_A23_Branches as Brn
 
 
 # %% [02] INITIALIZATION
@@ -102,6 +112,7 @@ def create_directory(path):
 directories = ['C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial',
                'C_GUI02_uniaxialMaterial/C_GUI02_StrainLoad',
                'C_GUI02_uniaxialMaterial/C_GUI02_MaterialModel',
+               'C_GUI02_uniaxialMaterial/C_GUI02_Cache',
                'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/monotonic',
                'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/cyclic_traction',
                'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/cyclic_compression',
@@ -113,6 +124,16 @@ for dir_i in directories:
     create_directory(dir_i)
 
 
+# The slow callbacks (show_material_model, add_response, show_cyclic_video) run in a worker thread, a new request
+# cancels the previous one (S01_GUI02_A19_Worker.py). The progress and the errors are shown in graph_output.
+# The output 'out' is updated through out.outputs, 'with out:' doesn't capture the display of other thread.
+def report_progress(message):
+    graph_output.value = message
+
+
+worker = Wrk.Worker(report_x=report_progress)
+
+
 # %% [03] FUNCTIONS
 #
 # %%% [03-00] UPDATE DROPDOWNS
@@ -389,24 +410,61 @@ def update_defo_widgets(change=None):
 
 
 # %%% [03-02] SELECT FILES (CHECKBOX)
-# Function to list .txt files in a directory and create checkboxes
-def list_files_with_checkboxes(directory_x: str) -> list:
+# Function to create a checkbox for each file (relative path)
+def checkboxes_of_files(files_x: list) -> list:
+    return [widgets.Checkbox(value=False, description=file, disabled=False,
+                             layout=widgets.Layout(width='387px', margin='0 0 0 -86px')) for file in files_x]
+
+
+# Function to list the files of a directory (.txt, or extensions_x), relative paths with '/' as separator
+def list_files(directory_x: str, extensions_x: tuple = ('.txt',)) -> list:
     try:
-        file_checkboxes = []
-        for root, dirs, files in os.walk(directory_x):
-            for file in files:
-                if file.endswith('.txt'):
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, directory_x)
-                    checkbox = widgets.Checkbox(value=False, description=relative_path, disabled=False,
-                                                layout=widgets.Layout(width='387px', margin='0 0 0 -86px'))
-                    file_checkboxes.append(checkbox)
-        return file_checkboxes
+        return sorted(Wch.snapshot(directory_x, extensions_x))
     except Exception as e:
         code_params_output.value = "\nError: Check files in directory."
         return []
 
 
+# Function to list the files of a directory (.txt, or extensions_x) and create checkboxes
+def list_files_with_checkboxes(directory_x: str, extensions_x: tuple = ('.txt',)) -> list:
+    return checkboxes_of_files(list_files(directory_x, extensions_x))
+
+
+# Function to update the checkboxes of a box with the files_x (relative paths). The checkboxes of the files already
+# listed are kept, with their selection. See apply_diff() from S01_GUI02_A22_Watcher.py.
+def update_checkboxes(box_x, files_x: list) -> list:
+    box_x.children = Wch.apply_diff(list(box_x.children), files_x, lambda file: checkboxes_of_files([file])[0],
+                                    lambda checkbox: checkbox.description)
+    return list(box_x.children)
+
+
+# Function to read the filter of the responses, ej. 'model=Steel02|Steel01, unit=ksi' -> {'model': ['Steel02',
+# 'Steel01'], 'unit': ['ksi']}. The columns are the filter_columns of S01_GUI02_A21_Catalog.py.
+def response_filters() -> dict:
+    filters = {}
+    for condition in responses_filter_input.value.split(','):
+        if condition.strip() == '':
+            continue
+        column, values = [text.strip() for text in condition.split('=', 1)]
+        values = [value.strip() for value in values.split('|')]
+        filters[column] = [int(value) for value in values] if column == 'mat_tag' else values
+    return filters
+
+
+# Function to list the responses of the catalog that satisfy the filter
+def list_responses() -> list:
+    try:
+        return catalog.list(**response_filters())
+    except Exception as e:
+        code_params_output.value = f"\nError: Check the filter of the responses ({e})."
+        return []
+
+
+# Function to list the responses of the catalog that satisfy the filter and create checkboxes
+def list_responses_with_checkboxes() -> list:
+    return checkboxes_of_files(list_responses())
+
+
 # %%% [03-03] ACTIONS WITH FILES (CHECKBOX)
 # Function to display selected file. Function to try checkbox.
 def display_selected_files(files):
@@ -502,25 +560,33 @@ def create_responses_file(selected_file_in_strain_dropdown, aux_checkbox = True)
         min_max_args[2] = int(min_max_args[2])
         
         # Create file
-        TxT.file_txt(url_args, unit, model_args, load_args, ID_cyclic_strain, min_max_args_x = min_max_args)
+        MatInfo = TxT.file_txt(url_args, unit, model_args, load_args, ID_cyclic_strain, min_max_args_x = min_max_args,
+                               record_x = graphic_value_dropdown.options[1:], engine_x = engine_dropdown.value,
+                               steps_x = steps_dropdown.value)
         
     else:
         model_args = model_arg()        
+        min_max_args = []
         # Create file
-        TxT.file_txt(url_args, unit, model_args, load_args, ID_cyclic_strain)
+        MatInfo = TxT.file_txt(url_args, unit, model_args, load_args, ID_cyclic_strain,
+                               record_x = graphic_value_dropdown.options[1:], engine_x = engine_dropdown.value,
+                               steps_x = steps_dropdown.value)
     
-    # Refresh Checkbox
-    refresh_files()
+    # Add the file to the catalog and refresh Checkbox
+    url_file = url_args + TxT.response_file_name(model_args, ID_cyclic_strain, min_max_args)
+    catalog.add(url_file, MatInfo)
+    refresh_files(sync_x=False)
     
     # Message
-    mat_tag = model_args[1]
-    url_doc = f"MatTag_{mat_tag}_IdStrainLoad_{ID_cyclic_strain}.txt"
-    url_file = url_args + url_doc
     code_params_output.value = f"File '{url_file}' has been created successfully."
 
 
 # Function to add a responses file
 def add_response(change=None):
+    worker.submit(run_add_response, change)
+
+
+def run_add_response(change=None):
     global files_checkboxes_2, files_checkboxes_3, selected_strain_dropdown
     
     # Obtain the selected value of the strain loading dropdown
@@ -548,7 +614,8 @@ def add_response(change=None):
         # Create file with the material model and the result of test it
         create_responses_file(selected_file_in_strain_dropdown)
 
-    show_material_model()
+    # It's already in the worker. The graphic has the same resolution as the file.
+    run_show_material_model(full=True)
 
 
 # %%%% [03-04-02] SHOW_GRAPHIC
@@ -626,6 +693,10 @@ def delete_and_create_directory_for_video(path):
         
 # Function to graphic stress-strain curve of selected files
 def show_cyclic_video(change=None):
+    worker.submit(run_show_cyclic_video, change)
+
+
+def run_show_cyclic_video(change=None):
     global files_checkboxes, directory
     global all_buttons_and_widgets_list, buttons_initial_state
     
@@ -633,8 +704,7 @@ def show_cyclic_video(change=None):
     delete_and_create_directory_for_video('C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/Fotogramas_Video')
     
     graph_output.value = ""
-    with out:
-        out.clear_output()
+    out.outputs = ()
     
     # Disable the buttons while the video is making
     for widget in all_buttons_and_widgets_list:
@@ -671,16 +741,20 @@ def show_cyclic_video(change=None):
     
     # Call extract of function
     # This extract is used to create the graphic and doesn't repeat the same again.
-    exec(open('C_GUI02_uniaxialMaterial/S01_GUI02_A05_CallGraphic.py', encoding='utf8').read())
-    code_params_output.value = ""
-    
-    # Enable initial widgets
-    for widget in all_buttons_and_widgets_list:
-        if widget in buttons_initial_state:
-            widget.disabled = False
-        else:
-            widget.disabled = True
-    instructions_button.disabled = False
+    # The widgets are enabled again even if the video is cancelled.
+    try:
+        exec(open('C_GUI02_uniaxialMaterial/S01_GUI02_A05_CallGraphic.py', encoding='utf8').read())
+        code_params_output.value = ""
+    finally:
+        plt.close(fig)
+        
+        # Enable initial widgets
+        for widget in all_buttons_and_widgets_list:
+            if widget in buttons_initial_state:
+                widget.disabled = False
+            else:
+                widget.disabled = True
+        instructions_button.disabled = False
 
 
 # %%%% [03-04-05] SHOW_CODE
@@ -695,8 +769,8 @@ def code_selected_files(files):
         programer_output.value = programer_output.value + '\nAntes de leer el archivo'
         programer_output.value = programer_output.value + f'\nurl_x = {str(url_x)}'
         
-        # Read the .txt files
-        data_dict = TxT.read_file_to_dict(url_x)
+        # Read the metadata of the response files (.npz or .txt), the arrays aren't needed
+        data_dict = TxT.read_response_header(url_x)
         
         # DEBUG
         programer_output.value = programer_output.value + '\nLuego de leer el archivo'
@@ -713,22 +787,51 @@ def show_code(change=None):
 
 # %%%% [03-04-06] REFRESH_FILES
 # Function to refresh the file checkboxes    
-def refresh_files(change=None):
+# The responses are listed from the catalog. The catalog is synchronized with the directory (new, modified or
+# deleted files outside the GUI) only with the button, the GUI updates the catalog when it writes or deletes a file.
+def refresh_files(change=None, sync_x=True):
     global files_checkboxes, files_checkboxes_box, files_checkboxes_2, files_checkboxes_box_2, files_checkboxes_3, files_checkboxes_box_3
-    # Refresh Checkbox of the files in the directory (re-write variable)
-    files_checkboxes = list_files_with_checkboxes(directory)
-    files_checkboxes_2 = list_files_with_checkboxes(directory_2)
-    files_checkboxes_3 = list_files_with_checkboxes(directory_3)
-    # Refresh the checkboxes in GUI
-    files_checkboxes_box.children = files_checkboxes
-    files_checkboxes_box_2.children = files_checkboxes_2
-    files_checkboxes_box_3.children = files_checkboxes_3
+    # Refresh Checkbox of the files in the directory (re-write variable), only the files that changed get a new checkbox
+    with files_lock:
+        if sync_x:
+            catalog.sync()
+        files_checkboxes = update_checkboxes(files_checkboxes_box, list_responses())
+        files_checkboxes_2 = update_checkboxes(files_checkboxes_box_2, list_files(directory_2))
+        files_checkboxes_3 = update_checkboxes(files_checkboxes_box_3, list_files(directory_3))
     code_params_output.value = "Files have been successfully refreshed"
     graph_output.value = ""
     with out:
         out.clear_output(wait=False)
 
 
+# The watcher (S01_GUI02_A22_Watcher.py) reports the files added, removed or modified in the directories, also outside
+# the GUI. Only the list of the directory that changed is updated, with the difference.
+files_lock = threading.Lock()
+
+
+def apply_file_changes(name, added, removed, modified):
+    global files_checkboxes, files_checkboxes_2, files_checkboxes_3
+    with files_lock:
+        if name == 'responses':
+            if any(path.endswith(Rst.archive_extension) for path in added + removed + modified):
+                catalog.sync()  # The records of an archive changed, the watcher only sees the archive.
+            else:
+                catalog.update([os.path.join(catalog.directory, path) for path in added + removed + modified])
+            files_checkboxes = update_checkboxes(files_checkboxes_box, list_responses())
+        elif name == 'strain_loads':
+            files = set(checkbox.description for checkbox in files_checkboxes_2)
+            files_checkboxes_2 = update_checkboxes(files_checkboxes_box_2, sorted(files - set(removed) | set(added)))
+        elif name == 'material_models':
+            files = set(checkbox.description for checkbox in files_checkboxes_3)
+            files_checkboxes_3 = update_checkboxes(files_checkboxes_box_3, sorted(files - set(removed) | set(added)))
+
+
+def start_watcher():
+    return Wch.Watcher({'responses': (catalog.directory, Rst.response_extensions + (Rst.archive_extension,)),
+                        'strain_loads': (directory_2, ('.txt',)),
+                        'material_models': (directory_3, ('.txt',))}, apply_file_changes).start()
+
+
 # %%%% [03-04-07] DELETE_FILE
 # Function delete selected files.
 def delete_file_fun(file_url: str) -> Optional[str]:
@@ -736,9 +839,15 @@ def delete_file_fun(file_url: str) -> Optional[str]:
         # Parse the URL to extract the file path
         file_path = urllib.parse.urlparse(file_url).path
         # Check if the file exists
-        if os.path.exists(file_path):
+        if Rst.split_archive_path(file_path) is not None:
+            # Delete the record of the archive
+            Rst.delete_response(file_path)
+            catalog.remove(file_path)
+            code_params_output.value = code_params_output.value + f"File '{file_path}' has been deleted successfully."
+        elif os.path.exists(file_path):
             # Delete the file
             os.remove(file_path)
+            catalog.remove(file_path)  # Only the responses are in the catalog, other files don't change it.
             code_params_output.value = code_params_output.value + f"File '{file_path}' has been deleted successfully."
         else:
             code_params_output.value = code_params_output.value + f"File '{file_path}' does not exist."
@@ -768,7 +877,7 @@ def delete_file(change=None):
     delete_selected_files(directory_3, files_checkboxes_3)
 
     message = code_params_output.value
-    refresh_files()
+    refresh_files(sync_x=False)
     code_params_output.value = message
     graph_output.value = ''
     with out:
@@ -778,7 +887,9 @@ def delete_file(change=None):
 # %%%% [03-04-08] DELETE_ALL
 # Function to delete all files and image in the directory created for GUI
 def delete_all(change=None):
+    global watcher
     # Delete all and create new directories for .txt files.
+    watcher.stop()
     def recreate_directory(path):
         if os.path.exists(path):
             shutil.rmtree(path)
@@ -787,9 +898,12 @@ def delete_all(change=None):
     # Create all directories
     for dir_j in directories:
         recreate_directory(dir_j)
+    Rst.archives.clear()  # The archives were deleted with the directory, their indexes too.
+    catalog.clear()
+    watcher = start_watcher()
 
     # Annotation, refresh & clear
-    refresh_files()
+    refresh_files(sync_x=False)
     code_params_output.value = 'All files have been successfully deleted.'
     graph_output.value = ''
     with out:
@@ -885,7 +999,7 @@ Modificar Strain Load:
         model_widgets.children = []
         
         # Refresh Checkbox
-        refresh_files()
+        refresh_files(sync_x=False)
         
         # Message to user
         url_strain_short = '"ID_StrainLoad_' + str(id_cyclic_load_input.value) + f'_{load_args[0]}_{load_args[1]}.txt"'
@@ -922,6 +1036,9 @@ def load_arg():
 # Function to show the cyclic load
 def show_cyclic_load(change=None):
     load_args = load_arg()
+    # The key is remembered only when the image is shown, a cancelled or failed call doesn't skip the next one.
+    key = strain_load_key()
+    strain_load_debouncer.forget()
     
     # Create figure
     fig = plt.figure(figsize=(8.5, 3.3), dpi=100)
@@ -957,10 +1074,10 @@ def show_cyclic_load(change=None):
     plt.savefig(url)
     plt.close()
     
-    # Display the image
-    with out:
-        out.clear_output()
-        display(Image(filename=url))
+    # Display the image. It's also called from the worker (strain_load_debouncer), see report_progress().
+    out.outputs = ()
+    out.append_display_data(Image(filename=url))
+    strain_load_debouncer.remember(key)
 
 
 # %%%% [03-04-11] MODIFY_STRAIN_FILE
@@ -1143,7 +1260,7 @@ Modificar Strain Load:
         model_widgets.children = []
         
         # Refresh Checkbox
-        refresh_files()
+        refresh_files(sync_x=False)
         
         # Message to user
         code_params_output.value = 'The definition of the cyclic load has been canceled.'
@@ -1156,8 +1273,9 @@ def define_material_model(change=None):
     global all_buttons_and_widgets_list, buttons_initial_state
     global files_checkboxes_3
     widgets_to_disabled_and_enable = [show_material_model_button, MatTag_input, material_type_dropdown,
-                                       model_type_dropdown, unit_dropdown, graphic_unit_dropdown,
-                                       strain_loading_dropdown, define_material_model_button,
+                                       model_type_dropdown, unit_dropdown, graphic_unit_dropdown, graphic_value_dropdown,
+                                       engine_dropdown, steps_dropdown, strain_loading_dropdown,
+                                       define_material_model_button,
                                        add_file_button, see_instruction_button, modify_material_model_button]
     
     if define_material_model_button.description == 'Define':
@@ -1267,7 +1385,7 @@ Modificar Material Model:
         model_widgets.children = []
         
         # Refresh Checkbox
-        refresh_files()
+        refresh_files(sync_x=False)
         
         # Message to user
         url_material_short = '"MatTag_' + str(MatTag_input.value) + f'_{model_args[0]}.txt"'
@@ -1368,11 +1486,76 @@ def url_arg(load_type, cyclic_type):
             url1 = 'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/cyclic_traction/'
         elif cyclic_type == 'combined':
             url1 = 'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/cyclic_combined/'
+    # With an archive the responses are records of it, ej. '.../responses.npa/monotonic/MatTag_1_...npz'.
+    if response_archive is not None and url1 != '':
+        url1 = f"{response_archive}/{os.path.relpath(url1, directory).replace(os.sep, '/')}/"
     return url1
 
 
+# Archive (.npa) to save the new responses, see Archive from S01_GUI02_A20_ResponseStore.py. None saves each
+# response in its own file. Ej. 'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial/responses.npa'.
+response_archive = None
+
+
+# Target frame rate of the graphic while the response of the material is calculated.
+stream_fps = 8
+
+# While the material is edited the graphic is a preview: the strain load is decimated (keeping the peaks and reversal
+# points) so the evaluation takes about the budget, with the speed measured in the previous previews. add_response
+# uses the full resolution. See PreviewResolution from S01_GUI02_A16_AdaptiveStrain.py.
+preview_mode = True
+preview_resolution = Adp.PreviewResolution(budget_x=0.15)
+
+
+# Function to create the graphic that shows the response while it is calculated (see Grf.StreamPlot).
+# The chunks of the response only have the stress, so there isn't a progressive graphic of the other values.
+def material_model_stream_plot(label):
+    if graphic_value_dropdown.value != 'stress':
+        return None
+    unit, graphic_unit = unit_dropdown.value, graphic_unit_dropdown.value
+    factor = 1.0
+    if unit != '-' and graphic_unit != '-':
+        factor = unit_factors_new[graphic_unit][unit]
+
+    # Replace the previous frame in the output
+    def show_frame(png):
+        out.outputs = ()
+        out.append_display_data(Image(data=png))
+
+    return Grf.StreamPlot(show_frame, 'b', label, 'strain', f'stress [{graphic_unit}]', True, factor_x=factor,
+                          fps_x=stream_fps)
+
+
+# Function to calculate the response, showing it while opensees advances if stream is True.
+# A newer request of the worker stops the calculation between two chunks. full = False evaluates a preview.
+def material_model_data_plot(unit, model_args, load_args, min_max_args = [], stream = True, full = True):
+    record = graphic_value_dropdown.options[1:]
+    speed_key = (model_args[0], engine_dropdown.value, steps_dropdown.value)
+    load_args_x = load_args if full or not preview_mode else preview_resolution.load_args(load_args, speed_key)
+    misses, t0 = Cch.cache.misses, time.perf_counter()
+
+    chunks = worker.cancellable(Cch.cached_data_plot_stream(unit, model_args, load_args_x,
+                                                            min_max_args_x = min_max_args, record_x = record,
+                                                            engine_x = engine_dropdown.value,
+                                                            steps_x = steps_dropdown.value),
+                                'Calculating the response: {} strains.')
+    preview = material_model_stream_plot(model_args[0]) if stream else None
+    if preview is None:
+        dictionary = TxT.run_stream(chunks)
+    else:
+        # The final graphic replaces the last frame (see S01_GUI02_A05_CallGraphic.py).
+        dictionary = preview.consume(chunks)
+
+    # Measure the speed of the evaluation, without the frames of the progressive graphic and the responses of the cache.
+    if load_args_x is not load_args and Cch.cache.misses != misses:
+        seconds = time.perf_counter() - t0 - (preview.draw_seconds if preview is not None else 0.0)
+        # The strains evaluated are the points of the branches (without the padding of DataPlot).
+        preview_resolution.measure(speed_key, Brn.response_branches(dictionary).points, seconds)
+    return dictionary
+
+
 # Function to create the file with the model and the result of test it. 
-def create_material_model_test_file(selected_file_in_strain_dropdown, aux_checkbox = True):
+def create_material_model_test_file(selected_file_in_strain_dropdown, aux_checkbox = True, stream = False, full = True):
     
     # Define the cyclic load arguments. If aux_checkbox = False, use default value
     if aux_checkbox:
@@ -1397,7 +1580,10 @@ def create_material_model_test_file(selected_file_in_strain_dropdown, aux_checkb
         # I'm not going to create a .txt file with the response of the material for the load that 
         # is on going definition, I'm going only to create de dictionary with that data. 
         # Because I don't want to write a txt file an read it.
-        dictionary = TxT.data_plot(unit, model_args, load_args, min_max_args_x = min_max_args)  # dictionary['DataPlot']
+        # The response is read from the cache if the parameters haven't changed (graphic unit, regularization, ...).
+        # With stream = True the response is shown while it is calculated.
+        dictionary = material_model_data_plot(unit, model_args, load_args, min_max_args, stream = stream,
+                                              full = full)  # dictionary['DataPlot']
         
     else:
         model_args = model_arg()
@@ -1405,16 +1591,73 @@ def create_material_model_test_file(selected_file_in_strain_dropdown, aux_checkb
         # I'm not going to create a .txt file with the response of the material for the load that 
         # is on going definition, I'm going only to create de dictionary with that data. 
         # Because I don't want to write a txt file an read it.
-        dictionary = TxT.data_plot(unit, model_args, load_args)  # dictionary['DataPlot']
+        # The response is read from the cache if the parameters haven't changed (graphic unit, regularization, ...).
+        # With stream = True the response is shown while it is calculated.
+        dictionary = material_model_data_plot(unit, model_args, load_args, stream = stream,
+                                              full = full)  # dictionary['DataPlot']
         
     return dictionary
+
+
+# Function to read the material models checked in the list of material models, to compare them with the model in
+# definition. A MinMax model is tested with the parameters of the file of its other material.
+def checked_material_models():
+    files = [cb.description for cb in files_checkboxes_3]
+    materials = []
+    for file in [cb.description for cb in files_checkboxes_3 if cb.value]:
+        model_args, unit_model, material_type = read_selected_files_model(file)
+        min_max_args = []
+        if material_type == 'MinMax':
+            min_max_args = model_args
+            # The files are called: 'MatTag_2_ConcreteCM.txt', 'MatTag_3_Concrete07.txt', etc
+            other_files = [other for other in files if other.split('_')[1] == str(min_max_args[2])]
+            if len(other_files) == 0:
+                continue
+            model_args, _, _ = read_selected_files_model(other_files[0])
+        materials.append((unit_model, model_args, min_max_args))
+    return materials
+
+
+# Function to calculate the response of the checked material models under the strain load of the graphic. The models
+# of each unit are tested in one opensees domain, see data_plot_many() from S01_GUI02_A15_MultiMaterial.py.
+# Returns the dictionaries for S01_GUI02_A05_CallGraphic.py. They only have the stress, so they aren't compared in the
+# graphic of other values (ej. 'tangent').
+def compared_material_models(selected_file_in_strain_dropdown, aux_checkbox = True, full = True):
+    materials = checked_material_models()
+    if len(materials) == 0 or graphic_value_dropdown.value != 'stress':
+        return []
+    
+    # The same strain load as the model in definition, also in a preview.
+    if aux_checkbox:
+        load_args, _ = read_selected_files_strain(selected_file_in_strain_dropdown)
+    else:
+        load_args, _ = read_selected_files_strain(selected_file_in_strain_dropdown, aux_checkbox = False)
+    if not full and preview_mode:
+        speed_key = (model_arg()[0], engine_dropdown.value, steps_dropdown.value)
+        load_args = preview_resolution.load_args(load_args, speed_key)
+    
+    units = {}
+    for unit_model, model_args, min_max_args in materials:
+        units.setdefault(unit_model, []).append((model_args, min_max_args))
+    dictionaries = []
+    for unit_model, materials_unit in units.items():
+        dictionaries += Mul.data_plot_many(unit_model, materials_unit, load_args)
+    return dictionaries
     
 
 # Function to create graphic of stress-strain curve of material model
 def show_material_model(change=None):
+    worker.submit(run_show_material_model, change)
+
+
+# full = False shows a preview of the response, see preview_mode.
+def run_show_material_model(change=None, full=False):
     global files_checkboxes_2, files_checkboxes, directory, selected_strain_dropdown
-    with out:
-        out.clear_output()
+    # The key is remembered only when the graphic is shown, a cancelled or failed call doesn't skip the next one (the
+    # output may have the frames of the cancelled response).
+    key = material_model_key()
+    material_model_debouncer.forget()
+    out.outputs = ()
     graph_output.value = ""
     code_params_output.value = ""
     
@@ -1439,7 +1682,11 @@ If there are not files selected, it will use default values as 'Strain load'."""
         
         # Create dictionary with the data of the material model and the strain load
         # The model is defined in base of the parameters in the GUI
-        dictionary = create_material_model_test_file(selected_files_default, aux_checkbox = False)
+        dictionary = create_material_model_test_file(selected_files_default, aux_checkbox = False, stream = True,
+                                                     full = full)
+        
+        # Material models checked in the list, to compare them with the model in definition
+        dictionaries_compared = compared_material_models(selected_files_default, aux_checkbox = False, full = full)
         
         # Data to graphic
         url_file = 'Dictionary_with_direct_data'
@@ -1449,8 +1696,8 @@ If there are not files selected, it will use default values as 'Strain load'."""
         ax = fig.add_axes([0.145, 0.133, 0.805, 0.827])
         aux_ax = 1  # Identify the number of axes in the plot.
         
-        # Graph the file created with the material model tested    
-        selected_files.insert(0, url_file)
+        # Graph the file created with the material model tested and the checked material models
+        selected_files[:0] = [url_file] + dictionaries_compared
         
         # Plot the regularization if it is activated
         if regularization_button.description == 'Hide':            
@@ -1481,8 +1728,13 @@ If there are not files selected, it will use default values as 'Strain load'."""
         # Activate the checkbox of the selected value in the list, to use the function read_selected_files_strain
         selected_file_in_strain_dropdown[0].value = True
         
-        # The model is defined in base of the parameters in the GUI
-        dictionary = create_material_model_test_file(selected_file_in_strain_dropdown, aux_checkbox = True)
+        # The model is defined in base of the parameters in the GUI. The response is shown while it is calculated.
+        dictionary = create_material_model_test_file(selected_file_in_strain_dropdown, aux_checkbox = True,
+                                                     stream = True, full = full)
+        
+        # Material models checked in the list, to compare them with the model in definition
+        dictionaries_compared = compared_material_models(selected_file_in_strain_dropdown, aux_checkbox = True,
+                                                         full = full)
         
         # Disable the checkbox of the selected value in the list, to use the function read_selected_files_strain
         selected_file_in_strain_dropdown[0].value = False
@@ -1495,8 +1747,8 @@ If there are not files selected, it will use default values as 'Strain load'."""
         ax = fig.add_axes([0.145, 0.133, 0.805, 0.827])
         aux_ax = 1  # Identify the number of axes in the plot.
         
-        # Graph the file created with the material model tested    
-        selected_files.insert(0, url_file)
+        # Graph the file created with the material model tested and the checked material models
+        selected_files[:0] = [url_file] + dictionaries_compared
         
         # Plot the regularization if it is activated
         if regularization_button.description == 'Hide':            
@@ -1510,6 +1762,8 @@ If there are not files selected, it will use default values as 'Strain load'."""
         # Call extract of function to graphic the stress-strain curve.
         exec(open('C_GUI02_uniaxialMaterial/S01_GUI02_A05_CallGraphic.py', encoding='utf8').read())
 
+    material_model_debouncer.remember(key)
+
 
 # %%%% [03-04-14] MODIFY_MATERIAL_MODEL
 # Function to read_selected_files_model
@@ -1773,7 +2027,7 @@ Modificar Strain Load:
         model_widgets.children = []
         
         # Refresh Checkbox
-        refresh_files()
+        refresh_files(sync_x=False)
         
         # Message to user
         code_params_output.value = 'The definition of the material model has been canceled.'
@@ -1875,9 +2129,12 @@ def regularize_material(change=None):
         fr_reg_input.disabled = True
         Gfc_cc_input.disabled = True
         L_reg_input.disabled = True
-        show_material_model()
         
-        code_params_output.value = code_params_output.value + f"\neps_r = {eps_3}"
+        # The message is added after the graphic, show_material_model() cleans code_params_output.
+        def show_regularization():
+            run_show_material_model()
+            code_params_output.value = code_params_output.value + f"\neps_r = {eps_3}"
+        worker.submit(show_regularization)
     
     else:
         regularization_button.description = 'Post-peak Regularization'
@@ -2062,6 +2319,37 @@ graphic_unit_dropdown = Dropdown(
     layout=layout_var_1
 )
 
+# Dropdown widget for graphic value. The values different from 'stress' are recorded in the same pass as the stress.
+# See data_plot() from S01_GUI02_A02_2_fileText.py.
+graphic_value_dropdown = Dropdown(
+    options=['stress', 'tangent', 'secant'],
+    value='stress',
+    description='Graphic Value:',
+    disabled=True,
+    layout=layout_var_1
+)
+
+# Dropdown widget for the engine of the response. 'native' evaluates the steels and Concrete01-02 in python, without opensees.
+# See material_response() from S01_GUI02_A02_2_fileText.py.
+engine_dropdown = Dropdown(
+    options=TxT.engines,
+    value='opensees',
+    description='Engine:',
+    disabled=True,
+    layout=layout_var_1
+)
+
+# Dropdown widget for the strain steps of the response. 'adaptive' refines the steps where the tangent changes and
+# enlarges them in the linear branches, delta_e of the strain load is the smallest step.
+# See data_plot_stream() from S01_GUI02_A02_2_fileText.py.
+steps_dropdown = Dropdown(
+    options=TxT.steps,
+    value='fixed',
+    description='Steps:',
+    disabled=True,
+    layout=layout_var_1
+)
+
 # Dropdown widget for strain loading
 strain_loading_dropdown = Dropdown(
     options = ['-'],
@@ -2236,7 +2524,7 @@ Ecr_input = Text(value='261148.919', description="Ecr:", continuous_update=False
 
 
 # %%% [04-02] ZIP WDGT
-input_widgets = VBox(layout=widgets.Layout(width='230px', height='675px', padding='0px'))
+input_widgets = VBox(layout=widgets.Layout(width='230px', height='707px', padding='0px'))
 # This group of widgets is update using update_model_widgets() & update_defo_widgets()
 model_widgets = VBox(layout=widgets.Layout(width='200px', height='435px', padding='0px'))  # model_widgets = VBox(layout=widgets.Layout(width='200px', height='665px', padding='0px'))
 regularization_widgets = VBox(layout=widgets.Layout(width='200px', height='230px', padding='0px'))  # Textarea(value='', layout=widgets.Layout(width='200px', height='170px'))
@@ -2356,14 +2644,16 @@ all_buttons_and_widgets_list = [
     show_cyclic_graphic_button, show_cyclic_video_button, delete_file_button, delete_all_button, 
     refresh_files_button, define_cyclic_load_button, show_cyclic_load_button, modify_cyclic_load_button,
     define_material_model_button, show_material_model_button, modify_material_model_button,
-    model_type_dropdown, material_type_dropdown, unit_dropdown, graphic_unit_dropdown, strain_loading_dropdown,
-    load_type_dropdown, cyclic_type_dropdown, MatTag_input, id_cyclic_load_input]
+    model_type_dropdown, material_type_dropdown, unit_dropdown, graphic_unit_dropdown, graphic_value_dropdown,
+    engine_dropdown, steps_dropdown, strain_loading_dropdown, load_type_dropdown, cyclic_type_dropdown, MatTag_input,
+    id_cyclic_load_input]
 
 # Buttons for initial state
 buttons_initial_state = [see_instruction_button, show_graphic_button, show_code_button,
                          show_cyclic_graphic_button, show_cyclic_video_button, delete_file_button, delete_all_button,
                          refresh_files_button, define_cyclic_load_button, modify_cyclic_load_button,
-                         define_material_model_button, modify_material_model_button]
+                         define_material_model_button, modify_material_model_button, graphic_value_dropdown,
+                         engine_dropdown, steps_dropdown]
 
 # Enable initial widgets
 for widget in all_buttons_and_widgets_list:
@@ -2388,8 +2678,16 @@ out = Output(layout=layout_rigth)  # Output
 # %%%% [04-08-00] STRAIN_STRESS_FILES
 # Directory to be listed
 directory = 'C_GUI02_uniaxialMaterial/C_GUI02_uniaxialMaterial'
-# Create Checkboxes for the files in the directory
-files_checkboxes = list_files_with_checkboxes(directory)
+# Catalog of the responses (.npz, and .txt of previous versions), outside the directory because delete_all()
+# recreates it. See S01_GUI02_A21_Catalog.py.
+catalog = Cat.Catalog(directory, 'C_GUI02_uniaxialMaterial/C_GUI02_Catalog.sqlite')
+catalog.sync()
+# Filter of the responses, ej. 'model=Steel02|Steel01, unit=ksi, load_type=cyclic, load_id=Default'
+responses_filter_input = Text(value='', placeholder='model=Steel02, unit=ksi', continuous_update=False,
+                              layout=widgets.Layout(width='220px', margin="9px 0 0 0"))
+responses_filter_input.observe(lambda change: refresh_files(sync_x=False), names='value')
+# Create Checkboxes for the files of the catalog
+files_checkboxes = list_responses_with_checkboxes()
 # Display checkboxes
 files_checkboxes_box = VBox(layout=widgets.Layout(width='357px', height='300px'))
 files_checkboxes_box.children = files_checkboxes
@@ -2410,6 +2708,9 @@ files_checkboxes_3 = list_files_with_checkboxes(directory_3)
 files_checkboxes_box_3 = VBox(layout=widgets.Layout(width='357px', height='300px'))
 files_checkboxes_box_3.children = files_checkboxes_3
 
+# Watcher of the three directories
+watcher = start_watcher()
+
 # %%% [04-09] MATH IN WIDGETS & DYNAMIC GRAPHICS
 # Widgets in the GUI
 widgets_list = [delta_e, e_max_c, e_max_t,
@@ -2468,13 +2769,13 @@ widgets_regularization = [Gfc_cc_input, L_reg_input]
 
 # Dropdowns in the GUI that affect the graphic
 dropdowns_list = [load_type_dropdown, cyclic_type_dropdown, unit_dropdown, 
-                  graphic_unit_dropdown, material_type_dropdown, 
-                  model_type_dropdown, strain_loading_dropdown]
+                  graphic_unit_dropdown, graphic_value_dropdown, material_type_dropdown, 
+                  model_type_dropdown, strain_loading_dropdown, engine_dropdown, steps_dropdown]
 
 dropdowns_graphic_strain = [cyclic_type_dropdown]
 
-dropdowns_graphic_material = [unit_dropdown, graphic_unit_dropdown, 
-                              model_type_dropdown, strain_loading_dropdown]
+dropdowns_graphic_material = [unit_dropdown, graphic_unit_dropdown, graphic_value_dropdown,
+                              model_type_dropdown, strain_loading_dropdown, engine_dropdown, steps_dropdown]
 
 # Helper function to observe the widgets with mathematical expressions 
 def observe_widget(widget_x):
@@ -2484,6 +2785,36 @@ def observe_widget(widget_x):
     widget_x.observe(handler, names='value')
 
 
+# The changes of the parameters are debounced (S01_GUI02_A19_Worker.py): a burst of changes of any registered
+# widget (ej. typing "-250") is one graphic with the latest values, debounce_quiet seconds after the last change.
+# The graphic isn't repeated if the effective parameters are the same as the graphic shown.
+debounce_quiet = 0.3
+
+
+# Effective parameters of the strain loading graphic.
+def strain_load_key():
+    return tuple(Cch.canonical_args(load_arg()))
+
+
+# Effective parameters of the material model graphic. The numbers are compared as numbers ('-250' == '-250.0').
+def material_model_key():
+    min_max_args = min_max_model_arg() if material_type_dropdown.value == 'MinMax' else []
+    regularization = ()
+    if regularization_button.description == 'Hide':
+        regularization = tuple(calculate_nodes_area_regularization_post_peak())
+    return (unit_dropdown.value, tuple(Cch.canonical_args(model_arg())), tuple(Cch.canonical_args(min_max_args)),
+            strain_loading_dropdown.value, graphic_unit_dropdown.value, graphic_value_dropdown.value,
+            engine_dropdown.value, steps_dropdown.value, regularization,
+            tuple(cb.description for cb in files_checkboxes if cb.value),
+            tuple(cb.description for cb in files_checkboxes_3 if cb.value))
+
+
+strain_load_debouncer = Wrk.Debouncer(lambda: worker.submit(show_cyclic_load), key_x=strain_load_key,
+                                      quiet_x=debounce_quiet)
+material_model_debouncer = Wrk.Debouncer(lambda: worker.submit(run_show_material_model), key_x=material_model_key,
+                                         quiet_x=debounce_quiet)
+
+
 # Helper function to observe the widgets for the strain loading graphic
 def observe_widget_graphic_strain(widget_x):
     def handler_2(change):
@@ -2501,7 +2832,7 @@ def observe_widget_graphic_strain(widget_x):
             # Only graph if 'change['new']' is already a number:
             if is_number:
                 if define_cyclic_load_button.description == 'Save':
-                    show_cyclic_load()
+                    strain_load_debouncer.trigger(change)
             # Only evaluate if 'change['new']' is not already a number
             if not is_number:
                 widget_x.value = str(eval(change['new']))
@@ -2525,7 +2856,7 @@ def observe_widget_graphic_material_model(widget_x):
             # Only graph if 'change['new']' is already a number:
             if is_number:
                 if define_material_model_button.description == 'Save':
-                    show_material_model()
+                    material_model_debouncer.trigger(change)
             # Only evaluate if 'change['new']' is not already a number
             if not is_number:
                 widget_x.value = str(eval(change['new']))
@@ -2537,7 +2868,7 @@ def observe_dropdown_graphic_strain(dropdown_x):
     def handler_4(change):
         if observer_enabled:
             if define_cyclic_load_button.description == 'Save':
-                show_cyclic_load()
+                strain_load_debouncer.trigger(change)
     dropdown_x.observe(handler_4, names='value')
 
 
@@ -2546,7 +2877,7 @@ def observe_dropdown_graphic_material_model(dropdown_x):
     def handler_5(change):
         if observer_enabled:
             if define_material_model_button.description == 'Save':
-                show_material_model()
+                material_model_debouncer.trigger(change)
     dropdown_x.observe(handler_5, names='value')
 
 
@@ -2730,7 +3061,8 @@ button_responses_box = VBox([button_responses_box_1, button_responses_box_2])
 material_input_list = [instructions_button, text_input_cyclic, id_cyclic_load_input, load_type_dropdown, 
                       cyclic_type_dropdown, button_strain_loadings_box, text_input_material, MatTag_input,
                       material_type_dropdown, model_type_dropdown, unit_dropdown, button_material_model_box,
-                      text_graphic_unit, graphic_unit_dropdown, strain_loading_dropdown,
+                      text_graphic_unit, graphic_unit_dropdown, graphic_value_dropdown, engine_dropdown,
+                      steps_dropdown, strain_loading_dropdown,
                       text_input_responses, add_file_button, button_responses_box,
                       text_files]
 input_widgets.children = material_input_list
@@ -2742,7 +3074,7 @@ title_input = HBox([title], layout=widgets.Layout(justify_content='center'))
 upper_input = HBox([input_widgets, rigth_side])  # upper_input = HBox([input_widgets, model_widgets])
 medium_input = HBox([refresh_files_button, delete_file_button, delete_all_button])
 medium_input_4 = VBox([text_checkbox_strain_load, files_checkboxes_box_2])
-medium_input_5 = VBox([text_checkbox_stress_strain, files_checkboxes_box])
+medium_input_5 = VBox([HBox([text_checkbox_stress_strain, responses_filter_input]), files_checkboxes_box])
 medium_input_6 = VBox([text_checkbox_material_model, files_checkboxes_box_3])
 left_side = VBox([title_input, upper_input, medium_input])
 low_input = HBox([code_params_output])